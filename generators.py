@@ -0,0 +1,150 @@
+import math
+import random
+from array import array
+
+from graphs import *
+from graphs import _edge_key
+
+
+def _graph(n: int, src: array, dst: array, imp: str) -> Graph:
+    """Builds the graph on vertices 0 to n - 1 with the edges src[i]-dst[i]."""
+    return Graph.from_arrays(range(n), src, dst, None, imp)
+
+
+def gnp_graph(n: int, p: float, imp: str = 'list', seed: int = None) -> Graph:
+    """Returns an Erdős–Rényi random graph G(n, p).
+
+    Every pair of the n vertices is joined with probability p, independently.
+    Pairs are not tried one by one: the gap to the next edge is drawn from the
+    geometric distribution instead (Batagelj and Brandes, 2005), so the time
+    taken is proportional to n plus the number of edges.
+
+    Args:
+    - n: the number of vertices, labelled 0 to n - 1; some may be isolated.
+    - p: the probability of each edge, from 0 to 1.
+    - imp: the implementation to be used, as for `Graph()`.
+    - seed: seeds the random numbers; the same seed gives the same graph.
+
+    Returns:
+    the random graph.
+    """
+    assert 0 <= p <= 1, f'edge probability {p} is not between 0 and 1'
+    rng = random.Random(seed)
+    src, dst = array('i'), array('i')
+    if p == 1:
+        for v in range(1, n):
+            src.extend([v] * v)
+            dst.extend(range(v))
+    elif p > 0:
+        log_q = math.log(1 - p)
+        v, w = 1, -1
+        while v < n:
+            # skip the pairs that get no edge, walking the lower triangle by rows
+            w += 1 + int(math.log(1 - rng.random()) / log_q)
+            while w >= v and v < n:
+                w -= v
+                v += 1
+            if v < n:
+                src.append(v)
+                dst.append(w)
+    return _graph(n, src, dst, imp)
+
+
+def gnm_graph(n: int, m: int, imp: str = 'list', seed: int = None) -> Graph:
+    """Returns a uniform random graph G(n, m) with exactly m edges.
+
+    The edges are m distinct pairs sampled from the n (n - 1) / 2 possible
+    ones, by index, and decoded to their endpoints.
+
+    Args:
+    - n: the number of vertices, labelled 0 to n - 1; some may be isolated.
+    - m: the number of edges, at most n (n - 1) / 2.
+    - imp: the implementation to be used, as for `Graph()`.
+    - seed: seeds the random numbers; the same seed gives the same graph.
+
+    Returns:
+    the random graph.
+    """
+    pairs = n * (n - 1) // 2
+    assert 0 <= m <= pairs, f'{n} vertices cannot have {m} edges'
+    chosen = random.Random(seed).sample(range(pairs), m)
+    chosen.sort()
+    src, dst = array('i'), array('i')
+    for k in chosen:
+        # pair k of the lower triangle is (v, w) with v (v - 1) / 2 + w == k
+        v = (1 + math.isqrt(8 * k + 1)) // 2
+        src.append(v)
+        dst.append(k - v * (v - 1) // 2)
+    return _graph(n, src, dst, imp)
+
+
+def barabasi_albert_graph(n: int, m: int, imp: str = 'list',
+                          seed: int = None) -> Graph:
+    """Returns a Barabási–Albert preferential attachment graph.
+
+    Growth starts from a star on m + 1 vertices. Each later vertex joins m
+    distinct existing ones, each chosen with probability proportional to its
+    degree, by drawing from a list holding every vertex once per edge end.
+    The graph has m (n - m) edges and a power-law degree tail.
+
+    Args:
+    - n: the number of vertices, labelled 0 to n - 1 in order of arrival.
+    - m: the number of edges of each new vertex, from 1 to n - 1.
+    - imp: the implementation to be used, as for `Graph()`.
+    - seed: seeds the random numbers; the same seed gives the same graph.
+
+    Returns:
+    the random graph.
+    """
+    assert 1 <= m < n, f'cannot attach {m} edges per vertex with {n} vertices'
+    rng = random.Random(seed)
+    src = array('i', [0] * m)
+    dst = array('i', range(1, m + 1))
+    ends = array('i', src)
+    ends.extend(dst)
+    for v in range(m + 1, n):
+        targets = set()
+        while len(targets) < m:
+            targets.add(ends[rng.randrange(len(ends))])
+        targets = sorted(targets)
+        src.extend([v] * m)
+        dst.extend(targets)
+        ends.extend(targets)
+        ends.extend([v] * m)
+    return _graph(n, src, dst, imp)
+
+
+def configuration_model_graph(degrees: [int], imp: str = 'list',
+                              seed: int = None) -> Graph:
+    """Returns a random graph with about the given degree sequence.
+
+    Each vertex v gets degrees[v] edge ends, which are shuffled and joined in
+    pairs. Self-loops and repeated edges the pairing produces are dropped, so
+    that the graph is simple (the erased configuration model); a few vertices
+    of high degree may end up slightly below their target.
+
+    Args:
+    - degrees: the target degree of each vertex, labelled by position; the
+      degrees must sum to an even number.
+    - imp: the implementation to be used, as for `Graph()`.
+    - seed: seeds the random numbers; the same seed gives the same graph.
+
+    Returns:
+    the random graph.
+    """
+    assert sum(degrees) % 2 == 0, 'the degrees must sum to an even number'
+    rng = random.Random(seed)
+    ends = array('i')
+    for v, d in enumerate(degrees):
+        ends.extend([v] * d)
+    rng.shuffle(ends)
+    src, dst = array('i'), array('i')
+    seen = set()
+    for k in range(0, len(ends), 2):
+        v, w = ends[k], ends[k + 1]
+        key = _edge_key(v, w)
+        if v != w and key not in seen:
+            seen.add(key)
+            src.append(v)
+            dst.append(w)
+    return _graph(len(degrees), src, dst, imp)
@@ -1,6 +1,9 @@
 import math
-from copy import deepcopy
-import copy
+import os
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
 
 
 class Edge:
@@ -89,8 +92,121 @@ class Edge:
         return self.v0 if v == self.v1 else self.v1 if v == self.v0 else None
 
 
+class VertexIndex:
+    """ Interns vertex labels to dense vertex ids 0 to n - 1.
+
+    The labels are kept in a sorted array and a label's id is its position in
+    it, found by binary search, so ids follow label order and no per-vertex
+    dict is needed however large the labels are. When the labels form a
+    contiguous range the id is found by subtraction instead.
+
+    Labels added later, as a graph grows, get the next free ids and are looked
+    up in a dict; the ids of the others never change.
+    """
+
+    def __init__(self, labels):
+        """Creates index over the distinct labels in labels.
+
+        Args:
+        - self: the instance to create.
+        - labels: integer vertex labels, possibly repeated.
+
+        Returns:
+        nothing.
+        """
+        self.labels = array('q', sorted(set(labels)))
+        self._base = self.labels[0] if self.labels else 0
+        self._contiguous = (not self.labels or
+                            self.labels[-1] - self._base == len(self.labels) - 1)
+        self._sorted = len(self.labels)  # the labels searched by position
+        self._added = {}
+
+    @property
+    def ordered(self) -> bool:
+        """Do the ids follow label order, i.e. was no label added later?"""
+        return not self._added
+
+    def add(self, label) -> int:
+        """Gives label the next free id, if it has none.
+
+        Args:
+        - self: the instance to operate on.
+        - label: the vertex label to add.
+
+        Returns:
+        the id of label.
+        """
+        if label in self:
+            return self.id(label)
+        self._added[label] = len(self.labels)
+        self.labels.append(label)
+        return self._added[label]
+
+    def __len__(self) -> int:
+        """Returns the number of labels in the index."""
+        return len(self.labels)
+
+    def __contains__(self, label) -> bool:
+        """Is label in the index?
+
+        Allows `in` syntax.
+
+        Args:
+        - self: this instance.
+        - label: the vertex label to check.
+
+        Returns:
+        True if label has an id, False otherwise.
+        """
+        try:
+            self.id(label)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def id(self, label) -> int:
+        """Returns the dense id of label.
+
+        Errors with KeyError if label is not in the index.
+
+        Args:
+        - self: the instance to operate on.
+        - label: the vertex label whose id is sought.
+
+        Returns:
+        the id of label.
+        """
+        if self._contiguous:
+            i = label - self._base
+            if 0 <= i < self._sorted and i == int(i):
+                return int(i)
+        else:
+            i = bisect_left(self.labels, label, 0, self._sorted)
+            if i < self._sorted and self.labels[i] == label:
+                return i
+        if self._added:
+            return self._added[label]
+        raise KeyError(label)
+
+    def label(self, i: int) -> int:
+        """Returns the label of the vertex with id i.
+
+        Args:
+        - self: the instance to operate on.
+        - i: the vertex id whose label is sought.
+
+        Returns:
+        the label of vertex i.
+        """
+        return self.labels[i]
+
+
 class Graph:
-    """ Represents an undirected, possibly weighted, graph. """
+    """ Represents an undirected, possibly weighted, graph.
+
+    Vertices are stored by the backends under the dense ids given to them by a
+    `VertexIndex`; the methods here take and return the vertex labels.
+    """
 
     def __init__(self, edges: str, imp: str):
         """Creates graph with the given edges using the specified implementation.
@@ -99,11 +215,17 @@ class Graph:
         representation of the graph. Each line contains 2 vertices and an
         optional weight. All values in a line are separated by spaces. The vertices have integer values
         and the optional weight is a float. The vertices need not begin at 0.
+        If any line has a weight the graph is weighted, and lines without one
+        get weight 1. Self-loops are ignored, and an edge listed more than once
+        keeps the weight of its last line. The weights are stored in the
+        narrowest of int32, float32 and float64 arrays that holds them all
+        exactly.
 
         the value of imp sepcifies the graph implementation to be used as follows:
         sets   : two sets, one each for the vertices and the edges
         matrix : adjacenccy matrix
         list   : adjacency list
+        frozen : compressed sparse rows in read-only arrays; see `freeze`
 
         Args:
         self: the instance to create.
@@ -113,12 +235,169 @@ class Graph:
         Returns:
         nothing.
         """
-        if imp == "sets":
-            self.graph = SetGraph(edges)
-        elif imp == "matrix":
-            self.graph = AdjacencyMatrix(edges)
-        elif imp == "list":
-            self.graph = AdjacencyList(edges)
+        self._build(*_parse_lines(edges.splitlines()), imp)
+
+    @classmethod
+    def from_arrays(cls, labels, src, dst, weights, imp: str):
+        """Creates graph from parsed edge arrays using the specified implementation.
+
+        Edge i joins vertices labels[src[i]] and labels[dst[i]] and, if
+        weights is not None, has weight weights[i]. As for `Graph()`,
+        self-loops are ignored and a repeated pair keeps its last weight.
+
+        Args:
+        - cls: the class to instantiate.
+        - labels: the vertex labels, indexed by vertex id.
+        - src, dst: the vertex ids of the endpoints of each edge.
+        - weights: the weight of each edge; None if the graph is unweighted.
+        - imp: the implementation to be used, as for `Graph()`.
+
+        Returns:
+        the new graph.
+        """
+        graph = cls.__new__(cls)
+        graph._build(labels, src, dst, weights, imp)
+        return graph
+
+    def _build(self, labels, src, dst, weights, imp: str) -> None:
+        """Interns labels and builds the backend from the dense edge arrays.
+
+        Args:
+        - self: the instance to build.
+        - labels, src, dst, weights: as for `from_arrays`.
+        - imp: the implementation to be used, as for `Graph()`.
+
+        Returns:
+        nothing.
+        """
+        assert imp in IMPLEMENTATIONS, f'unknown implementation {imp}'
+        src, dst, weights = _simple_edges(src, dst, weights)
+        weights = _typed_weights(weights)
+        self.index = VertexIndex(labels)
+        if len(labels) != len(self.index) or self.index.labels != array('q', labels):
+            remap = array('i', (self.index.id(label) for label in labels))
+            src = array('i', (remap[v] for v in src))
+            dst = array('i', (remap[v] for v in dst))
+        self.graph = IMPLEMENTATIONS[imp](len(self.index), src, dst, weights)
+        self._clear_caches()
+        if self.frozen:
+            # built now, so that concurrent readers never race to build them
+            self.compact()
+            self.summary()
+            self._component_index()
+
+    def _clear_caches(self) -> None:
+        """Drops the structures derived from the graph, e.g. its components.
+
+        They are rebuilt on first use after this call.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+        """
+        self._components = None
+        self._compact = None
+        self._summary = None
+
+    @property
+    def frozen(self) -> bool:
+        """Is the graph immutable, i.e. built with the frozen implementation?"""
+        return isinstance(self.graph, FrozenGraph)
+
+    def freeze(self) -> 'Graph':
+        """Returns an immutable copy of the graph that many threads may read at once.
+
+        The copy uses the frozen implementation: its adjacency is held in
+        read-only arrays, and its derived structures, e.g. the compact view
+        and the components, are built before it is returned. Nothing writes
+        to it afterwards, so every `Graph` method and `NetworkOperations`
+        measure may be called on it from any number of threads without locks,
+        on free-threaded builds too. Each call that iterates, e.g.
+        `neighbors`, returns a fresh iterator owned by the calling thread.
+        `apply` errors on the copy; freeze the changed graph again instead.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the frozen copy; the graph itself if it is already frozen.
+        """
+        if self.frozen and type(self) is Graph:
+            return self
+        ids = list(self._vertex_ids())
+        remap = {v: i for i, v in enumerate(ids)}
+        src, dst, weights = array('l'), array('l'), array('d')
+        for e, w in self._weighted_id_edges():
+            src.append(remap[e.v0])
+            dst.append(remap[e.v1])
+            weights.append(w)
+        labels = [self.index.labels[v] for v in ids]
+        return Graph.from_arrays(labels, src, dst,
+                                 weights if self.has_weights() else None, 'frozen')
+
+    def apply(self, delta: 'EdgeDelta') -> None:
+        """Changes the graph by the edges added and removed in delta.
+
+        The backend is updated in place, new vertices getting the next free
+        ids. If the weightedness of the graph changes, or a vertex loses all
+        its edges, the graph is rebuilt instead, so that it always equals the
+        graph built from the new edge list. The same goes for weights the
+        graph's weight array cannot hold exactly, e.g. 2.5 in a graph of whole
+        number weights. Derived structures, e.g. the compact view, are dropped
+        either way. Frozen graphs cannot be changed.
+
+        Args:
+        - self: the instance to operate on.
+        - delta: as returned by `diff_edge_lists`, against this graph's edges.
+
+        Returns:
+        nothing.
+        """
+        assert not self.frozen, 'frozen graphs are read-only; apply to a mutable copy'
+        change = {}
+        for v0, v1 in delta.removed:
+            assert self.has_edge(v0, v1), f'no edge {v0} {v1} to remove'
+            change[v0] = change.get(v0, 0) - 1
+            change[v1] = change.get(v1, 0) - 1
+        for v0, v1 in delta.added:
+            change[v0] = change.get(v0, 0) + 1
+            change[v1] = change.get(v1, 0) + 1
+        typecode = self.graph.weight_typecode
+        if delta.weighted != self.has_weights() or any(
+                d < 0 and self.degree(v) + d == 0 for v, d in change.items()) or (
+                delta.weighted and not all(_fits_weight(typecode, w)
+                                           for w in delta.added.values())):
+            self._rebuild(delta)
+            return
+        for v in change:
+            if v not in self.index:
+                self.index.add(v)
+                self.graph.add_vertex()
+        index = self.index
+        for v0, v1 in delta.removed:
+            self.graph.remove_edge(index.id(v0), index.id(v1))
+        for (v0, v1), w in delta.added.items():
+            if typecode == 'i':
+                w = int(w)
+            self.graph.add_edge(index.id(v0), index.id(v1), w)
+        self._clear_caches()
+
+    def _rebuild(self, delta: 'EdgeDelta') -> None:
+        """Builds the graph afresh from its edges changed by delta."""
+        edges = {(min(e.v0, e.v1), max(e.v0, e.v1)): w
+                 for e, w in self.weighted_edges()}
+        for pair in delta.removed:
+            del edges[pair]
+        edges.update(delta.added)
+        index = VertexIndex(v for pair in edges for v in pair)
+        src = array('l', (index.id(v0) for v0, _ in edges))
+        dst = array('l', (index.id(v1) for _, v1 in edges))
+        weights = array('d', edges.values()) if delta.weighted else None
+        imp = next(name for name, cls in IMPLEMENTATIONS.items()
+                   if isinstance(self.graph, cls))
+        self._build(index.labels, src, dst, weights, imp)
 
     def vertices(self):
         """Iterates over the vertices in the graph.
@@ -132,7 +411,8 @@ class Graph:
         Yields:
         vertices in the graph.
         """
-        return self.graph.vertices()
+        labels = self.index.labels
+        return (labels[v] for v in self.graph.vertices())
 
     def edges(self) -> {Edge}:
         """Iterates over the edges in the graph.
@@ -146,7 +426,8 @@ class Graph:
         Yields:
         vertices in the graph.
         """
-        return self.graph.edges()
+        labels = self.index.labels
+        return (Edge(labels[e.v0], labels[e.v1]) for e in self.graph.edges())
 
     def vertex_count(self) -> int:
         """Returns the number of vertices in the graph.
@@ -180,7 +461,7 @@ class Graph:
         Returns:
         True if v is a vertex in the graph, False otherwise.
         """
-        return self.graph.has_vertex(v)
+        return v in self.index
 
     def has_edge(self, v0, v1) -> bool:
         """Returns whether the grpah contains an edge between v0 and v1.
@@ -195,7 +476,7 @@ class Graph:
         assert self.has_vertex(v0) and self.has_vertex(v1), \
             f'one or more of {v0} and {v1} are not valid vertices'
 
-        return self.graph.has_edge(v0, v1)
+        return self.graph.has_edge(self.index.id(v0), self.index.id(v1))
 
     def has_weights(self) -> bool:
         """Returns whether the graph is weighted.
@@ -223,7 +504,34 @@ class Graph:
         Yields:
         neighbors of v in the graph.
         """
-        return self.graph.neighbors(v)
+        labels = self.index.labels
+        return (labels[n] for n in self.graph.neighbors(self.index.id(v)))
+
+    def sorted_neighbors(self, v) -> [int]:
+        """Returns the neighbors of the vertex v in the graph in increasing order.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        a list of the neighbors of v.
+        """
+        labels = self.index.labels
+        nbrs = [labels[n] for n in self._sorted_neighbor_ids(self.index.id(v))]
+        if not self.index.ordered:
+            nbrs.sort()  # ids added by `apply` do not follow label order
+        return nbrs
+
+    def _sorted_neighbor_ids(self, i: int):
+        """Returns the ids of the neighbors of vertex id i in increasing order.
+
+        Uses the backend's cached sorted arrays, so that callers intersecting
+        neighborhoods can merge them.
+        """
+        return self.graph.sorted_neighbors(i)
 
     def degree(self, v) -> {int}:
         """Returns the degree of the vertex v in the graph.
@@ -237,7 +545,7 @@ class Graph:
         Returns:
         degree of v in the graph.
         """
-        return self.graph.degree(v)
+        return self.graph.degree(self.index.id(v))
 
     def weight(self, v0: int, v1: int):
         """Returns the weight of the edge between v0 and v1; None if no weight.
@@ -251,60 +559,954 @@ class Graph:
         Returns:
         The weight of the edge between v0 and v1; None if graph is unweighted.
         """
-        return self.graph.weight(v0, v1)
-
+        return self.graph.weight(self.index.id(v0), self.index.id(v1))
+
+    def weighted_edges(self):
+        """Iterates over the edges in the graph along with their weights.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
+        """
+        labels = self.index.labels
+        return ((Edge(labels[e.v0], labels[e.v1]), w)
+                for e, w in self.graph.weighted_edges())
+
+    def compact(self) -> 'CompactGraph':
+        """Returns the dense-indexed view of the graph.
+
+        The view is built on first use and cached until the graph changes.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the `CompactGraph` of this graph.
+        """
+        if self._compact is None:
+            self._compact = CompactGraph(self)
+        return self._compact
+
+    def summary(self) -> 'GraphSummary':
+        """Returns the degree statistics of the graph.
+
+        They are computed in one pass over the edges on first use and cached
+        until the graph changes.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the `GraphSummary` of this graph.
+        """
+        if self._summary is None:
+            self._summary = GraphSummary(self)
+        return self._summary
+
+    def _vertex_ids(self):
+        """Iterates over the ids of the vertices in the graph."""
+        return self.graph.vertices()
+
+    def _weighted_id_edges(self):
+        """Iterates over the edges in the graph, by vertex id, with their weights."""
+        return self.graph.weighted_edges()
+
+    def _component_index(self) -> (array, [int]):
+        """Returns the component id of every vertex and the size of every component.
+
+        The components are found with a union-find pass over the edges the first
+        time they are needed and are cached until the graph changes.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        an array of component ids indexed by vertex id, and a list of component
+        sizes indexed by component id.
+        """
+        if self._components is None:
+            parent = array('i', range(len(self.index)))
+
+            def root(v):
+                while parent[v] != v:
+                    parent[v] = parent[parent[v]]  # path halving
+                    v = parent[v]
+                return v
+
+            for e, _ in self._weighted_id_edges():
+                r0, r1 = root(e.v0), root(e.v1)
+                if r0 != r1:
+                    parent[r1] = r0
+            ids, sizes = array('i', parent), []
+            roots = {}
+            for v in self._vertex_ids():
+                r = root(v)
+                if r not in roots:
+                    roots[r] = len(sizes)
+                    sizes.append(0)
+                ids[v] = roots[r]
+                sizes[roots[r]] += 1
+            self._components = (ids, sizes)
+        return self._components
+
+    def component(self, v) -> int:
+        """Returns the id of the connected component containing v.
+
+        Component ids run from 0 to one less than the number of components.
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose component is sought.
+
+        Returns:
+        the component id of v.
+        """
+        return self._component_index()[0][self.index.id(v)]
+
+    def connected(self, v0, v1) -> bool:
+        """Returns whether a path exists between v0 and v1.
+
+        Errors if v0 or v1 is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the vertices to check.
+
+        Returns:
+        True if v0 and v1 are in the same connected component, False otherwise.
+        """
+        ids = self._component_index()[0]
+        return ids[self.index.id(v0)] == ids[self.index.id(v1)]
+
+    def component_sizes(self) -> {int: int}:
+        """Returns the distribution of the sizes of the connected components.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from component size to the number of components of that size.
+        """
+        distribution = {}
+        for size in self._component_index()[1]:
+            distribution[size] = distribution.get(size, 0) + 1
+        return distribution
+
+    def subgraph(self, vertices) -> 'SubgraphView':
+        """Returns the subgraph induced by vertices.
+
+        The subgraph is a view sharing this graph's storage; nothing is copied.
+
+        Args:
+        - self: the instance to operate on.
+        - vertices: the vertices of the subgraph; those not in the graph are
+          ignored.
+
+        Returns:
+        a view of the vertices and the edges between them.
+        """
+        return SubgraphView(self, (self.index.id(v) for v in vertices
+                                   if self.has_vertex(v)))
+
+    def k_hop(self, v, k: int) -> 'SubgraphView':
+        """Returns the subgraph induced by the vertices within k hops of v.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex at the center.
+        - k: the most edges on a path from v to a vertex of the subgraph.
+
+        Returns:
+        a view of the k-hop neighborhood of v.
+        """
+        reached = {v}
+        frontier = [v]
+        for _ in range(k):
+            following = []
+            for u in frontier:
+                for n in self.neighbors(u):
+                    if n not in reached:
+                        reached.add(n)
+                        following.append(n)
+            frontier = following
+        return self.subgraph(reached)
+
+    def ego_network(self, v, center: bool = True) -> 'SubgraphView':
+        """Returns the ego network of v: v, its neighbors and the edges between them.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the ego.
+        - center: whether to include v itself.
+
+        Returns:
+        a view of the ego network of v.
+        """
+        ego = self.k_hop(v, 1)
+        if center:
+            return ego
+        return self.subgraph(u for u in ego.vertices() if u != v)
+
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by each structure holding the graph.
+
+        Covers the backend's structures, the vertex index, and any derived
+        structures built so far, e.g. the compact view.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = dict(self.graph.memory_usage())
+        usage['index'] = sys.getsizeof(self.index.labels)
+        if self.index._added:
+            usage['index'] += _sizeof_all(self.index._added)
+        if self._compact is not None and not self._compact.shared:
+            usage['compact'] = sum(
+                sys.getsizeof(a) for a in (self._compact.offsets,
+                                           self._compact.targets,
+                                           self._compact.weights)
+                if a is not None)
+        if self._components is not None:
+            usage['components'] = (sys.getsizeof(self._components[0]) +
+                                   _sizeof_all(self._components[1]))
+        return usage
+
+
+class SubgraphView(Graph):
+    """ An induced subgraph that shares the storage of the graph it is taken from.
+
+    Only the ids of its vertices are kept; every query goes to the parent's
+    backend and leaves out vertices and edges outside the subgraph. Views
+    support every `Graph` method, so `NetworkOperations` run on them directly.
+    """
+
+    def __init__(self, parent: Graph, ids):
+        """Creates view of the subgraph of parent induced by the vertex ids.
+
+        Args:
+        - self: the instance to create.
+        - parent: the graph, or view, to take the subgraph of.
+        - ids: the vertex ids of the subgraph, as given by parent's index.
+
+        Returns:
+        nothing.
+        """
+        self.graph = parent.graph
+        self.index = parent.index
+        self.members = frozenset(ids)
+        self._clear_caches()
+
+    def apply(self, delta: 'EdgeDelta') -> None:
+        """Views cannot be changed; apply delta to the graph they were taken from."""
+        assert False, 'subgraph views are read-only'
+
+    def _vertex_ids(self):
+        """Iterates over the ids of the vertices in the subgraph."""
+        return iter(sorted(self.members))
+
+    def _weighted_id_edges(self):
+        """Iterates over the edges in the subgraph, by vertex id, with their weights."""
+        members = self.members
+        for v in sorted(members):
+            for n in self.graph.neighbors(v):
+                if v < n and n in members:
+                    yield Edge(v, n), self.graph.weight(v, n)
+
+    def vertices(self):
+        """Iterates over the vertices in the subgraph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        vertices in the subgraph.
+        """
+        labels = self.index.labels
+        return (labels[v] for v in self._vertex_ids())
+
+    def edges(self) -> {Edge}:
+        """Iterates over the edges in the subgraph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        edges in the subgraph.
+        """
+        return (edge for edge, _ in self.weighted_edges())
+
+    def weighted_edges(self):
+        """Iterates over the edges in the subgraph along with their weights.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
+        """
+        labels = self.index.labels
+        return ((Edge(labels[e.v0], labels[e.v1]), w)
+                for e, w in self._weighted_id_edges())
+
+    def vertex_count(self) -> int:
+        """Returns the number of vertices in the subgraph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the number of vertices in the subgraph.
+        """
+        return len(self.members)
+
+    def edge_count(self) -> int:
+        """Returns the number of edges in the subgraph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the number of edges in the subgraph.
+        """
+        return sum(self.degree(v) for v in self.vertices()) // 2
+
+    def has_vertex(self, v) -> bool:
+        """Returns whether v is a vertex in the subgraph.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex to check.
+
+        Returns:
+        True if v is a vertex in the subgraph, False otherwise.
+        """
+        return v in self.index and self.index.id(v) in self.members
+
+    def has_edge(self, v0, v1) -> bool:
+        """Returns whether the subgraph contains an edge between v0 and v1.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: does an edge exist between vertices v0 and v1 in the subgraph?
+
+        Returns:
+        True if an edge exists between v0 and v1 in the subgraph, False otherwise.
+        """
+        assert self.has_vertex(v0) and self.has_vertex(v1), \
+            f'one or more of {v0} and {v1} are not valid vertices'
+        return self.graph.has_edge(self.index.id(v0), self.index.id(v1))
+
+    def neighbors(self, v):
+        """Iterates over the neighbors of the vertex v in the subgraph.
+
+        Errors if v is not in the subgraph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the subgraph are sought.
+
+        Returns:
+        nothing.
+
+        Yields:
+        neighbors of v in the subgraph.
+        """
+        assert self.has_vertex(v), f'{v} is not a valid vertex'
+        labels, members = self.index.labels, self.members
+        return (labels[n] for n in self.graph.neighbors(self.index.id(v))
+                if n in members)
+
+    def sorted_neighbors(self, v) -> [int]:
+        """Returns the neighbors of v in the subgraph in increasing order.
+
+        Errors if v is not in the subgraph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the subgraph are sought.
+
+        Returns:
+        a list of the neighbors of v.
+        """
+        assert self.has_vertex(v), f'{v} is not a valid vertex'
+        return super().sorted_neighbors(v)
+
+    def _sorted_neighbor_ids(self, i: int):
+        """Returns the ids of the neighbors of vertex id i in the subgraph in
+        increasing order."""
+        members = self.members
+        return [n for n in self.graph.sorted_neighbors(i) if n in members]
+
+    def degree(self, v) -> {int}:
+        """Returns the degree of the vertex v in the subgraph.
+
+        Errors if v is not in the subgraph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: its degree in the subgraph is to be returned.
+
+        Returns:
+        degree of v in the subgraph.
+        """
+        return sum(1 for _ in self.neighbors(v))
+
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by the structures of the view itself.
+
+        The storage shared with the parent graph is not counted.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = Graph.memory_usage(self)
+        for name in self.graph.memory_usage():
+            del usage[name]
+        del usage['index']
+        usage['members'] = _sizeof_all(self.members)
+        return usage
+
+
+# ----------------------------------------------------GraphSummary----------------------------------------------------------------- #
+
+class GraphSummary:
+    """ Degree statistics of a graph, gathered in a single pass over its edges.
+
+    Attributes:
+    - vertex_count, edge_count: the size of the graph.
+    - max_degree, min_degree, mean_degree: statistics of the vertex degrees.
+    - histogram: a dict from degree to the number of vertices of that degree.
+    - hubs: the vertices of maximum degree.
+    - density: the fraction of possible edges present.
+    - assortativity: the Pearson correlation of the degrees at the two ends of
+      the edges; nan if every edge joins vertices of equal degree.
+    """
+
+    def __init__(self, g: Graph):
+        """Creates summary of g.
+
+        Args:
+        - self: the instance to create.
+        - g: the graph to summarize.
+
+        Returns:
+        nothing.
+        """
+        self._index = g.index
+        self.degrees = array('i', bytes(4 * len(g.index)))
+        ends = array('i')
+        for edge, _ in g._weighted_id_edges():
+            self.degrees[edge.v0] += 1
+            self.degrees[edge.v1] += 1
+            ends.append(edge.v0)
+            ends.append(edge.v1)
+
+        ids = list(g._vertex_ids())
+        self.vertex_count = len(ids)
+        self.edge_count = len(ends) // 2
+        self.histogram = {}
+        for v in ids:
+            d = self.degrees[v]
+            self.histogram[d] = self.histogram.get(d, 0) + 1
+        self.max_degree = max(self.histogram, default=0)
+        self.min_degree = min(self.histogram, default=0)
+        n = self.vertex_count
+        self.mean_degree = 2 * self.edge_count / n if n else 0.0
+        self.density = 2 * self.edge_count / (n * (n - 1)) if n > 1 else 0.0
+        labels = g.index.labels
+        self.hubs = sorted(labels[v] for v in ids
+                           if self.degrees[v] == self.max_degree)
+
+        # Newman's degree assortativity over the two ends of every edge
+        products = sums = squares = 0
+        for k in range(0, len(ends), 2):
+            j, l = self.degrees[ends[k]], self.degrees[ends[k + 1]]
+            products += j * l
+            sums += j + l
+            squares += j * j + l * l
+        m = self.edge_count
+        if m:
+            mean = sums / (2 * m)
+            variance = squares / (2 * m) - mean * mean
+            self.assortativity = ((products / m - mean * mean) / variance
+                                  if variance > 1e-12 else math.nan)
+        else:
+            self.assortativity = math.nan
+
+    def degree(self, v) -> int:
+        """Returns the degree of the vertex v.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose degree is sought.
+
+        Returns:
+        the degree of v.
+        """
+        return self.degrees[self._index.id(v)]
+
+
+# ----------------------------------------------------CompactGraph----------------------------------------------------------------- #
+
+class CompactGraph:
+    """ A read-only view of a graph with its vertices numbered 0 to n - 1.
+
+    The vertex ids are those of the graph's `VertexIndex`. The adjacency is
+    stored in compressed sparse row form: the neighbors of vertex i are
+    targets[offsets[i]:offsets[i + 1]], and the weights of the corresponding
+    edges are at the same positions in weights. Kernels that visit every
+    vertex or edge run over these flat arrays instead of the backend of the
+    graph. The view of a frozen graph shares the read-only arrays of its
+    backend, which are laid out the same way.
+    """
+
+    def __init__(self, g: Graph):
+        """Creates the dense-indexed view of g.
+
+        Args:
+        - self: the instance to create.
+        - g: the graph to view.
+
+        Returns:
+        nothing.
+        """
+        self.n = g.vertex_count()
+        self.weighted = g.has_weights()
+        if self.n == len(g.index) and g.index.ordered:
+            self.index = g.index
+            remap = range(self.n)
+        else:
+            # a subgraph view, or a graph grown by `Graph.apply`; number its
+            # vertices afresh in label order
+            self.index = VertexIndex(g.vertices())
+            remap = dict(zip(g._vertex_ids(), map(self.index.id, g.vertices())))
+        self.labels = self.index.labels
+        if isinstance(g.graph, FrozenGraph) and isinstance(remap, range):
+            # the frozen backend already holds these rows, sorted; share its
+            # read-only arrays rather than copying them
+            self.offsets = g.graph.offsets
+            self.targets = g.graph.targets
+            self.weights = g.graph.weights
+            return
+        adjacency = [[] for _ in range(self.n)]
+        for edge, w in g._weighted_id_edges():
+            v0, v1 = remap[edge.v0], remap[edge.v1]
+            adjacency[v0].append((v1, w))
+            adjacency[v1].append((v0, w))
+        self.offsets = array('l', [0])
+        self.targets = array('i')
+        self.weights = array(g.graph.weight_typecode) if self.weighted else None
+        for nbrs in adjacency:
+            nbrs.sort()
+            self.targets.extend(j for j, _ in nbrs)
+            if self.weighted:
+                self.weights.extend(w for _, w in nbrs)
+            self.offsets.append(len(self.targets))
+
+    def __getstate__(self) -> dict:
+        """Returns the attributes, with read-only arrays shared with a frozen
+        graph as bytes, since memoryviews cannot be pickled."""
+        state = dict(self.__dict__)
+        for name in ('offsets', 'targets', 'weights'):
+            if isinstance(state[name], memoryview):
+                state[name] = (state[name].format, state[name].obj)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the attributes from `__getstate__`."""
+        for name in ('offsets', 'targets', 'weights'):
+            if isinstance(state[name], tuple):
+                typecode, data = state[name]
+                state[name] = memoryview(data).cast(typecode)
+        self.__dict__.update(state)
+
+    @property
+    def shared(self) -> bool:
+        """Does the view share the arrays of a frozen graph's backend?"""
+        return isinstance(self.targets, memoryview)
+
+    def neighbors(self, i: int):
+        """Returns the ids of the neighbors of vertex i in increasing order.
+
+        Args:
+        - self: the instance to operate on.
+        - i: the vertex id whose neighbors are sought.
+
+        Returns:
+        an array of vertex ids.
+        """
+        return self.targets[self.offsets[i]:self.offsets[i + 1]]
+
+    def degree(self, i: int) -> int:
+        """Returns the degree of vertex i.
+
+        Args:
+        - self: the instance to operate on.
+        - i: the vertex id whose degree is sought.
+
+        Returns:
+        the degree of vertex i.
+        """
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def edge_weights(self, i: int):
+        """Returns the weights of the edges of vertex i, aligned with `neighbors(i)`.
+
+        Args:
+        - self: the instance to operate on.
+        - i: the vertex id whose edge weights are sought.
+
+        Returns:
+        an array of weights; all 1 if the graph is unweighted.
+        """
+        if self.weighted:
+            return self.weights[self.offsets[i]:self.offsets[i + 1]]
+        return [1] * self.degree(i)
+
+
+# ----------------------------------------------------AdjacencyList----------------------------------------------------------------- #
+
+class AdjacencyList():
+    def __init__(self, n: int, src, dst, weights):
+        """Creates graph on vertices 0 to n - 1 with the given edges.
+
+        Edge i joins src[i] and dst[i] and, if weights is not None, has weight
+        weights[i]. The neighbors of each vertex are kept in an array of ids,
+        with the weights of the edges in a parallel array.
+
+        Args:
+        self: the instance to create.
+        n: the number of vertices.
+        src, dst: the endpoints of each edge.
+        weights: the weight of each edge; None if the graph is unweighted.
+
+        Returns:
+        nothing."""
+        self.weighted = weights is not None  # bool for weighted graphs
+        self.weight_typecode = weights.typecode if self.weighted else None
+        self.sorted_adjacency = {}  # sorted neighbor ids by vertex, built on first use
+
+        self.adjacency = [array('i') for _ in range(n)]
+        self.edge_weights = ([array(self.weight_typecode) for _ in range(n)]
+                             if self.weighted else None)
+
+        for i in range(len(src)):
+            self.adjacency[src[i]].append(dst[i])
+            self.adjacency[dst[i]].append(src[i])
+            if self.weighted:
+                self.edge_weights[src[i]].append(weights[i])
+                self.edge_weights[dst[i]].append(weights[i])
+
+    def vertices(self):
+        """Iterates over the vertices in the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        vertices in the graph.
+        """
+        return iter(range(len(self.adjacency)))
+
+    def edges(self) -> {Edge}:
+        """Iterates over the edges in the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        vertices in the graph.
+        """
+        # every edge is listed under both endpoints; yield it from the lower one
+        for vertex, neighbors in enumerate(self.adjacency):
+            for neighbor in neighbors:
+                if vertex < neighbor:
+                    yield Edge(vertex, neighbor)
+
+    def weighted_edges(self):
+        """Iterates over the edges in the graph along with their weights.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
+        """
+        for vertex, neighbors in enumerate(self.adjacency):
+            for k, neighbor in enumerate(neighbors):
+                if vertex < neighbor:
+                    yield (Edge(vertex, neighbor),
+                           self.edge_weights[vertex][k] if self.weighted else 1)
+
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by each structure holding the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = {'adjacency': _sizeof_all(self.adjacency)}
+        if self.weighted:
+            usage['edge_weights'] = _sizeof_all(self.edge_weights)
+        if self.sorted_adjacency:
+            usage['sorted_neighbors'] = (_sizeof_all(self.sorted_adjacency) + sum(
+                sys.getsizeof(nbrs) for nbrs in self.sorted_adjacency.values()))
+        return usage
+
+    def vertex_count(self) -> int:
+        """Returns the number of vertices in the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the number of vertices in the graph.
+        """
+        return len(self.adjacency)
+
+    def edge_count(self) -> int:
+        """Returns the number of edges in the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the number of edges in the graph.
+        """
+        return sum(len(neighbors) for neighbors in self.adjacency) // 2
+
+    def has_vertex(self, v) -> bool:
+        """Returns whether v is a vertex in the graph.
+
+        Args:
+        - self: the instance to operate on.
+        - v: its neighbors in the graph are to be returned.
+
+        Returns:
+        True if v is a vertex in the graph, False otherwise.
+        """
+        return 0 <= v < len(self.adjacency)
+
+    def has_edge(self, v0, v1) -> bool:
+        """Returns whether the grpah contains an edge between v0 and v1.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: does an edge exist between vertices v0 and v1 in the graph?
+
+        Returns:
+        True if an edge exists between v0 and v1 in the graph, False otherwise.
+        """
+        # scan the shorter of the two adjacency lists
+        if len(self.adjacency[v1]) < len(self.adjacency[v0]):
+            v0, v1 = v1, v0
+        return v1 in self.adjacency[v0]
+
+    def has_weights(self) -> bool:
+        """Returns whether the graph is weighted.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        True if the graph edges are weighted, False otherwise.
+        """
+        return self.weighted
+
+    def neighbors(self, v):
+        """Iterates over the neighbors of the vertex v in the graph.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        nothing.
+
+        Yields:
+        neighbors of v in the graph.
+        """
+        return iter(self.adjacency[v])
+
+    def sorted_neighbors(self, v):
+        """Returns the neighbors of the vertex v in increasing order.
+
+        The array is built on the first call for v and kept for later ones,
+        until an edge of v is added or removed.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        an array of vertex ids.
+        """
+        nbrs = self.sorted_adjacency.get(v)
+        if nbrs is None:
+            nbrs = self.sorted_adjacency[v] = array('i', sorted(self.adjacency[v]))
+        return nbrs
+
+    def degree(self, v) -> {int}:
+        """Returns the degree of the vertex v in the graph.
+
+        Errors if v is not in the graph. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v: its degree in the graph is to be returned.
+
+        Returns:
+        degree of v in the graph.
+        """
+        return len(self.adjacency[v])
+
+    def weight(self, v0: int, v1: int):
+        """Returns the weight of the edge between v0 and v1; None if no weight.
+
+        Assumes the presence of the edge between v0 and v1. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the weight of the edge between v0 and v1 is sought.
+
+        Returns:
+        The weight of the edge between v0 and v1; None if graph is unweighted.
+        """
+        if not self.weighted:
+            return 1
+        if len(self.adjacency[v1]) < len(self.adjacency[v0]):
+            v0, v1 = v1, v0
+        return self.edge_weights[v0][self.adjacency[v0].index(v1)]
+
+    def add_vertex(self) -> int:
+        """Adds a vertex without edges.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        the id of the new vertex, the next after the existing ones.
+        """
+        self.adjacency.append(array('i'))
+        if self.weighted:
+            self.edge_weights.append(array(self.weight_typecode))
+        return len(self.adjacency) - 1
+
+    def add_edge(self, v0: int, v1: int, w=1) -> None:
+        """Adds an edge between v0 and v1 with weight w.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of the edge, which must not exist yet.
+        - w: the weight of the edge; ignored if the graph is unweighted.
+
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        self.adjacency[v0].append(v1)
+        self.adjacency[v1].append(v0)
+        if self.weighted:
+            self.edge_weights[v0].append(w)
+            self.edge_weights[v1].append(w)
+
+    def remove_edge(self, v0: int, v1: int) -> None:
+        """Removes the edge between v0 and v1.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of an existing edge.
+
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        for a, b in ((v0, v1), (v1, v0)):
+            i = self.adjacency[a].index(b)
+            self.adjacency[a].pop(i)
+            if self.weighted:
+                self.edge_weights[a].pop(i)
 
-# ----------------------------------------------------AdjacencyList----------------------------------------------------------------- #
+# ----------------------------------------------------AdjacencyMatrix----------------------------------------------------------------- #
+class AdjacencyMatrix():
 
-class AdjacencyList():
-    def __init__(self, edges: str):
-        """Creates graph with the given edges
+    def __init__(self, n: int, src, dst, weights):
+        """Creates graph on vertices 0 to n - 1 with the given edges.
 
-        edges consists of multiple lines representing an edge list
-        representation of the graph. Each line contains 2 vertices and an
-        optional weight. All values in a line are separated by spaces. The vertices have integer values
-        and the optional weight is a float. The vertices need not begin at 0.
+        Edge i joins src[i] and dst[i] and, if weights is not None, has weight
+        weights[i]. Row v of the matrix holds the weight of the edge from v to
+        every vertex, 0 where there is none; unweighted rows are bytearrays of
+        0/1 flags. Edges whose weight is 0 are also kept, packed, in a set, so
+        that they are not mistaken for missing ones.
 
         Args:
         self: the instance to create.
-        edges: an edge list representation of the graph
+        n: the number of vertices.
+        src, dst: the endpoints of each edge.
+        weights: the weight of each edge; None if the graph is unweighted.
 
         Returns:
-        nothing."""
-        self.weighted = False  # bool for weighted graphs
-
-        self.graph_dict = {}
-
-        for edge in edges.splitlines():
-            if len(edge.strip().split()) == 3:
-                self.weighted = True
-            break
+        nothing.
+        """
+        self.weighted = weights is not None
+        self.weight_typecode = weights.typecode if self.weighted else None
+        self.sorted_adjacency = {}  # sorted neighbor ids by vertex, built on first use
+        if self.weighted:
+            zeros = array(self.weight_typecode, [0]) * n
+            self.d = [array(self.weight_typecode, zeros) for _ in range(n)]
+        else:
+            self.d = [bytearray(n) for _ in range(n)]
+        self.zeros = set()
 
-        for edge in edges.splitlines():
-            # storing edges in lst after removing spaces, \n etc
-            if edge == '':
-                continue
-            new_edge = edge.strip().split()
-            if self.weighted == True:
-                new_edge = [float(i) for i in new_edge]
-                if new_edge[0] not in self.graph_dict.keys():
-                    self.graph_dict[new_edge[0]] = [[Edge(new_edge[0], new_edge[1]), new_edge[2]]]
-                else:
-                    self.graph_dict[new_edge[0]] = self.graph_dict[new_edge[0]] + [[Edge(new_edge[0], new_edge[1]), new_edge[2]]]
-                if new_edge[1] not in self.graph_dict.keys():
-                    self.graph_dict[new_edge[1]] = [[Edge(new_edge[1], new_edge[0]), new_edge[2]]]
-                else:
-                    self.graph_dict[new_edge[1]] = self.graph_dict[new_edge[1]] + [[Edge(new_edge[0], new_edge[1]), new_edge[2]]]
-            else:
-                new_edge = [int(i) for i in new_edge]
-                if new_edge[0] not in self.graph_dict.keys():
-                    self.graph_dict[new_edge[0]] = [Edge(new_edge[0], new_edge[1])]
-                else:
-                    self.graph_dict[new_edge[0]] = self.graph_dict[new_edge[0]] + [Edge(new_edge[0], new_edge[1])]
-                if new_edge[1] not in self.graph_dict.keys():
-                    self.graph_dict[new_edge[1]] = [Edge(new_edge[1], new_edge[0])]
-                else:
-                    self.graph_dict[new_edge[1]] = self.graph_dict[new_edge[1]] + [Edge(new_edge[0], new_edge[1])]
+        for i in range(len(src)):
+            # since the graph is undirected, we fill both rows.
+            w = weights[i] if self.weighted else 1
+            self.d[src[i]][dst[i]] = w
+            self.d[dst[i]][src[i]] = w
+            if w == 0:
+                self.zeros.add(_edge_key(src[i], dst[i]))
 
     def vertices(self):
         """Iterates over the vertices in the graph.
@@ -318,8 +1520,7 @@ class AdjacencyList():
         Yields:
         vertices in the graph.
         """
-        for vertex in self.graph_dict.keys():
-            yield vertex
+        return iter(range(len(self.d)))
 
     def edges(self) -> {Edge}:
         """Iterates over the edges in the graph.
@@ -333,14 +1534,43 @@ class AdjacencyList():
         Yields:
         vertices in the graph.
         """
-        edge_count = []
-        for edge in self.graph_dict.values():
-            if edge not in edge_count:
-                edge_count.append(edge)
-                if self.weighted != True:
-                    yield edge
-                else:
-                    yield edge[0]
+        return (edge for edge, _ in self.weighted_edges())
+
+    def weighted_edges(self):
+        """Iterates over the edges in the graph along with their weights.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
+        """
+        for v, row in enumerate(self.d):
+            # each edge is stored in both rows; yield it from the first
+            for other in range(v + 1, len(row)):
+                if row[other] or (self.zeros and
+                                  _edge_key(v, other) in self.zeros):
+                    yield Edge(v, other), row[other] if self.weighted else 1
+
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by each structure holding the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = {'rows': _sizeof_all(self.d)}
+        if self.zeros:
+            usage['zeros'] = _sizeof_all(self.zeros)
+        if self.sorted_adjacency:
+            usage['sorted_neighbors'] = (_sizeof_all(self.sorted_adjacency) + sum(
+                sys.getsizeof(nbrs) for nbrs in self.sorted_adjacency.values()))
+        return usage
 
     def vertex_count(self) -> int:
         """Returns the number of vertices in the graph.
@@ -351,7 +1581,7 @@ class AdjacencyList():
         Returns:
         the number of vertices in the graph.
         """
-        return len(self.graph_dict.keys())
+        return len(self.d)
 
     def edge_count(self) -> int:
         """Returns the number of edges in the graph.
@@ -362,13 +1592,7 @@ class AdjacencyList():
         Returns:
         the number of edges in the graph.
         """
-        counted_edges = []
-        edge_sum = 0
-        for edge in self.graph_dict.values():
-            if edge not in counted_edges:
-                counted_edges.append(edge)
-                edge_sum += 1
-        return edge_sum
+        return sum(self.degree(v) for v in range(len(self.d))) // 2
 
     def has_vertex(self, v) -> bool:
         """Returns whether v is a vertex in the graph.
@@ -380,7 +1604,7 @@ class AdjacencyList():
         Returns:
         True if v is a vertex in the graph, False otherwise.
         """
-        return (v in self.graph_dict.keys())
+        return 0 <= v < len(self.d)
 
     def has_edge(self, v0, v1) -> bool:
         """Returns whether the grpah contains an edge between v0 and v1.
@@ -392,11 +1616,8 @@ class AdjacencyList():
         Returns:
         True if an edge exists between v0 and v1 in the graph, False otherwise.
         """
-
-        for edge in self.graph_dict.values():
-            if Edge(v0, v1) == edge or Edge(v0, v1) == edge[0]:
-                return True
-        return False
+        return self.d[v0][v1] != 0 or (bool(self.zeros) and
+                                       _edge_key(v0, v1) in self.zeros)
 
     def has_weights(self) -> bool:
         """Returns whether the graph is weighted.
@@ -424,15 +1645,33 @@ class AdjacencyList():
         Yields:
         neighbors of v in the graph.
         """
-        for edge in self.graph_dict[v]:
-            if self.weighted != True:
-                yield edge.nbr(v)
-            else:
-                yield edge[0].nbr(v)
+        if self.zeros:
+            return (other for other, w in enumerate(self.d[v])
+                    if w or _edge_key(v, other) in self.zeros)
+        return (other for other, w in enumerate(self.d[v]) if w)
 
+    def sorted_neighbors(self, v):
+        """Returns the neighbors of the vertex v in increasing order.
+
+        The array is built on the first call for v and kept for later ones,
+        until an edge of v is added or removed.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        an array of vertex ids.
+        """
+        nbrs = self.sorted_adjacency.get(v)
+        if nbrs is None:
+            # the row is scanned in order, so the neighbors come sorted
+            nbrs = self.sorted_adjacency[v] = array('i', self.neighbors(v))
+        return nbrs
 
     def degree(self, v) -> {int}:
-        """Returns the degree of the vertex v in the graph.
+        """
+        Returns the degree of the vertex v in the graph.
 
         Errors if v is not in the graph. Check before calling.
 
@@ -443,106 +1682,103 @@ class AdjacencyList():
         Returns:
         degree of v in the graph.
         """
-        assert self.has_vertex(v), \
-            f'{v} is not a valid vertex'
-        return len(self.graph_dict[v])
+        degree = len(self.d[v]) - self.d[v].count(0)
+        if self.zeros:
+            degree += sum(1 for key in self.zeros
+                          if key >> 32 == v or key & 0xFFFFFFFF == v)
+        return degree
 
     def weight(self, v0: int, v1: int):
-        """Returns the weight of the edge between v0 and v1; None if no weight.
+        if self.weighted and self.has_edge(v0, v1):
+            return self.d[v0][v1]
+        return 1
 
-        Assumes the presence of the edge between v0 and v1. Check before calling.
+    def add_vertex(self) -> int:
+        """Adds a vertex without edges, growing every row by one column.
 
         Args:
         - self: the instance to operate on.
-        - v0, v1: the weight of the edge between v0 and v1 is sought.
 
         Returns:
-        The weight of the edge between v0 and v1; None if graph is unweighted.
+        the id of the new vertex, the next after the existing ones.
         """
-        given = Edge(v0, v1)
-        if self.weighted:
-            if len(self.graph_dict[v0]) < len(self.graph_dict[v1]):
-                vertex = v0
-            else:
-                vertex = v1
-            for edge in self.graph_dict[vertex]:
-                if given == edge[0]:
-                    return edge[1]
-        else:
-            return 1
-
-# ----------------------------------------------------AdjacencyMatrix----------------------------------------------------------------- #
-class AdjacencyMatrix():
-
-    def __init__(self, edges: str):
-        self.f = {}
-        self.d = {}
-        self.weighted = False
-        count_array = []
-        track = -1
-
-        for x in edges.splitlines():
-
-            if x == '':
-                continue
-
-            x = x.split()
-            x[0] = int(x[0])
-            x[1] = int(x[1])
+        for row in self.d:
+            row.append(0)
+        n = len(self.d) + 1
+        self.d.append(array(self.weight_typecode, [0]) * n if self.weighted
+                      else bytearray(n))
+        return n - 1
 
-            if len(x) == 3:
-                self.weighted = True
+    def add_edge(self, v0: int, v1: int, w=1) -> None:
+        """Adds an edge between v0 and v1 with weight w.
 
-            if x[0] not in count_array:
-                count_array.append(x[0])
-                track = track + 1
-                self.f[x[0]] = track
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of the edge, which must not exist yet.
+        - w: the weight of the edge; ignored if the graph is unweighted.
 
-            if x[1] not in count_array:
-                count_array.append(x[1])
-                track = track + 1
-                self.f[x[1]] = track
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        w = w if self.weighted else 1
+        self.d[v0][v1] = self.d[v1][v0] = w
+        if w == 0:
+            self.zeros.add(_edge_key(v0, v1))
 
-        a = [0] * (track + 2)
+    def remove_edge(self, v0: int, v1: int) -> None:
+        """Removes the edge between v0 and v1.
 
-        for h in self.f:
-            self.d[self.f[h]] = deepcopy(a)
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of an existing edge.
 
-        for i in edges.splitlines():
-            if i == '':
-                continue
-            o = i.split()
-            o[0] = int(o[0])
-            o[1] = int(o[1])
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        self.d[v0][v1] = self.d[v1][v0] = 0
+        self.zeros.discard(_edge_key(v0, v1))
 
-            val = self.f[o[0]]
-            keyval = self.d[val]
-            j = self.f[o[1]]
+# ----------------------------------------------------SetGraph----------------------------------------------------------------- #
 
-            if self.weighted == False:
+def _edge_key(v0: int, v1: int) -> int:
+    """Packs the endpoints of an edge, which are 32-bit vertex ids, into one int."""
+    return min(v0, v1) << 32 | max(v0, v1)
 
-                keyval[j] = 1
-                self.d[val] = keyval
 
-            if self.weighted == True:
-                keyval[j] = float(o[2])
-                self.d[val] = keyval
+class SetGraph():
 
-            # since the graph is undirected, we do the same for all the second column vertexes.
+    def __init__(self, n: int, src, dst, weights):
+        """Creates graph on vertices 0 to n - 1 with the given edges.
 
-            val2 = self.f[o[1]]
-            keyval2 = self.d[val2]
-            k = self.f[o[0]]
+        Edge i joins src[i] and dst[i] and, if weights is not None, has weight
+        weights[i]. The vertices and the edges are kept in two sets, each edge
+        packed into a single int; edge weights are kept in a dict by edge.
 
-            if self.weighted == False:
-                keyval2[k] = 1
-                self.d[val2] = keyval2
+        Args:
+        self: the instance to create.
+        n: the number of vertices.
+        src, dst: the endpoints of each edge.
+        weights: the weight of each edge; None if the graph is unweighted.
 
-            if self.weighted == True:
-                keyval2[k] = float(o[2])
-                self.d[val2] = keyval2
+        Returns:
+        nothing.
+        """
+        self.weighted = weights is not None
+        self.weight_typecode = weights.typecode if self.weighted else None
+        self.sorted_adjacency = {}  # sorted neighbor ids by vertex, built on first use
+        self.vert = set(range(n))
+        self.ed = set()
+        self.w = {}
 
-           
+        for i in range(len(src)):
+            key = _edge_key(src[i], dst[i])
+            self.ed.add(key)
+            if self.weighted:
+                self.w[key] = weights[i]
 
     def vertices(self):
         """Iterates over the vertices in the graph.
@@ -556,13 +1792,24 @@ class AdjacencyMatrix():
         Yields:
         vertices in the graph.
         """
+        return iter(self.vert)
 
-        for x in self.f:
+    def edges(self):
+        """Iterates over the edges in the graph.-> {Edge}
+        Args:
+        - self: the instance to operate on.
 
-            yield x
+        Returns:
+        nothing.
 
-    def edges(self) -> {Edge}:
-        """Iterates over the edges in the graph.
+        Yields:
+        vertices in the graph.
+        """
+        for key in self.ed:
+            yield Edge(key >> 32, key & 0xFFFFFFFF)
+
+    def weighted_edges(self):
+        """Iterates over the edges in the graph along with their weights.
 
         Args:
         - self: the instance to operate on.
@@ -571,20 +1818,30 @@ class AdjacencyMatrix():
         nothing.
 
         Yields:
-        vertices in the graph.
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
         """
-        for i in self.f.keys():
-            x = self.f[i]
+        for key in self.ed:
+            yield (Edge(key >> 32, key & 0xFFFFFFFF),
+                   self.w[key] if self.weighted else 1)
 
-            count = -1
-            lst = self.d[x]
-            for l in lst:
-                count = count + 1
-                if l:
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by each structure holding the graph.
+
+        Args:
+        - self: the instance to operate on.
 
-                    for key, value in self.f.items():
-                        if value == count:
-                            yield Edge(i, key)
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = {'vertices': _sizeof_all(self.vert), 'edges': _sizeof_all(self.ed)}
+        if self.weighted:
+            # the keys are the ints already counted in the edge set
+            usage['weights'] = _sizeof_all(self.w.values()) - sys.getsizeof(
+                self.w.values()) + sys.getsizeof(self.w)
+        if self.sorted_adjacency:
+            usage['sorted_neighbors'] = (_sizeof_all(self.sorted_adjacency) + sum(
+                sys.getsizeof(nbrs) for nbrs in self.sorted_adjacency.values()))
+        return usage
 
     def vertex_count(self) -> int:
         """Returns the number of vertices in the graph.
@@ -595,12 +1852,7 @@ class AdjacencyMatrix():
         Returns:
         the number of vertices in the graph.
         """
-
-        c = 0
-        for k in self.f:
-            c = c + 1
-
-        return c
+        return len(self.vert)
 
     def edge_count(self) -> int:
         """Returns the number of edges in the graph.
@@ -611,32 +1863,19 @@ class AdjacencyMatrix():
         Returns:
         the number of edges in the graph.
         """
-        
-        e = 0
-        for value in self.d.values():
-            for i in value:
-                if i:
-                    e = e + 1
-        return e//2
+        return len(self.ed)
 
     def has_vertex(self, v) -> bool:
         """Returns whether v is a vertex in the graph.
 
-        Args:
+        Args:.
         - self: the instance to operate on.
         - v: its neighbors in the graph are to be returned.
 
         Returns:
         True if v is a vertex in the graph, False otherwise.
         """
-
-        if v in self.f.keys():
-            
-            return True
-
-        else:
-            
-            return False
+        return v in self.vert
 
     def has_edge(self, v0, v1) -> bool:
         """Returns whether the grpah contains an edge between v0 and v1.
@@ -648,22 +1887,7 @@ class AdjacencyMatrix():
         Returns:
         True if an edge exists between v0 and v1 in the graph, False otherwise.
         """
-        assert self.has_vertex(v0) and self.has_vertex(v1), \
-            f'one or more of {v0} and {v1} are not valid vertices'
-        
-
-        ver1 = self.f[v0]
-        
-        connections = self.d[ver1]
-        ver2 = self.f[v1]
-        
-        if connections[ver2]:
-            
-            return True
-
-        else:
-            
-            return False
+        return _edge_key(v0, v1) in self.ed
 
     def has_weights(self) -> bool:
         """Returns whether the graph is weighted.
@@ -691,15 +1915,30 @@ class AdjacencyMatrix():
         Yields:
         neighbors of v in the graph.
         """
-        count = -1
-        ver1 = self.f[v]
-        connections = self.d[ver1]
-        for i in connections:
-            count = count + 1
-            if i:
-                for key, value in self.f.items():
-                    if value == count:
-                        yield key
+        for key in self.ed:
+            v0, v1 = key >> 32, key & 0xFFFFFFFF
+            if v0 == v:
+                yield v1
+            elif v1 == v:
+                yield v0
+
+    def sorted_neighbors(self, v):
+        """Returns the neighbors of the vertex v in increasing order.
+
+        The array is built on the first call for v and kept for later ones,
+        until an edge of v is added or removed.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        an array of vertex ids.
+        """
+        nbrs = self.sorted_adjacency.get(v)
+        if nbrs is None:
+            nbrs = self.sorted_adjacency[v] = array('i', sorted(self.neighbors(v)))
+        return nbrs
 
     def degree(self, v) -> {int}:
         """
@@ -714,52 +1953,141 @@ class AdjacencyMatrix():
         Returns:
         degree of v in the graph.
         """
-        cnt = 0
-        i = self.d[self.f[v]]
-        for count in i:
-            if count:
-                cnt = cnt + 1
-        return cnt
+        degree = 0
+        for _ in self.neighbors(v):
+            degree = degree + 1
+        return degree
 
     def weight(self, v0: int, v1: int):
         if self.weighted and self.has_edge(v0, v1):
-            a = self.f[v0]
-            b = self.f[v1]
-            lst = self.d[a]
-            w = lst[b]
-
-            return w
+            return self.w[_edge_key(v0, v1)]
         return 1
 
-# ----------------------------------------------------SetGraph----------------------------------------------------------------- #
+    def add_vertex(self) -> int:
+        """Adds a vertex without edges.
 
-class SetGraph():
+        Args:
+        - self: the instance to operate on.
 
-    def __init__(self, edges: str):
-        self.vert = set()
-        self.ed = set()
-        self.graph = 0
-        self.weighted = False
-        self.vertcount = 0
+        Returns:
+        the id of the new vertex, the next after the existing ones.
+        """
+        v = len(self.vert)
+        self.vert.add(v)
+        return v
 
-        for x in edges.splitlines():
-            if x == '':
-                continue
-            x = x.split()
-            x[0] = int(x[0])
-            x[1] = int(x[1])
-            if len(x) == 3:
-                self.weighted = True
-                self.ed.add((Edge(x[0], x[1]), float(x[2])))
-            else:
-                self.ed.add((Edge(x[0], x[1]), 0))
+    def add_edge(self, v0: int, v1: int, w=1) -> None:
+        """Adds an edge between v0 and v1 with weight w.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of the edge, which must not exist yet.
+        - w: the weight of the edge; ignored if the graph is unweighted.
+
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        key = _edge_key(v0, v1)
+        self.ed.add(key)
+        if self.weighted:
+            self.w[key] = w
+
+    def remove_edge(self, v0: int, v1: int) -> None:
+        """Removes the edge between v0 and v1.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the endpoints of an existing edge.
+
+        Returns:
+        nothing.
+        """
+        self.sorted_adjacency.pop(v0, None)
+        self.sorted_adjacency.pop(v1, None)
+        key = _edge_key(v0, v1)
+        self.ed.discard(key)
+        self.w.pop(key, None)
+
+
+# ----------------------------------------------------FrozenGraph----------------------------------------------------------------- #
+
+def _readonly(values: array) -> memoryview:
+    """Returns a read-only view of a copy of the array values.
+
+    The copy is held in an immutable bytes object, so nothing can change it
+    while it is being read.
+    """
+    return memoryview(values.tobytes()).cast(values.typecode)
+
+
+class FrozenGraph():
+    """ An immutable graph in compressed sparse row form, safe to read from many threads.
+
+    The neighbors of vertex v are targets[offsets[v]:offsets[v + 1]] in
+    increasing order, with the weights of the edges at the same positions in
+    weights. The three arrays are read-only views of bytes objects, and no
+    method writes to the instance after it is created, so any number of
+    threads may query it at once without locks, on free-threaded builds too.
+    Iterators returned by its methods belong to the calling thread.
+    """
 
-            if x[0] not in self.vert:
-                self.vert.add(x[0])
-                self.vertcount = self.vertcount + 1
-            if x[1] not in self.vert:
-                self.vert.add(x[1])
-                self.vertcount = self.vertcount + 1
+    def __init__(self, n: int, src, dst, weights):
+        """Creates graph on vertices 0 to n - 1 with the given edges.
+
+        Edge i joins src[i] and dst[i] and, if weights is not None, has weight
+        weights[i].
+
+        Args:
+        self: the instance to create.
+        n: the number of vertices.
+        src, dst: the endpoints of each edge.
+        weights: the weight of each edge; None if the graph is unweighted.
+
+        Returns:
+        nothing.
+        """
+        self.weighted = weights is not None
+        self.weight_typecode = weights.typecode if self.weighted else None
+        adjacency = [[] for _ in range(n)]
+        for i in range(len(src)):
+            w = weights[i] if self.weighted else 1
+            adjacency[src[i]].append((dst[i], w))
+            adjacency[dst[i]].append((src[i], w))
+        offsets, targets = array('q', [0]), array('i')
+        edge_weights = array(self.weight_typecode or 'd')
+        for nbrs in adjacency:
+            nbrs.sort()
+            targets.extend(j for j, _ in nbrs)
+            if self.weighted:
+                edge_weights.extend(w for _, w in nbrs)
+            offsets.append(len(targets))
+        self.offsets = _readonly(offsets)
+        self.targets = _readonly(targets)
+        self.weights = _readonly(edge_weights) if self.weighted else None
+
+    def __getstate__(self) -> dict:
+        """Returns the arrays as bytes, since memoryviews cannot be pickled."""
+        return {name: (view.format, view.obj)
+                for name, view in (('offsets', self.offsets),
+                                   ('targets', self.targets),
+                                   ('weights', self.weights))
+                if view is not None}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restores the read-only views from the bytes of `__getstate__`."""
+        self.weighted = 'weights' in state
+        self.weight_typecode = state['weights'][0] if self.weighted else None
+        self.weights = None
+        for name, (typecode, data) in state.items():
+            setattr(self, name, memoryview(data).cast(typecode))
+
+    def _position(self, v0: int, v1: int) -> int:
+        """Returns the position of v1 among the neighbors of v0; -1 if absent."""
+        start, end = self.offsets[v0], self.offsets[v0 + 1]
+        k = bisect_left(self.targets, v1, start, end)
+        return k if k < end and self.targets[k] == v1 else -1
 
     def vertices(self):
         """Iterates over the vertices in the graph.
@@ -773,11 +2101,11 @@ class SetGraph():
         Yields:
         vertices in the graph.
         """
-        for v in self.vert:
-            yield v
+        return iter(range(len(self.offsets) - 1))
+
+    def edges(self) -> {Edge}:
+        """Iterates over the edges in the graph.
 
-    def edges(self):
-        """Iterates over the edges in the graph.-> {Edge}
         Args:
         - self: the instance to operate on.
 
@@ -787,8 +2115,43 @@ class SetGraph():
         Yields:
         vertices in the graph.
         """
-        for e in self.ed:
-            yield e[0]
+        return (e for e, _ in self.weighted_edges())
+
+    def weighted_edges(self):
+        """Iterates over the edges in the graph along with their weights.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+
+        Yields:
+        (edge, weight) pairs; the weight is 1 if the graph is unweighted.
+        """
+        offsets, targets = self.offsets, self.targets
+        for vertex in range(len(offsets) - 1):
+            # the neighbors are sorted, so those above vertex come last
+            end = offsets[vertex + 1]
+            for k in range(bisect_right(targets, vertex, offsets[vertex], end), end):
+                yield (Edge(vertex, targets[k]),
+                       self.weights[k] if self.weighted else 1)
+
+    def memory_usage(self) -> {str: int}:
+        """Returns the bytes taken by each structure holding the graph.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from structure name to its size in bytes.
+        """
+        usage = {'offsets': sys.getsizeof(self.offsets) + sys.getsizeof(self.offsets.obj),
+                 'targets': sys.getsizeof(self.targets) + sys.getsizeof(self.targets.obj)}
+        if self.weighted:
+            usage['weights'] = (sys.getsizeof(self.weights) +
+                                sys.getsizeof(self.weights.obj))
+        return usage
 
     def vertex_count(self) -> int:
         """Returns the number of vertices in the graph.
@@ -799,7 +2162,7 @@ class SetGraph():
         Returns:
         the number of vertices in the graph.
         """
-        return self.vertcount
+        return len(self.offsets) - 1
 
     def edge_count(self) -> int:
         """Returns the number of edges in the graph.
@@ -810,19 +2173,19 @@ class SetGraph():
         Returns:
         the number of edges in the graph.
         """
-        return len(self.ed)
+        return len(self.targets) // 2
 
     def has_vertex(self, v) -> bool:
         """Returns whether v is a vertex in the graph.
 
-        Args:.
+        Args:
         - self: the instance to operate on.
         - v: its neighbors in the graph are to be returned.
 
         Returns:
         True if v is a vertex in the graph, False otherwise.
         """
-        return v in self.vert
+        return 0 <= v < len(self.offsets) - 1
 
     def has_edge(self, v0, v1) -> bool:
         """Returns whether the grpah contains an edge between v0 and v1.
@@ -834,10 +2197,7 @@ class SetGraph():
         Returns:
         True if an edge exists between v0 and v1 in the graph, False otherwise.
         """
-        for i in self.ed:
-            if v0 in i[0] and i[0].nbr(v0) == v1:
-                return True
-        return False
+        return self._position(v0, v1) >= 0
 
     def has_weights(self) -> bool:
         """Returns whether the graph is weighted.
@@ -863,15 +2223,27 @@ class SetGraph():
         nothing.
 
         Yields:
-        neighbors of v in the graph.
+        neighbors of v in increasing order.
         """
-        for edge in self.ed:
-            if v in edge[0]:
-                yield edge[0].nbr(v)
+        return iter(self.targets[self.offsets[v]:self.offsets[v + 1]])
 
-    def degree(self, v) -> {int}:
+    def sorted_neighbors(self, v):
+        """Returns the neighbors of the vertex v in increasing order.
+
+        The rows are stored sorted, so this is a read-only view of one; nothing
+        is built or cached.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose neighbors in the graph are sought.
+
+        Returns:
+        a read-only array of vertex ids.
         """
-        Returns the degree of the vertex v in the graph.
+        return self.targets[self.offsets[v]:self.offsets[v + 1]]
+
+    def degree(self, v) -> {int}:
+        """Returns the degree of the vertex v in the graph.
 
         Errors if v is not in the graph. Check before calling.
 
@@ -882,15 +2254,438 @@ class SetGraph():
         Returns:
         degree of v in the graph.
         """
-        degree = 0
-        for edge in self.ed:
-            if v in edge[0]:
-                degree = degree + 1
-        return degree
+        return self.offsets[v + 1] - self.offsets[v]
 
     def weight(self, v0: int, v1: int):
-        if self.weighted and self.has_edge(v0, v1):
-            for x in self.ed:
-                if v0 in x[0] and x[0].nbr(v0) == v1:
-                    return x[1]
-        return 1
+        """Returns the weight of the edge between v0 and v1; None if no weight.
+
+        Assumes the presence of the edge between v0 and v1. Check before calling.
+
+        Args:
+        - self: the instance to operate on.
+        - v0, v1: the weight of the edge between v0 and v1 is sought.
+
+        Returns:
+        The weight of the edge between v0 and v1; None if graph is unweighted.
+        """
+        if not self.weighted:
+            return 1
+        return self.weights[self._position(v0, v1)]
+
+
+IMPLEMENTATIONS = {"sets": SetGraph, "matrix": AdjacencyMatrix,
+                   "list": AdjacencyList, "frozen": FrozenGraph}
+
+
+# ----------------------------------------------------Memory----------------------------------------------------------------- #
+
+def _sizeof_all(container) -> int:
+    """Returns the bytes taken by container and the objects in it.
+
+    Small ints are shared by the interpreter and are not counted.
+
+    Args:
+    - container: a list, set, or other iterable of objects.
+
+    Returns:
+    the size of container plus the sizes of its items in bytes.
+    """
+    return sys.getsizeof(container) + sum(
+        sys.getsizeof(item) for item in container
+        if not (type(item) is int and -5 <= item <= 256))
+
+
+def _set_table_bytes(n: int) -> int:
+    """Returns the bytes taken by the hash table of a set of n items.
+
+    Follows CPython's growth policy: the table is resized once it is 3/5 full,
+    to 4 times the items held (2 times beyond 50000 items).
+
+    Args:
+    - n: the number of items.
+
+    Returns:
+    the size of the set in bytes, excluding the items.
+    """
+    table = 8
+    while True:
+        used = -(-3 * (table - 1) // 5)  # fill that triggers the next resize
+        if n < used:
+            return sys.getsizeof(set()) - 8 * 16 + 16 * table
+        least = used * 4 if used <= 50000 else used * 2
+        while table <= least:
+            table <<= 1
+
+
+def _estimated_sizes(imp: str, n: int, m: int, weighted: bool) -> {str: int}:
+    """Returns the projected bytes of each structure of a graph before building it.
+
+    The estimates model the containers used by each backend and match the
+    keys of `Graph.memory_usage`.
+
+    Args:
+    - imp: the implementation to be used, as for `Graph()`.
+    - n, m: the number of vertices and edges.
+    - weighted: whether the edges have weights.
+
+    Returns:
+    a dict from structure name to its projected size in bytes.
+    """
+    list_bytes = sys.getsizeof([]) + 8 * n
+    array_bytes = sys.getsizeof(array('i'))
+    large_int = sys.getsizeof(1 << 40)
+    usage = {'index': array_bytes + 8 * n}
+    if imp == 'list':
+        # arrays grow by about 1/16 beyond what they hold
+        usage['adjacency'] = list_bytes + n * (array_bytes + 12) + 2 * m * 4 * 17 // 16
+        if weighted:
+            usage['edge_weights'] = (list_bytes + n * (array_bytes + 24) +
+                                     2 * m * 8 * 17 // 16)
+    elif imp == 'matrix':
+        row = (sys.getsizeof(array('d')) + 8 * n if weighted
+               else sys.getsizeof(bytearray()) + n)
+        usage['rows'] = list_bytes + n * row
+    elif imp == 'frozen':
+        view_bytes = sys.getsizeof(memoryview(b'')) + sys.getsizeof(b'')
+        usage['offsets'] = view_bytes + 8 * (n + 1)
+        usage['targets'] = view_bytes + 2 * m * 4
+        if weighted:
+            usage['weights'] = view_bytes + 2 * m * 8
+    elif imp == 'sets':
+        usage['vertices'] = (_set_table_bytes(n) +
+                             max(0, n - 257) * sys.getsizeof(1 << 20))
+        usage['edges'] = _set_table_bytes(m) + m * large_int
+        if weighted:
+            # a dict of m keys takes about 1.5 8-byte slots and 1 24-byte
+            # entry per item on top of its float
+            usage['weights'] = (sys.getsizeof({}) + m * (36 + 24) +
+                                m * sys.getsizeof(1.0))
+    return usage
+
+
+def _scan(path: str) -> (int, int, bool):
+    """Counts the vertices and edges in an edge list file without parsing it.
+
+    Args:
+    - path: the edge list file to scan.
+
+    Returns:
+    the number of distinct vertex labels, the number of edges, and whether any
+    line has a weight.
+    """
+    labels = set()
+    m = 0
+    weighted = False
+    with open(path, 'rb') as f:
+        for line in f:
+            fields = line.split()
+            if not fields:
+                continue
+            labels.update(fields[:2])
+            m += 1
+            weighted = weighted or len(fields) == 3
+    return len(labels), m, weighted
+
+
+def estimate_memory(path: str, imp: str) -> {str: int}:
+    """Returns the projected bytes of each structure of the graph in the file at path.
+
+    The file is only scanned for its sizes, so this is much cheaper than
+    loading it.
+
+    Args:
+    - path: the edge list file to be loaded.
+    - imp: the implementation to be used, as for `Graph()`.
+
+    Returns:
+    a dict from structure name to its projected size in bytes.
+    """
+    assert imp in IMPLEMENTATIONS, f'unknown implementation {imp}'
+    return _estimated_sizes(imp, *_scan(path))
+
+
+# ----------------------------------------------------Loading----------------------------------------------------------------- #
+
+def _chunk_bounds(path: str, chunks: int) -> [(int, int)]:
+    """Splits the file at path into byte ranges that start and end on line boundaries.
+
+    Args:
+    - path: the edge list file to split.
+    - chunks: the number of ranges sought; fewer are returned for small files.
+
+    Returns:
+    a list of (start, end) byte offsets covering the whole file.
+    """
+    size = os.path.getsize(path)
+    starts = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, chunks):
+            f.seek(max(size * i // chunks, starts[-1]))
+            f.readline()  # move to the start of the next full line
+            if f.tell() >= size:
+                break
+            if f.tell() > starts[-1]:
+                starts.append(f.tell())
+    return list(zip(starts, starts[1:] + [size]))
+
+
+def _parse_chunk(task):
+    """Parses the edges in one byte range of an edge list file.
+
+    Vertex labels are interned to ids local to the chunk so that only compact
+    arrays are sent back from the worker process.
+
+    Args:
+    - task: a (path, start, end) tuple.
+
+    Returns:
+    a (labels, src, dst, weights) tuple as for `_parse_lines`.
+    """
+    path, start, end = task
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return _parse_lines(data.split(b'\n'))
+
+
+def _parse_lines(lines):
+    """Parses the edges in the given lines of an edge list.
+
+    Vertex labels are interned to ids local to the lines, in order of first
+    appearance. Self-loops are skipped, so a weight given only on a loop does
+    not make the lines weighted; repeated edges are left to `Graph.from_arrays`.
+
+    Args:
+    - lines: the lines to parse, as str or bytes.
+
+    Returns:
+    a (labels, src, dst, weights) tuple: the labels of the vertices by local
+    id, the local ids of the endpoints of each edge, and the weights of the
+    edges (None if no line has a weight; 1 for lines without one otherwise).
+    """
+    ids = {}
+    src, dst, weights = array('l'), array('l'), array('d')
+    weighted = False
+    for line in lines:
+        fields = line.split()
+        if not fields:
+            continue
+        v0, v1 = int(fields[0]), int(fields[1])
+        if v0 == v1:
+            continue
+        src.append(ids.setdefault(v0, len(ids)))
+        dst.append(ids.setdefault(v1, len(ids)))
+        if len(fields) == 3:
+            if not weighted:
+                # earlier lines had no weight
+                weights.extend([1.0] * (len(src) - 1))
+                weighted = True
+            weights.append(float(fields[2]))
+        elif weighted:
+            weights.append(1.0)
+    return array('q', ids), src, dst, weights if weighted else None
+
+
+def _simple_edges(src, dst, weights):
+    """Drops self-loops and repeated edges, so that every backend stores the
+    same simple graph.
+
+    A pair of vertices listed more than once, in either order, keeps the
+    weight of its last listing.
+
+    Args:
+    - src, dst, weights: as for `Graph.from_arrays`.
+
+    Returns:
+    the (src, dst, weights) of the remaining edges; the arrays given if none
+    were dropped.
+    """
+    last = {}
+    for i in range(len(src)):
+        if src[i] != dst[i]:
+            last[_edge_key(src[i], dst[i])] = i
+    if len(last) == len(src):
+        return src, dst, weights
+    keep = sorted(last.values())
+    return (array('l', (src[i] for i in keep)), array('l', (dst[i] for i in keep)),
+            None if weights is None else array('d', (weights[i] for i in keep)))
+
+
+# weight array types, narrowest first: int32, float32, float64
+WEIGHT_TYPECODES = ('i', 'f', 'd')
+
+
+def _fits_weight(typecode: str, w) -> bool:
+    """Returns whether an array of typecode holds the weight w exactly."""
+    if typecode == 'i':
+        return float(w).is_integer() and -2 ** 31 <= w < 2 ** 31
+    return array(typecode, [w])[0] == w
+
+
+def _typed_weights(weights):
+    """Returns the edge weights in the narrowest array type holding them all exactly.
+
+    Whole numbers within 32 bits are stored as ints, and values that are
+    exactly float32, e.g. halves and quarters, as float32; anything else stays
+    float64. The type is chosen once per graph, so that every weight lookup is
+    a read from one homogeneous array, and whole-number weights are read as
+    small ints rather than boxed floats.
+
+    Args:
+    - weights: the weight of each edge; None if the graph is unweighted.
+
+    Returns:
+    an array of the weights, or None if weights is None.
+    """
+    if weights is None:
+        return None
+    if not isinstance(weights, array) or weights.typecode != 'd':
+        weights = array('d', weights)
+    if all(_fits_weight('i', w) for w in weights):
+        return array('i', map(int, weights))
+    narrow = array('f', weights)
+    if array('d', narrow) == weights:
+        return narrow
+    return weights
+
+
+def load_edge_list(path: str, imp: str, workers: int = None,
+                   budget: int = None, downgrade: bool = False) -> Graph:
+    """Creates graph from the edge list file at path, parsing it on several cores.
+
+    The file is split into byte ranges aligned to line boundaries which are
+    parsed in a pool of worker processes. The chunks are then merged by
+    remapping their local vertex ids to global ones, and the graph is built
+    from the merged arrays with the specified implementation. The file format
+    is as for `Graph()`; lines without a weight in a weighted file get weight 1.
+
+    If a memory budget is given, the size of the graph is projected from a scan
+    of the file first. A graph projected to exceed the budget is not loaded
+    and MemoryError is raised, unless downgrade is set and another
+    implementation fits, in which case the smallest mutable one is used
+    instead.
+
+    Args:
+    - path: the edge list file to load.
+    - imp: the implementation to be used, as for `Graph()`.
+    - workers: the number of processes to use; defaults to the number of CPUs.
+      With 1 worker the file is parsed in this process.
+    - budget: the most bytes the graph may take; None for no limit.
+    - downgrade: whether to fall back to a smaller implementation.
+
+    Returns:
+    the loaded graph.
+    """
+    if budget is not None:
+        sizes = _scan(path)
+        projected = {name: sum(_estimated_sizes(name, *sizes).values())
+                     for name in IMPLEMENTATIONS}
+        if projected[imp] > budget:
+            smallest = min((name for name in projected if name != 'frozen'),
+                           key=projected.get)
+            if not downgrade or projected[smallest] > budget:
+                raise MemoryError(
+                    f'{path} is projected to take {projected[imp]} bytes as '
+                    f'{imp}, over the budget of {budget} bytes')
+            imp = smallest
+    workers = workers or os.cpu_count() or 1
+    tasks = [(path, start, end)
+             for start, end in _chunk_bounds(path, 4 * workers)]
+    if workers == 1 or len(tasks) == 1:
+        parsed = [_parse_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(_parse_chunk, tasks))
+
+    # global ids follow label order so the result does not depend on chunking
+    index = VertexIndex(label for chunk in parsed for label in chunk[0])
+    weighted = any(chunk[3] is not None for chunk in parsed)
+    src, dst, weights = array('l'), array('l'), array('d')
+    for chunk_labels, chunk_src, chunk_dst, chunk_weights in parsed:
+        remap = [index.id(label) for label in chunk_labels]
+        src.extend(remap[v] for v in chunk_src)
+        dst.extend(remap[v] for v in chunk_dst)
+        if weighted:
+            if chunk_weights is None:
+                weights.extend([1.0] * len(chunk_src))
+            else:
+                weights.extend(chunk_weights)
+    return Graph.from_arrays(index.labels, src, dst,
+                             weights if weighted else None, imp)
+
+
+# ----------------------------------------------------Snapshots----------------------------------------------------------------- #
+
+class EdgeDelta:
+    """ The edges added and removed between two versions of an edge list.
+
+    Attributes:
+    - added: a dict from each new edge, as a (v0, v1) pair with v0 < v1, to
+      its weight.
+    - removed: a dict from each edge that is gone to its old weight.
+    - weighted: whether the new version is weighted.
+
+    An edge whose weight changed is in both.
+    """
+
+    def __init__(self, added: {(int, int): float}, removed: {(int, int): float},
+                 weighted: bool):
+        """Creates delta with the given changes.
+
+        Args:
+        - self: the instance to create.
+        - added, removed, weighted: as the attributes.
+
+        Returns:
+        nothing.
+        """
+        self.added = added
+        self.removed = removed
+        self.weighted = weighted
+
+    def __len__(self) -> int:
+        """Returns the number of edge changes."""
+        return len(self.added) + len(self.removed)
+
+    def vertices(self) -> {int}:
+        """Returns the endpoints of the edges that changed.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a set of vertices.
+        """
+        return {v for edges in (self.added, self.removed)
+                for pair in edges for v in pair}
+
+
+def _edge_dict(edges: str) -> ({(int, int): float}, bool):
+    """Returns the edges of an edge list by (v0, v1) pair, v0 < v1, with their
+    weights, and whether the list is weighted."""
+    labels, src, dst, weights = _parse_lines(edges.splitlines())
+    pairs = ((labels[a], labels[b]) for a, b in zip(src, dst))
+    keys = [(min(pair), max(pair)) for pair in pairs]
+    if weights is None:
+        return dict.fromkeys(keys, 1), False
+    return dict(zip(keys, weights)), True
+
+
+def diff_edge_lists(old: str, new: str) -> EdgeDelta:
+    """Returns the edges added and removed between two versions of an edge list.
+
+    Both are in the format taken by `Graph()`; edges are matched regardless
+    of the order of their endpoints.
+
+    Args:
+    - old: the edge list of the loaded version.
+    - new: the edge list of the next version.
+
+    Returns:
+    the delta taking old to new, for `Graph.apply`.
+    """
+    before, _ = _edge_dict(old)
+    after, weighted = _edge_dict(new)
+    added = {pair: w for pair, w in after.items() if before.get(pair) != w}
+    removed = {pair: w for pair, w in before.items() if after.get(pair) != w}
+    return EdgeDelta(added, removed, weighted)
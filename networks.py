@@ -1,5 +1,1130 @@
 from graphs import *
+from graphs import _parse_lines
+import argparse
+import collections
 import graphviz
+import heapq
+import os
+import random
+import sys
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+
+
+def _common_count(a, b) -> int:
+    """Returns the number of values common to the increasing sequences a and b.
+
+    Sequences of similar length are merged in one linear pass. When one is
+    much longer, each value of the shorter one is found in it by galloping
+    search instead: doubling steps from the last match bound the value, then
+    binary search finds it, so long rows of hubs are mostly skipped.
+
+    Args:
+    - a, b: sequences of distinct values in increasing order.
+
+    Returns:
+    the size of the intersection of a and b.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    na, nb = len(a), len(b)
+    count = 0
+    if nb > 8 * na:
+        lo = 0
+        for x in a:
+            hi, step = lo, 1
+            while hi < nb and b[hi] < x:
+                lo = hi + 1
+                hi += step
+                step <<= 1
+            lo = bisect_left(b, x, lo, min(hi, nb))
+            if lo == nb:
+                break
+            if b[lo] == x:
+                count += 1
+                lo += 1
+        return count
+    i = j = 0
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            count += 1
+            i += 1
+            j += 1
+        elif x < y:
+            i += 1
+        else:
+            j += 1
+    return count
+
+
+def _search(compact: CompactGraph, source: int):
+    """Runs a single-source shortest path search over a dense-indexed graph.
+
+    Breadth first search is used for unweighted graphs and Dijkstra's algorithm
+    for weighted ones. Shortest paths are counted on the way, as needed by
+    Brandes' betweenness algorithm.
+
+    Args:
+    - compact: the graph to be searched.
+    - source: the vertex id to search from.
+
+    Returns:
+    (order, dist, sigma, preds): the vertices reached in non-decreasing order of
+    distance, their distances, their numbers of shortest paths from source and
+    their predecessors on those paths.
+    """
+    offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+    dist = {source: 0}
+    sigma = {source: 1}
+    preds = {source: []}
+    order = []
+    if weights is None:
+        frontier = [source]
+        while frontier:
+            order.extend(frontier)
+            following = []
+            for v in frontier:
+                dv = dist[v] + 1
+                for k in range(offsets[v], offsets[v + 1]):
+                    w = targets[k]
+                    if w not in dist:
+                        dist[w] = dv
+                        sigma[w] = 0
+                        preds[w] = []
+                        following.append(w)
+                    if dist[w] == dv:
+                        sigma[w] += sigma[v]
+                        preds[w].append(v)
+            frontier = following
+        return order, dist, sigma, preds
+    settled = set()
+    heap = [(0, source)]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if v in settled:
+            continue
+        settled.add(v)
+        order.append(v)
+        for k in range(offsets[v], offsets[v + 1]):
+            w = targets[k]
+            dw = d + weights[k]
+            if w not in dist or dw < dist[w]:
+                dist[w] = dw
+                sigma[w] = sigma[v]
+                preds[w] = [v]
+                heapq.heappush(heap, (dw, w))
+            elif dw == dist[w] and w not in settled:
+                sigma[w] += sigma[v]
+                preds[w].append(v)
+    return order, dist, sigma, preds
+
+
+def _betweenness_kernel(compact: CompactGraph, sources: [int]) -> [float]:
+    """Returns the betweenness dependencies accumulated over the given sources."""
+    between = [0.0] * compact.n
+    for s in sources:
+        order, _, sigma, preds = _search(compact, s)
+        delta = dict.fromkeys(order, 0.0)
+        for w in reversed(order):
+            coefficient = (1 + delta[w]) / sigma[w]
+            for v in preds[w]:
+                delta[v] += sigma[v] * coefficient
+            if w != s:
+                between[w] += delta[w]
+    return between
+
+
+def _closeness_kernel(compact: CompactGraph, sources: [int]) -> [float]:
+    """Returns the closeness of each of the given sources, in order."""
+    closeness = []
+    for s in sources:
+        _, dist, _, _ = _search(compact, s)
+        total = sum(dist.values())
+        reached = len(dist) - 1
+        if total == 0 or compact.n == 1:
+            closeness.append(0.0)
+        else:
+            # scaled by the reachable fraction so small components rank low
+            closeness.append(reached / total * reached / (compact.n - 1))
+    return closeness
+
+
+def _nearest_distances(compact: CompactGraph, sources: [int]) -> array:
+    """Returns the distance from the nearest of sources to every vertex id.
+
+    Breadth first search is used for unweighted graphs and Dijkstra's algorithm
+    with a binary heap for weighted ones, started from all the sources at once.
+
+    Args:
+    - compact: the graph to be searched.
+    - sources: the vertex ids to search from.
+
+    Returns:
+    an array of distances indexed by vertex id; math.inf where a vertex cannot
+    be reached.
+    """
+    offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+    dist = array('d', [math.inf]) * compact.n
+    for source in sources:
+        dist[source] = 0
+    if weights is None:
+        frontier, d = list(sources), 0
+        while frontier:
+            d += 1
+            following = []
+            for v in frontier:
+                for k in range(offsets[v], offsets[v + 1]):
+                    w = targets[k]
+                    if dist[w] == math.inf:
+                        dist[w] = d
+                        following.append(w)
+            frontier = following
+        return dist
+    heap = [(0, source) for source in sources]
+    while heap:
+        d, v = heapq.heappop(heap)
+        if d > dist[v]:
+            continue  # stale entry, v was settled closer
+        for k in range(offsets[v], offsets[v + 1]):
+            dw = d + weights[k]
+            if dw < dist[targets[k]]:
+                dist[targets[k]] = dw
+                heapq.heappush(heap, (dw, targets[k]))
+    return dist
+
+
+def _distance_kernel(compact: CompactGraph, sources: [int]) -> [array]:
+    """Returns the distances from each of the given sources to every vertex id,
+    one array per source, in order, as by `_nearest_distances`."""
+    return [_nearest_distances(compact, [source]) for source in sources]
+
+
+def _bidirectional(compact: CompactGraph, source: int, target: int):
+    """Searches for a shortest path between source and target from both ends.
+
+    Unweighted graphs are searched breadth first, a whole level at a time
+    from whichever end has the smaller frontier, stopping after the first
+    level that meets the other side. Weighted graphs run Dijkstra's algorithm
+    from both ends, alternately settling the closer of the two heap tops,
+    until those tops together are no shorter than the best path seen.
+
+    Args:
+    - compact: the graph to be searched.
+    - source, target: the vertex ids to join.
+
+    Returns:
+    (distance, meeting, preds, visited): the distance, math.inf if target
+    cannot be reached; the vertex id where the best path crosses between the
+    two searches; the predecessor of each reached vertex id towards source
+    and towards target, one dict per side; and the number of vertices the
+    searches reached.
+    """
+    offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+    dist = ({source: 0}, {target: 0})
+    preds = ({source: None}, {target: None})
+    if source == target:
+        return 0, source, preds, 1
+    best, meeting = math.inf, None
+    if weights is None:
+        frontiers = ([source], [target])
+        while frontiers[0] and frontiers[1] and best == math.inf:
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            mine, other = dist[side], dist[1 - side]
+            following = []
+            for v in frontiers[side]:
+                dv = mine[v] + 1
+                for k in range(offsets[v], offsets[v + 1]):
+                    w = targets[k]
+                    if w not in mine:
+                        mine[w] = dv
+                        preds[side][w] = v
+                        following.append(w)
+                        if w in other and dv + other[w] < best:
+                            best, meeting = dv + other[w], w
+            frontiers = (following, frontiers[1]) if side == 0 else \
+                (frontiers[0], following)
+        return best, meeting, preds, len(dist[0]) + len(dist[1])
+    heaps = ([(0, source)], [(0, target)])
+    settled = (set(), set())
+    while heaps[0] and heaps[1] and heaps[0][0][0] + heaps[1][0][0] < best:
+        side = 0 if heaps[0][0][0] <= heaps[1][0][0] else 1
+        mine, other = dist[side], dist[1 - side]
+        d, v = heapq.heappop(heaps[side])
+        if v in settled[side]:
+            continue
+        settled[side].add(v)
+        for k in range(offsets[v], offsets[v + 1]):
+            w, dw = targets[k], d + weights[k]
+            if dw < mine.get(w, math.inf):
+                mine[w] = dw
+                preds[side][w] = v
+                heapq.heappush(heaps[side], (dw, w))
+            if w in other and dw + other[w] < best:
+                best, meeting = dw + other[w], w
+                if mine[w] < dw:
+                    # the best path enters w from its own settled side
+                    best = mine[w] + other[w]
+    return best, meeting, preds, len(dist[0]) + len(dist[1])
+
+
+def _fan_out(kernel, compact: CompactGraph, sources: [int],
+             workers: int) -> list:
+    """Runs kernel over chunks of sources, in a process pool if workers > 1.
+
+    Args:
+    - kernel: a module level function taking a compact graph and sources.
+    - compact: the graph to run over.
+    - sources: the vertex ids to split among the workers.
+    - workers: the number of processes to use.
+
+    Returns:
+    the results of kernel, one per chunk, in the order of the chunks.
+    """
+    if workers <= 1 or len(sources) < 2:
+        return [kernel(compact, sources)]
+    size = math.ceil(len(sources) / workers)
+    chunks = [sources[i:i + size] for i in range(0, len(sources), size)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(kernel, [compact] * len(chunks), chunks))
+
+
+METRICS = ('degree_centrality', 'clustering_coefficient',
+           'average_neighbor_degree', 'similarity', 'strength')
+
+
+def _metric_kernels(g: Graph, metric: str, vtx: int = None):
+    """Returns per-vertex functions computing metric and a cheap upper bound on it.
+
+    Both take a vertex id of the compact view of g. The bounds need only the
+    degrees of a vertex and its neighbors, while the exact values of
+    clustering and similarity intersect neighborhoods.
+
+    Args:
+    - g: the graph/network to be checked.
+    - metric: one of METRICS.
+    - vtx: for 'similarity', the vertex to compare the others with.
+
+    Returns:
+    the compact view of g, the bound function and the exact function.
+    """
+    assert metric in METRICS, f'unknown metric {metric}'
+    compact = g.compact()
+    offsets, targets = compact.offsets, compact.targets
+    degree = [offsets[i + 1] - offsets[i] for i in range(compact.n)]
+
+    def neighbor_degrees(i):
+        return sum(degree[targets[k]] for k in range(offsets[i], offsets[i + 1]))
+
+    if metric == 'degree_centrality':
+        def exact(i):
+            return degree[i] / (compact.n - 1)
+        return compact, exact, exact
+    if metric == 'strength':
+        def exact(i):
+            return sum(compact.edge_weights(i))
+        return compact, exact, exact
+    if metric == 'average_neighbor_degree':
+        def exact(i):
+            return neighbor_degrees(i) / degree[i] if degree[i] else 0.0
+        return compact, exact, exact
+    if metric == 'clustering_coefficient':
+        def bound(i):
+            # each neighbor u closes at most degree(u) - 1 of i's wedges
+            d = degree[i]
+            return min(1.0, (neighbor_degrees(i) - d) / (d * (d - 1))) if d > 1 else 0.0
+
+        def exact(i):
+            d = degree[i]
+            if d < 2:
+                return 0.0
+            nbrs = set(compact.neighbors(i))
+            links = sum(len(nbrs.intersection(compact.neighbors(u))) for u in nbrs)
+            return links / (d * (d - 1))
+        return compact, bound, exact
+    assert vtx is not None, 'similarity needs the vertex to compare with'
+    j = compact.index.id(vtx)
+    mine = set(compact.neighbors(j))
+
+    def bound(i):
+        # |N(i) & N(j)| <= the smaller degree, |N(i) | N(j)| >= the larger
+        small, large = sorted((degree[i], degree[j]))
+        return small / large if large else 0.0
+
+    def exact(i):
+        common = len(mine.intersection(compact.neighbors(i)))
+        union = degree[i] + degree[j] - common
+        return common / union if union else 0.0
+    return compact, bound, exact
+
+
+def _weighted_rows(compact: CompactGraph, i: int) -> {int: float}:
+    """Returns the neighbors of vertex i mapped to the weights of their edges."""
+    lo, hi = compact.offsets[i], compact.offsets[i + 1]
+    if compact.weighted:
+        return dict(zip(compact.targets[lo:hi], compact.weights[lo:hi]))
+    return dict.fromkeys(compact.targets[lo:hi], 1)
+
+
+def _weighted_clustering_kernel(compact: CompactGraph, i: int, method: str,
+                                max_weight: float) -> float:
+    """Returns the weighted local clustering of vertex i.
+
+    Every triangle through i is visited once, as a neighbor j of i and a later
+    neighbor h of both, reading the weights straight from the CSR arrays.
+
+    Args:
+    - compact: the graph to be checked.
+    - i: the vertex id whose clustering is sought.
+    - method: 'barrat' or 'onnela'.
+    - max_weight: the largest weight in the graph, used by 'onnela'.
+
+    Returns:
+    the weighted clustering of i; 0 if i has fewer than 2 neighbors.
+    """
+    row = _weighted_rows(compact, i)
+    d = len(row)
+    if d < 2:
+        return 0.0
+    offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+    total = 0.0
+    for j, w_ij in row.items():
+        for k in range(offsets[j], offsets[j + 1]):
+            h = targets[k]
+            if h > j and h in row:
+                if method == 'barrat':
+                    total += w_ij + row[h]
+                else:
+                    w_jh = weights[k] if weights is not None else 1
+                    total += (w_ij * row[h] * w_jh / max_weight ** 3) ** (1 / 3)
+    if method == 'barrat':
+        strength = sum(row.values())
+        return total / (strength * (d - 1)) if strength else 0.0
+    return 2 * total / (d * (d - 1))
+
+
+def _louvain_moves(rows: [{int: float}], loops: [float], resolution: float,
+                   rng: random.Random) -> ([int], bool):
+    """Moves nodes between communities while that raises the modularity.
+
+    Each node starts in a community of its own and is repeatedly moved to the
+    neighboring community with the largest modularity gain. The gain of
+    moving node i into community c is k_i,c - resolution * tot_c * k_i / 2m,
+    up to a constant factor, where k_i,c is the weight of i's edges into c
+    and tot_c the total strength of c; the totals are updated as nodes move
+    so each gain is computed from i's own edges only.
+
+    Args:
+    - rows: the neighbors of each node mapped to the weights of their edges.
+    - loops: the weight of each node's self-loop.
+    - resolution: values above 1 favor smaller communities.
+    - rng: orders the nodes.
+
+    Returns:
+    the community of each node, numbered from 0 in order of their first node,
+    and whether any node moved.
+    """
+    n = len(rows)
+    strength = [sum(row.values()) + 2 * loops[i] for i, row in enumerate(rows)]
+    two_m = sum(strength)
+    community = list(range(n))
+    total = list(strength)
+    order = list(range(n))
+    rng.shuffle(order)
+    moved = improved = two_m > 0
+    while improved:
+        improved = False
+        for i in order:
+            current, k = community[i], strength[i]
+            links = {}
+            for j, w in rows[i].items():
+                links[community[j]] = links.get(community[j], 0) + w
+            total[current] -= k
+            scale = resolution * k / two_m
+            best = current
+            best_gain = links.get(current, 0) - total[current] * scale
+            for c, w in links.items():
+                gain = w - total[c] * scale
+                if gain > best_gain + 1e-12:
+                    best, best_gain = c, gain
+            total[best] += k
+            if best != current:
+                community[i] = best
+                improved = True
+    ids = {}
+    community = [ids.setdefault(c, len(ids)) for c in community]
+    return community, moved and len(ids) < n
+
+
+def _aggregate(rows: [{int: float}], loops: [float],
+               community: [int]) -> ([{int: float}], [float]):
+    """Returns the graph with each community of nodes merged into one node.
+
+    Edges within a community become the self-loop of its node; edges between
+    two communities are summed into one.
+
+    Args:
+    - rows, loops: the graph as in `_louvain_moves`.
+    - community: the community of each node, numbered from 0.
+
+    Returns:
+    the rows and loops of the merged graph.
+    """
+    count = max(community) + 1
+    merged_rows = [{} for _ in range(count)]
+    merged_loops = [0.0] * count
+    for i, row in enumerate(rows):
+        ci = community[i]
+        merged_loops[ci] += loops[i]
+        merged = merged_rows[ci]
+        for j, w in row.items():
+            cj = community[j]
+            if ci == cj:
+                # seen from both ends
+                merged_loops[ci] += w / 2
+            else:
+                merged[cj] = merged.get(cj, 0) + w
+    return merged_rows, merged_loops
+
+
+def _core_numbers(compact: CompactGraph) -> array:
+    """Returns the core number of every vertex id of compact.
+
+    The Batagelj-Zaversnik algorithm: the vertices are kept sorted by their
+    current degree in one array, with the start of each degree's bin in
+    another, and are removed in that order. Removing a vertex lowers the
+    degree of each neighbor still higher than it by swapping the neighbor to
+    the start of its bin and moving the bin boundary, so the whole
+    decomposition takes O(V + E).
+
+    Args:
+    - compact: the graph to decompose.
+
+    Returns:
+    an array of the core number of each vertex id.
+    """
+    n = compact.n
+    offsets, targets = compact.offsets, compact.targets
+    degree = array('i', (offsets[i + 1] - offsets[i] for i in range(n)))
+    top = max(degree, default=0)
+    # start[d] is the position of the first vertex of degree d in order
+    start = [0] * (top + 2)
+    for d in degree:
+        start[d + 1] += 1
+    for d in range(1, top + 2):
+        start[d] += start[d - 1]
+    order = array('i', [0]) * n
+    position = array('i', [0]) * n
+    fill = start[:]
+    for v in range(n):
+        position[v] = fill[degree[v]]
+        order[position[v]] = v
+        fill[degree[v]] += 1
+    for p in range(n):
+        v = order[p]
+        for k in range(offsets[v], offsets[v + 1]):
+            u = targets[k]
+            du = degree[u]
+            if du > degree[v]:
+                # swap u with the first vertex of its bin, then shrink the bin
+                first = start[du]
+                w = order[first]
+                if u != w:
+                    order[position[u]], order[first] = w, u
+                    position[w], position[u] = position[u], first
+                start[du] += 1
+                degree[u] = du - 1
+    return degree
+
+
+def _core_filter(compact: CompactGraph, min_core: int = None):
+    """Returns the vertex ids of compact whose core number is at least min_core,
+    or all of them if min_core is None."""
+    if min_core is None:
+        return range(compact.n)
+    return [i for i, core in enumerate(_core_numbers(compact)) if core >= min_core]
+
+
+def _greedy_coloring(compact: CompactGraph) -> [[int]]:
+    """Returns the vertex ids split into classes of which no two are adjacent."""
+    offsets, targets = compact.offsets, compact.targets
+    color = [-1] * compact.n
+    classes = []
+    for i in range(compact.n):
+        used = {color[targets[k]] for k in range(offsets[i], offsets[i + 1])}
+        c = 0
+        while c in used:
+            c += 1
+        color[i] = c
+        if c == len(classes):
+            classes.append([])
+        classes[c].append(i)
+    return classes
+
+
+def _propagation_kernel(compact: CompactGraph, nodes: [int], labels,
+                        salt: int) -> [(int, int)]:
+    """Returns the nodes whose label changes, with their new labels.
+
+    Each node takes the label carrying the most edge weight among its
+    neighbors, keeping its own if that is one of the best. Other ties go to the
+    label with the least hash under salt, so the choice does not depend on how
+    the nodes are split among workers.
+
+    Args:
+    - compact: the graph.
+    - nodes: the vertex ids to update; no two are adjacent.
+    - labels: the current label of every vertex id.
+    - salt: varies the tie breaking between rounds.
+
+    Returns:
+    a list of (vertex id, label) pairs.
+    """
+    offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+    changes = []
+    for i in nodes:
+        votes = {}
+        for k in range(offsets[i], offsets[i + 1]):
+            label = labels[targets[k]]
+            votes[label] = votes.get(label, 0) + (weights[k] if weights else 1)
+        if not votes:
+            continue
+        top = max(votes.values())
+        if votes.get(labels[i]) == top:
+            continue
+        best = min((label for label, w in votes.items() if w == top),
+                   key=lambda label: (label * 2654435761 ^ salt) & 0xFFFFFFFF)
+        changes.append((i, best))
+    return changes
+
+
+# the graph held by each label propagation worker process
+_worker_compact = None
+
+
+def _install_compact(compact: CompactGraph) -> None:
+    """Makes compact the graph of the propagation kernels run in this process."""
+    global _worker_compact
+    _worker_compact = compact
+
+
+def _propagation_in_worker(nodes: [int], labels, salt: int) -> [(int, int)]:
+    """Runs `_propagation_kernel` on the graph installed in this worker."""
+    return _propagation_kernel(_worker_compact, nodes, labels, salt)
+
+
+def _numbered_communities(compact: CompactGraph, membership) -> {int: int}:
+    """Returns the community of each vertex, numbered from 0 in order of their
+    smallest vertex."""
+    ids = {}
+    return {compact.labels[i]: ids.setdefault(c, len(ids))
+            for i, c in enumerate(membership)}
+
+
+def _sample_size(error: float, confidence: float) -> int:
+    """Returns the number of samples of a [0, 1] quantity that estimate its mean
+    within error with the given confidence, by Hoeffding's inequality."""
+    return math.ceil(math.log(2 / (1 - confidence)) / (2 * error ** 2))
+
+
+def _hoeffding_interval(estimate: float, samples: int,
+                        confidence: float) -> (float, float):
+    """Returns the confidence interval around the mean, estimate, of samples
+    values in [0, 1], by Hoeffding's inequality."""
+    error = math.sqrt(math.log(2 / (1 - confidence)) / (2 * samples))
+    return max(0.0, estimate - error), min(1.0, estimate + error)
+
+
+def _alias_tables(compact: CompactGraph) -> (array, array):
+    """Builds alias tables for stepping along edges in proportion to their weights.
+
+    Vose's method splits the row of each vertex into equal slots, each holding
+    its own edge with some probability and one other edge, its alias, with the
+    rest. A vertex whose edges all weigh 0 steps uniformly.
+
+    Args:
+    - compact: the weighted graph to walk; its weights must not be negative.
+
+    Returns:
+    (prob, alias) aligned with compact.targets: a step from vertex v picks a
+    position k of its row uniformly, then keeps k with probability prob[k] and
+    moves to offsets[v] + alias[k] otherwise.
+    """
+    offsets, weights = compact.offsets, compact.weights
+    assert all(w >= 0 for w in weights), 'cannot walk edges of negative weight'
+    prob = array('d', [1.0]) * len(weights)
+    alias = array('i', bytes(4 * len(weights)))
+    for v in range(compact.n):
+        start, end = offsets[v], offsets[v + 1]
+        total = sum(weights[start:end])
+        if total <= 0:
+            continue
+        scaled = [w * (end - start) / total for w in weights[start:end]]
+        small = [i for i, s in enumerate(scaled) if s < 1]
+        large = [i for i, s in enumerate(scaled) if s >= 1]
+        while small and large:
+            s, l = small.pop(), large.pop()
+            prob[start + s] = scaled[s]
+            alias[start + s] = l
+            scaled[l] -= 1 - scaled[s]
+            (small if scaled[l] < 1 else large).append(l)
+        # what is left holds its own edge only, up to rounding
+        for i in small + large:
+            prob[start + i] = 1.0
+    return prob, alias
+
+
+# the number of walks in each batch; batches are seeded in turn, so that the
+# walks do not depend on how the batches are split among processes
+WALK_BATCH = 256
+
+# the walk engine of the batches run in this worker process
+_worker_walks = None
+
+
+def _install_walks(walks: 'RandomWalks') -> None:
+    """Makes walks the engine of the batches run in this worker process."""
+    global _worker_walks
+    _worker_walks = walks
+
+
+def _walk_batch_in_worker(batch: (str, [int])) -> str:
+    """Runs a batch of walks with the engine installed in this worker."""
+    return _worker_walks._lines(batch)
+
+
+class DistanceMatrix:
+    """ The shortest path distances from some source vertices to some targets.
+
+    The distances are stored row by row in one flat array of doubles, a row
+    per source and a column per target; math.inf marks a target that cannot
+    be reached.
+    """
+
+    def __init__(self, sources: [int], targets: [int], data: array):
+        """Creates matrix over the given data.
+
+        Args:
+        - self: the instance to create.
+        - sources: the vertices of the rows.
+        - targets: the vertices of the columns.
+        - data: the distances, len(sources) * len(targets) of them, row by row.
+
+        Returns:
+        nothing.
+        """
+        self.sources = list(sources)
+        self.targets = list(targets)
+        self.data = data
+        self._rows = {v: i for i, v in enumerate(self.sources)}
+        self._columns = {v: i for i, v in enumerate(self.targets)}
+
+    def distance(self, source: int, target: int) -> float:
+        """Returns the distance from source to target.
+
+        Args:
+        - self: the instance to operate on.
+        - source: one of the sources of the matrix.
+        - target: one of the targets of the matrix.
+
+        Returns:
+        the distance; math.inf if target cannot be reached.
+        """
+        width = len(self.targets)
+        return self.data[self._rows[source] * width + self._columns[target]]
+
+    def row(self, source: int) -> {int: float}:
+        """Returns the distances from source to the targets it reaches.
+
+        Args:
+        - self: the instance to operate on.
+        - source: one of the sources of the matrix.
+
+        Returns:
+        a dict from each reachable target to its distance.
+        """
+        width = len(self.targets)
+        start = self._rows[source] * width
+        return {t: d for t, d in zip(self.targets, self.data[start:start + width])
+                if d != math.inf}
+
+
+class ShortestPaths:
+    """ Answers many-source shortest path queries over a graph.
+
+    The distances from a source to every vertex are kept in a least recently
+    used cache of source trees, so repeated queries from the same sources are
+    not searched again. The cache is dropped if the graph's compact view is
+    rebuilt.
+    """
+
+    def __init__(self, g: Graph, cache_size: int = 128, workers: int = 1):
+        """Creates engine over g.
+
+        Args:
+        - self: the instance to create.
+        - g: the graph to search.
+        - cache_size: the most source trees to keep.
+        - workers: the number of processes to split uncached sources among.
+
+        Returns:
+        nothing.
+        """
+        self.g = g
+        self.cache_size = cache_size
+        self.workers = workers
+        self.hits = self.misses = 0
+        self._compact = None
+        self._trees = collections.OrderedDict()
+
+    def _trees_for(self, ids: [int]) -> [array]:
+        """Returns the distance arrays from the given source ids, searching only
+        those that are not cached."""
+        compact = self.g.compact()
+        if compact is not self._compact:
+            self._compact = compact
+            self._trees.clear()
+        missing = [i for i in dict.fromkeys(ids) if i not in self._trees]
+        self.misses += len(missing)
+        self.hits += len(ids) - len(missing)
+        found = {}
+        if missing:
+            parts = _fan_out(_distance_kernel, compact, missing, self.workers)
+            found = dict(zip(missing, (tree for part in parts for tree in part)))
+        rows = []
+        for i in ids:
+            tree = found.get(i)
+            if tree is None:
+                tree = self._trees[i]
+                self._trees.move_to_end(i)
+            else:
+                self._trees[i] = tree
+            rows.append(tree)
+        while len(self._trees) > self.cache_size:
+            self._trees.popitem(last=False)
+        return rows
+
+    def distances(self, source: int) -> {int: float}:
+        """Returns the distances from source to the vertices it reaches.
+
+        Args:
+        - self: the instance to operate on.
+        - source: the vertex to measure distances from.
+
+        Returns:
+        a dict from each vertex reachable from source to its distance.
+        """
+        compact = self.g.compact()
+        tree = self._trees_for([compact.index.id(source)])[0]
+        return {v: d for v, d in zip(compact.labels, tree) if d != math.inf}
+
+    def matrix(self, sources, targets=None) -> DistanceMatrix:
+        """Returns the distances from each of sources to each of targets.
+
+        Args:
+        - self: the instance to operate on.
+        - sources: the vertices to measure distances from.
+        - targets: the vertices to measure distances to; all vertices if None.
+
+        Returns:
+        the distance matrix.
+        """
+        compact = self.g.compact()
+        sources = list(sources)
+        targets = list(compact.labels if targets is None else targets)
+        trees = self._trees_for([compact.index.id(v) for v in sources])
+        columns = [compact.index.id(v) for v in targets]
+        data = array('d')
+        for tree in trees:
+            data.extend(tree[c] for c in columns)
+        return DistanceMatrix(sources, targets, data)
+
+
+class RandomWalks:
+    """ Generates random walks over a graph, e.g. as a corpus for node embeddings.
+
+    Walks run over the compact view of the graph. Each step moves to a
+    neighbor chosen uniformly, or, if weighted, in proportion to the weight of
+    the edge, drawn in constant time from alias tables built once. With
+    node2vec's return parameter p and in-out parameter q, a step from v, having
+    come from t, is further biased by 1/p towards t, 1 towards neighbors of t
+    and 1/q towards other vertices; the bias is applied by rejection sampling,
+    testing adjacency to t by binary search in t's sorted row, so no table per
+    edge is needed. A walk ends early at a vertex without edges.
+    """
+
+    def __init__(self, g: Graph, length: int = 80, p: float = 1.0,
+                 q: float = 1.0, weighted: bool = True):
+        """Creates walk engine over g.
+
+        Args:
+        - self: the instance to create.
+        - g: the graph to walk.
+        - length: the number of vertices in each walk, including its start.
+        - p: the return parameter; lower values make walks backtrack more.
+        - q: the in-out parameter; lower values make walks move outwards more.
+        - weighted: whether to follow edges in proportion to their weights, if
+          g is weighted.
+
+        Returns:
+        nothing.
+        """
+        assert length >= 1 and p > 0 and q > 0, 'invalid walk parameters'
+        self.compact = g.compact()
+        self.length = length
+        self.p, self.q = p, q
+        self.prob = self.alias = None
+        if weighted and self.compact.weighted:
+            self.prob, self.alias = _alias_tables(self.compact)
+
+    def _walk(self, start: int, rng: random.Random) -> [int]:
+        """Returns the vertex ids of one walk from the vertex id start."""
+        offsets, targets = self.compact.offsets, self.compact.targets
+        prob, alias = self.prob, self.alias
+        biased = self.p != 1 or self.q != 1
+        if biased:
+            bound = max(1 / self.p, 1.0, 1 / self.q)
+        walk = [start]
+        while len(walk) < self.length:
+            v = walk[-1]
+            begin, degree = offsets[v], offsets[v + 1] - offsets[v]
+            if degree == 0:
+                break
+            while True:
+                k = begin + int(rng.random() * degree)
+                if prob is not None and rng.random() >= prob[k]:
+                    k = begin + alias[k]
+                x = targets[k]
+                if not biased or len(walk) == 1:
+                    break
+                t = walk[-2]
+                if x == t:
+                    bias = 1 / self.p
+                else:
+                    end = offsets[t + 1]
+                    j = bisect_left(targets, x, offsets[t], end)
+                    bias = 1.0 if j < end and targets[j] == x else 1 / self.q
+                if rng.random() * bound < bias:
+                    break
+            walk.append(x)
+        return walk
+
+    def _batches(self, starts, per_vertex: int, seed: int) -> [(str, [int])]:
+        """Splits the walks into seeded batches of WALK_BATCH start vertex ids.
+
+        Every round walks once from each start, in an order shuffled per round.
+        """
+        index = self.compact.index
+        ids = list(range(self.compact.n)) if starts is None else \
+            [index.id(v) for v in starts]
+        if seed is None:
+            seed = random.getrandbits(64)
+        rng = random.Random(seed)
+        order = []
+        for _ in range(per_vertex):
+            rng.shuffle(ids)
+            order.extend(ids)
+        return [(f'{seed}-{b}', order[i:i + WALK_BATCH])
+                for b, i in enumerate(range(0, len(order), WALK_BATCH))]
+
+    def _lines(self, batch: (str, [int])) -> str:
+        """Returns the walks of batch as text, one line of labels per walk."""
+        salt, starts = batch
+        rng = random.Random(salt)
+        labels = self.compact.labels
+        return ''.join(' '.join(str(labels[i]) for i in self._walk(start, rng)) + '\n'
+                       for start in starts)
+
+    def walks(self, starts=None, per_vertex: int = 10, seed: int = None):
+        """Iterates over random walks from each of starts.
+
+        Args:
+        - self: the instance to operate on.
+        - starts: the vertices to walk from; every vertex if None.
+        - per_vertex: the number of walks from each start.
+        - seed: seeds the walks; the same seed gives the same walks, as written
+          by `write`.
+
+        Returns:
+        nothing.
+
+        Yields:
+        walks, as lists of vertices beginning with their start.
+        """
+        labels = self.compact.labels
+        for salt, batch in self._batches(starts, per_vertex, seed):
+            rng = random.Random(salt)
+            for start in batch:
+                yield [labels[i] for i in self._walk(start, rng)]
+
+    def write(self, path: str, starts=None, per_vertex: int = 10,
+              seed: int = None, workers: int = 1) -> int:
+        """Writes random walks from each of starts to the file at path.
+
+        Each line holds one walk, its vertices separated by spaces, as read by
+        word2vec-style trainers. Batches of walks are written as they finish,
+        in order, so the walks need not fit in memory, and they are the same
+        for any number of workers.
+
+        Args:
+        - self: the instance to operate on.
+        - path: the file to write.
+        - starts: the vertices to walk from; every vertex if None.
+        - per_vertex: the number of walks from each start.
+        - seed: seeds the walks, as for `walks`.
+        - workers: the number of processes to run batches in.
+
+        Returns:
+        the number of walks written.
+        """
+        batches = self._batches(starts, per_vertex, seed)
+        pool = None
+        if workers > 1 and len(batches) > 1:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_install_walks,
+                                       initargs=(self,))
+        try:
+            texts = map(self._lines, batches) if pool is None else \
+                pool.map(_walk_batch_in_worker, batches)
+            with open(path, 'w') as f:
+                f.writelines(texts)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return sum(len(batch) for _, batch in batches)
+
+
+class IncrementalMetrics:
+    """ Per-vertex metrics of a graph, kept up to date as the graph changes.
+
+    Holds the degree, clustering coefficient, average neighbor degree and
+    popular distance of every vertex, by vertex. `apply` changes the graph by
+    an edge delta and recomputes only the values the change can affect.
+    """
+
+    def __init__(self, g: Graph):
+        """Creates metrics of g, computing them all.
+
+        Args:
+        - self: the instance to create.
+        - g: the graph to follow; change it through `apply` only.
+
+        Returns:
+        nothing.
+        """
+        self.g = g
+        self.degree = {}
+        self.clustering = {}
+        self.neighbor_degree = {}
+        self.popular_distance = {}
+        vertices = set(g.vertices())
+        self._refresh(vertices, vertices, vertices)
+        self._refresh_distances()
+
+    def degree_centrality(self, v: int) -> float:
+        """Returns the degree centrality of v, as `NetworkOperations` does.
+
+        Args:
+        - self: the instance to operate on.
+        - v: the vertex whose degree centrality is sought.
+
+        Returns:
+        the degree centrality of v.
+        """
+        return self.degree[v] / (len(self.degree) - 1)
+
+    def _refresh(self, degree: {int}, clustering: {int},
+                 neighbor_degree: {int}) -> None:
+        """Recomputes the local metrics of the given vertices."""
+        g = self.g
+        for v in degree:
+            self.degree[v] = g.degree(v)
+        for v in clustering:
+            self.clustering[v] = NetworkOperations.clustering_coefficient(g, v)
+        for v in neighbor_degree:
+            self.neighbor_degree[v] = \
+                NetworkOperations.average_neighbor_degree(g, v)
+
+    def _refresh_distances(self) -> None:
+        """Recomputes the distance of every vertex from its nearest hub."""
+        compact = self.g.compact()
+        hubs = [compact.index.id(v) for v in self.g.summary().hubs]
+        self._hubs = self.g.summary().hubs
+        self._hub_distance = dict(zip(compact.labels,
+                                      _nearest_distances(compact, hubs)))
+        self.popular_distance = {v: -1 if d == math.inf else int(d)
+                                 for v, d in self._hub_distance.items()}
+
+    def _paths_change(self, delta: EdgeDelta) -> bool:
+        """Can delta change the distance of any vertex from its nearest hub?
+
+        Removing an edge matters only if it lies on a shortest path, i.e. its
+        ends' distances differ by its weight; adding one only if it shortens
+        the way to one of its ends.
+        """
+        dist = self._hub_distance
+        for (v0, v1), w in delta.removed.items():
+            d0, d1 = dist[v0], dist[v1]
+            if d0 != math.inf and (d0 + w == d1 or d1 + w == d0):
+                return True
+        for (v0, v1), w in delta.added.items():
+            d0, d1 = dist.get(v0, math.inf), dist.get(v1, math.inf)
+            if d0 + w < d1 or d1 + w < d0:
+                return True
+        return False
+
+    def _wedges(self, delta: EdgeDelta) -> {int}:
+        """Returns the common neighbors of the ends of the changed edges, whose
+        clustering depends on whether those edges exist."""
+        g = self.g
+        common = set()
+        for v0, v1 in list(delta.added) + list(delta.removed):
+            if g.has_vertex(v0) and g.has_vertex(v1):
+                common |= set(g.neighbors(v0)) & set(g.neighbors(v1))
+        return common
+
+    def apply(self, delta: EdgeDelta) -> {str: int}:
+        """Changes the graph by delta and brings the metrics up to date.
+
+        Degrees are recomputed for the ends of the changed edges; clustering
+        for those ends and their common neighbors; average neighbor degree for
+        the ends and all their neighbors. Popular distances are recomputed, by
+        one search from all hubs at once, only if the hubs changed or a
+        changed edge lies on, or shortens, a shortest path from a hub.
+
+        Args:
+        - self: the instance to operate on.
+        - delta: as returned by `diff_edge_lists`.
+
+        Returns:
+        a dict from metric name to the number of values recomputed.
+        """
+        g = self.g
+        wedges = self._wedges(delta)
+        paths_change = self._paths_change(delta)
+        g.apply(delta)
+        wedges |= self._wedges(delta)
+        for v in [v for v in self.degree if not g.has_vertex(v)]:
+            for values in (self.degree, self.clustering, self.neighbor_degree,
+                           self.popular_distance, self._hub_distance):
+                del values[v]
+        touched = {v for v in delta.vertices() if g.has_vertex(v)}
+        around = touched.union(*(g.neighbors(v) for v in touched))
+        clustering = touched | {v for v in wedges if g.has_vertex(v)}
+        self._refresh(touched, clustering, around)
+        redone = {'degree': len(touched), 'clustering': len(clustering),
+                  'neighbor_degree': len(around), 'popular_distance': 0}
+        if paths_change or g.summary().hubs != self._hubs:
+            self._refresh_distances()
+            redone['popular_distance'] = len(self.popular_distance)
+        else:
+            # new vertices that no hub reaches
+            for v in touched - self._hub_distance.keys():
+                self._hub_distance[v] = math.inf
+                self.popular_distance[v] = -1
+        return redone
 
 
 class NetworkOperations:
@@ -30,24 +1155,15 @@ class NetworkOperations:
         """
         
         def for_given_vertex(v):
-            total_number_of_edges = 0
-            vtx_neighbors = []
-            total_neighbors = 0
-            for neighbor in g.neighbors(v):
-                for neighbor_of_neighbor in g.neighbors(v):
-                    if neighbor_of_neighbor == neighbor: # Ignoring self connection
-                        continue
-                    else:
-                        if neighbor_of_neighbor in vtx_neighbors:
-                            continue
-                        elif neighbor_of_neighbor in g.neighbors(neighbor):
-                            total_number_of_edges +=1
-                total_neighbors += 1
-                vtx_neighbors.append(neighbor) # removing the checked neighbor, cause its alreasy checked with all others
-            if total_neighbors == 1:
+            vtx_neighbors = g._sorted_neighbor_ids(g.index.id(v))
+            total_neighbors = len(vtx_neighbors)
+            if total_neighbors < 2:
                 return 0
-            else:
-                return (total_number_of_edges / ((total_neighbors * (total_neighbors - 1)) / 2))
+            # every edge between two neighbors is found from both of its ends
+            total_number_of_edges = sum(
+                _common_count(vtx_neighbors, g._sorted_neighbor_ids(neighbor))
+                for neighbor in vtx_neighbors) // 2
+            return (total_number_of_edges / ((total_neighbors * (total_neighbors - 1)) / 2))
         
         if vtx != None:
             return for_given_vertex(vtx)
@@ -82,12 +1198,86 @@ class NetworkOperations:
         Returns:
         The Jaccard similarity of vertices, v0 and v1, in g.
         """
-        number_of_equal_vertices = 0
-        for vertex in g.neighbors(v0):
-            if vertex in g.neighbors(v1):
-                number_of_equal_vertices += 1
+        number_of_equal_vertices = _common_count(
+            g._sorted_neighbor_ids(g.index.id(v0)),
+            g._sorted_neighbor_ids(g.index.id(v1)))
         return (number_of_equal_vertices / (g.degree(v0) + g.degree(v1) - number_of_equal_vertices))
 
+    def strength(g: Graph, vtx: int = None):
+        """Returns the strength of vtx, or of every vertex, in g.
+
+        The strength of a vertex is the total weight of its edges; it equals the
+        degree in an unweighted graph.
+
+        vtx = None : strength of every vertex, as a dict
+        vtx != None : strength of vtx
+
+        Args:
+        - g: the graph/network to be checked.
+        - vtx: the vertex whose strength is sought.
+
+        Returns:
+        the strength of vtx, or a dict from vertex to its strength.
+        """
+        compact = g.compact()
+        if vtx is not None:
+            return sum(compact.edge_weights(compact.index.id(vtx)))
+        return {compact.labels[i]: sum(compact.edge_weights(i))
+                for i in range(compact.n)}
+
+    def weighted_clustering(g: Graph, vtx: int = None,
+                            method: str = 'barrat') -> float:
+        """Returns the local or average weighted clustering coefficient in g.
+
+        method = 'barrat' : each triangle through i counts the mean weight of
+                            its two edges at i, normalized by s_i (k_i - 1)
+        method = 'onnela' : each triangle through i counts the geometric mean
+                            of its three weights, scaled by the largest weight
+
+        Both equal `clustering_coefficient` on an unweighted graph.
+
+        vtx = None : average weighted clustering coefficient of g
+        vtx != None : local weighted clustering coefficient of vtx in g
+
+        Args:
+        - g: the graph/network to be checked.
+        - vtx: the vertex at which local clustering coefficient is sought.
+        - method: the weighted generalization to use.
+
+        Returns:
+        the local or average weighted clustering coefficient in g.
+        """
+        assert method in ('barrat', 'onnela'), f'unknown method {method}'
+        compact = g.compact()
+        # all-zero weights leave every triangle at 0 whatever the scale
+        max_weight = (max(compact.weights, default=1) or 1) if compact.weighted else 1
+        if vtx is not None:
+            return _weighted_clustering_kernel(
+                compact, compact.index.id(vtx), method, max_weight)
+        return sum(_weighted_clustering_kernel(compact, i, method, max_weight)
+                   for i in range(compact.n)) / compact.n
+
+    def weighted_average_neighbor_degree(g: Graph, vtx: int) -> float:
+        """Returns the weighted average neighbor degree of vertex vtx in g.
+
+        The degree of each neighbor is weighted by the edge to it:
+        sum(w_ij k_j) / s_i. It equals `average_neighbor_degree` on an
+        unweighted graph.
+
+        Args:
+        - g: the graph/network to be checked.
+        - vtx: the vertex whose weighted average neighbor degree is sought.
+
+        Returns:
+        the weighted average neighbor degree of vtx in g.
+        """
+        compact = g.compact()
+        row = _weighted_rows(compact, compact.index.id(vtx))
+        strength = sum(row.values())
+        if not strength:
+            return 0.0
+        return sum(w * compact.degree(j) for j, w in row.items()) / strength
+
     def popular_distance(g: Graph, vtx: int) -> int:
         """Returns the popular distance of the vertex, vtx, in g.
 
@@ -98,66 +1288,829 @@ class NetworkOperations:
         Returns:
         the popular distance of the vertex, vtx, in g.
         """
-        # finding the popular vertex\vertices
-        popular_vertices = []
-        for vertex in list(g.vertices()):
-            if len(popular_vertices) == 0:
-                popular_vertices.append(vertex)
-                pop_degree = g.degree(vertex)
-            else:
-                if g.degree(vertex) > pop_degree:
-                    popular_vertices = [vertex]
-                    pop_degree = g.degree(vertex) 
-                elif g.degree(vertex) ==  pop_degree:
-                    popular_vertices.append(vertex)
-        # function for the shortest distance of single popular vertex
-        def shortest_path(popular_vertex):
-            dist={}
-            unvisited=[]
-            for node in list(g.vertices()):
-                dist[node] = math.inf
-                unvisited.append(node)
-            dist[vtx]= 0
-            while unvisited:
-                if dist[popular_vertex] != math.inf:
-                    return (dist[popular_vertex])
-                # searching for next vertex with min weight
-                current = unvisited[0]
-                for i in unvisited:
-                    if dist[i] < dist[current]:
-                        current = i
-                unvisited.remove(current)
-                neighbors = list(g.neighbors(current)) # getting all the neighbors
-                for neighbor in neighbors:
-                    weight = g.weight(current, neighbor)
-                    if dist[current] + weight < dist[neighbor]:
-                        dist[neighbor] = dist[current] +  weight
-            return (dist[popular_vertex])
-        # finding the shortest distance of of all popular vertices
-        final_weight = math.inf
-        for vertex in popular_vertices:
-            temp_weight = shortest_path(vertex)
-            if temp_weight < final_weight:
-                final_weight = temp_weight
-        if final_weight == math.inf:
+        # the popular vertex\vertices are kept in the graph summary
+        popular_vertices = g.summary().hubs
+        # popular vertices in other components are unreachable
+        popular_vertices = [v for v in popular_vertices if g.connected(vtx, v)]
+        if not popular_vertices:
             return -1
+        # one search from vtx over the compact arrays, stopping at the first
+        # popular vertex reached, which is the nearest
+        compact = g.compact()
+        offsets, targets, weights = compact.offsets, compact.targets, compact.weights
+        popular = {compact.index.id(v) for v in popular_vertices}
+        source = compact.index.id(vtx)
+        if weights is None:
+            seen = {source}
+            frontier, distance = [source], 0
+            while not popular.intersection(frontier):
+                following = []
+                for v in frontier:
+                    for k in range(offsets[v], offsets[v + 1]):
+                        u = targets[k]
+                        if u not in seen:
+                            seen.add(u)
+                            following.append(u)
+                frontier = following
+                distance += 1
+            return distance
+        dist = {source: 0}
+        settled = set()
+        heap = [(0, source)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if v in settled:
+                continue
+            if v in popular:
+                return int(d)
+            settled.add(v)
+            for k in range(offsets[v], offsets[v + 1]):
+                u = targets[k]
+                du = d + weights[k]
+                if u not in settled and du < dist.get(u, math.inf):
+                    dist[u] = du
+                    heapq.heappush(heap, (du, u))
+        return -1
+
+    def betweenness_centrality(g: Graph, k: int = None, normalized: bool = True,
+                               seed: int = None,
+                               workers: int = 1) -> {int: float}:
+        """Returns the betweenness centrality of every vertex in g.
+
+        The betweenness of a vertex is the fraction of shortest paths between
+        other pairs of vertices that pass through it. It is computed with
+        Brandes' algorithm, taking weights into account if g is weighted.
+
+        Args:
+        - g: the graph/network to be checked.
+        - k: if given, only k randomly chosen sources are searched and the result
+          is scaled up as an estimate.
+        - normalized: whether to divide by the number of pairs of other
+          vertices, (n - 1)(n - 2) / 2.
+        - seed: seeds the choice of sources when sampling.
+        - workers: the number of processes to split the sources among.
+
+        Returns:
+        a dict from vertex to its betweenness centrality.
+        """
+        compact = g.compact()
+        n = compact.n
+        sources = list(range(n))
+        if k is not None and k < n:
+            sources = random.Random(seed).sample(sources, k)
+        between = [0.0] * n
+        for part in _fan_out(_betweenness_kernel, compact, sources, workers):
+            between = [a + b for a, b in zip(between, part)]
+        # every pair was counted from both ends
+        scale = 0.5 * n / len(sources) if sources else 0
+        if normalized:
+            scale = scale * 2 / ((n - 1) * (n - 2)) if n > 2 else 0
+        return {compact.labels[i]: b * scale for i, b in enumerate(between)}
+
+    def closeness_centrality(g: Graph, vtx: int = None, workers: int = 1):
+        """Returns the closeness centrality of vtx, or of every vertex, in g.
+
+        The closeness of a vertex is the reciprocal of its average distance to
+        the vertices it can reach, scaled by the fraction of the others it can
+        reach so that vertices in small components are not ranked high.
+
+        vtx = None : closeness of every vertex, as a dict
+        vtx != None : closeness of vtx
+
+        Args:
+        - g: the graph/network to be checked.
+        - vtx: the vertex whose closeness is sought.
+        - workers: the number of processes to split the vertices among.
+
+        Returns:
+        the closeness centrality of vtx, or a dict from vertex to its closeness.
+        """
+        compact = g.compact()
+        if vtx is not None:
+            return _closeness_kernel(compact, [compact.index.id(vtx)])[0]
+        closeness = []
+        for part in _fan_out(_closeness_kernel, compact, list(range(compact.n)),
+                             workers):
+            closeness.extend(part)
+        return dict(zip(compact.labels, closeness))
+
+    def distance(g: Graph, u: int, v: int) -> float:
+        """Returns the shortest path distance between vertices u and v in g.
+
+        Searches from both ends at once, so that on small-world networks only
+        a small part of g is visited.
+
+        Args:
+        - g: the graph/network to be searched.
+        - u, v: the vertices to join.
+
+        Returns:
+        the distance; math.inf if v cannot be reached from u.
+        """
+        if not g.connected(u, v):
+            return math.inf
+        compact = g.compact()
+        return _bidirectional(compact, compact.index.id(u),
+                              compact.index.id(v))[0]
+
+    def path(g: Graph, u: int, v: int) -> [int]:
+        """Returns a shortest path between vertices u and v in g.
+
+        Searches as `distance` does.
+
+        Args:
+        - g: the graph/network to be searched.
+        - u, v: the vertices to join.
+
+        Returns:
+        the vertices of the path from u to v, both included; [] if v cannot
+        be reached from u.
+        """
+        if not g.connected(u, v):
+            return []
+        compact = g.compact()
+        _, meeting, preds, _ = _bidirectional(compact, compact.index.id(u),
+                                              compact.index.id(v))
+        ids = []
+        i = meeting
+        while i is not None:
+            ids.append(i)
+            i = preds[0][i]
+        ids.reverse()
+        i = preds[1][meeting]
+        while i is not None:
+            ids.append(i)
+            i = preds[1][i]
+        return [compact.labels[i] for i in ids]
+
+    def distance_matrix(g: Graph, sources, targets=None,
+                        workers: int = 1) -> DistanceMatrix:
+        """Returns the shortest path distances from sources to targets in g.
+
+        Use a `ShortestPaths` engine directly to reuse the source trees across
+        queries.
+
+        Args:
+        - g: the graph/network to be searched.
+        - sources: the vertices to measure distances from.
+        - targets: the vertices to measure distances to; all vertices if None.
+        - workers: the number of processes to split the sources among.
+
+        Returns:
+        the distance matrix; math.inf where a target cannot be reached.
+        """
+        return ShortestPaths(g, cache_size=0, workers=workers).matrix(
+            sources, targets)
+
+    def pagerank(g: Graph, damping: float = 0.85, tol: float = 1e-8,
+                 max_iter: int = 100) -> {int: float}:
+        """Returns the PageRank of every vertex in g.
+
+        Computed by power iteration over the adjacency arrays. A walker moves
+        along an edge with probability proportional to its weight, and jumps to
+        a random vertex with probability 1 - damping.
+
+        Args:
+        - g: the graph/network to be checked.
+        - damping: the probability of following an edge.
+        - tol: the iteration stops when the ranks change by less than this in
+          total.
+        - max_iter: the most iterations to run.
+
+        Returns:
+        a dict from vertex to its PageRank; the ranks sum to 1.
+        """
+        compact = g.compact()
+        n = compact.n
+        if n == 0:
+            return {}
+        offsets, targets = compact.offsets, compact.targets
+        weights = compact.weights
+        strength = [sum(compact.edge_weights(i)) for i in range(n)]
+        rank = [1 / n] * n
+        for _ in range(max_iter):
+            dangling = sum(rank[i] for i in range(n) if not strength[i])
+            base = (1 - damping + damping * dangling) / n
+            following = [base] * n
+            for i in range(n):
+                if not strength[i]:
+                    continue
+                share = damping * rank[i] / strength[i]
+                for k in range(offsets[i], offsets[i + 1]):
+                    following[targets[k]] += share * (weights[k] if weights else 1)
+            change = sum(abs(a - b) for a, b in zip(following, rank))
+            rank = following
+            if change < tol:
+                break
+        return dict(zip(compact.labels, rank))
+
+    def modularity(g: Graph, communities: {int: int},
+                   resolution: float = 1.0) -> float:
+        """Returns the modularity of a division of g into communities.
+
+        Q = sum over communities c of in_c / m - resolution * (tot_c / 2m) ** 2,
+        where in_c is the weight of the edges within c, tot_c the total
+        strength of its vertices and m the total weight of the edges.
+
+        Args:
+        - g: the graph/network to be checked.
+        - communities: a dict from each vertex to its community.
+        - resolution: values above 1 favor smaller communities.
+
+        Returns:
+        the modularity; 0 if g has no edge weight.
+        """
+        compact = g.compact()
+        internal = two_m = 0.0
+        total = {}
+        for i in range(compact.n):
+            c = communities[compact.labels[i]]
+            for j, w in _weighted_rows(compact, i).items():
+                two_m += w
+                total[c] = total.get(c, 0) + w
+                if communities[compact.labels[j]] == c:
+                    internal += w
+        if not two_m:
+            return 0.0
+        return internal / two_m - resolution * sum(
+            (t / two_m) ** 2 for t in total.values())
+
+    def louvain(g: Graph, resolution: float = 1.0,
+                seed: int = None) -> {int: int}:
+        """Returns communities of g found by the Louvain method.
+
+        Vertices are moved greedily between neighboring communities while the
+        modularity rises; the communities are then merged into single vertices
+        and the process repeated on the smaller graph until nothing moves.
+        Edge weights are respected.
+
+        Args:
+        - g: the graph/network to be divided.
+        - resolution: values above 1 favor smaller communities.
+        - seed: seeds the order in which vertices are visited.
+
+        Returns:
+        a dict from vertex to community, numbered from 0 in order of their
+        smallest vertex.
+        """
+        compact = g.compact()
+        rows = [_weighted_rows(compact, i) for i in range(compact.n)]
+        loops = [0.0] * compact.n
+        membership = list(range(compact.n))
+        rng = random.Random(seed)
+        while True:
+            community, moved = _louvain_moves(rows, loops, resolution, rng)
+            if not moved:
+                break
+            membership = [community[c] for c in membership]
+            rows, loops = _aggregate(rows, loops, community)
+        return _numbered_communities(compact, membership)
+
+    def label_propagation(g: Graph, seed: int = None, max_iter: int = 100,
+                          workers: int = 1) -> {int: int}:
+        """Returns communities of g found by label propagation.
+
+        Every vertex starts with a label of its own and repeatedly takes the
+        label carrying the most edge weight among its neighbors, until no
+        vertex would change. The vertices are updated one class of a greedy
+        coloring at a time: no two vertices of a class are adjacent, so each
+        class can be updated at once, split among worker processes, with the
+        same result as updating its vertices one by one.
+
+        Args:
+        - g: the graph/network to be divided.
+        - seed: seeds the tie breaking; the result does not depend on workers.
+        - max_iter: the most rounds over all the vertices.
+        - workers: the number of processes to update each class with.
+
+        Returns:
+        a dict from vertex to community, numbered from 0 in order of their
+        smallest vertex.
+        """
+        compact = g.compact()
+        labels = array('i', range(compact.n))
+        classes = _greedy_coloring(compact)
+        rng = random.Random(seed)
+        pool = None
+        if workers > 1:
+            pool = ProcessPoolExecutor(max_workers=workers,
+                                       initializer=_install_compact,
+                                       initargs=(compact,))
+        try:
+            for _ in range(max_iter):
+                salt = rng.getrandbits(32)
+                changed = False
+                for nodes in classes:
+                    if pool is None or len(nodes) < 2 * workers:
+                        parts = [_propagation_kernel(compact, nodes, labels, salt)]
+                    else:
+                        size = math.ceil(len(nodes) / workers)
+                        chunks = [nodes[i:i + size]
+                                  for i in range(0, len(nodes), size)]
+                        parts = pool.map(_propagation_in_worker, chunks,
+                                         [labels] * len(chunks),
+                                         [salt] * len(chunks))
+                    for changes in parts:
+                        for i, label in changes:
+                            labels[i] = label
+                            changed = True
+                if not changed:
+                    break
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return _numbered_communities(compact, labels)
+
+    def core_numbers(g: Graph) -> {int: int}:
+        """Returns the core number of every vertex in g.
+
+        The k-core of g is its largest subgraph in which every vertex has
+        degree at least k; the core number of a vertex is the largest k whose
+        k-core contains it. Computed in linear time by the Batagelj-Zaversnik
+        bucket algorithm.
+
+        Args:
+        - g: the graph/network to be decomposed.
+
+        Returns:
+        a dict from vertex to its core number.
+        """
+        compact = g.compact()
+        return dict(zip(compact.labels, _core_numbers(compact)))
+
+    def k_core(g: Graph, k: int) -> SubgraphView:
+        """Returns the k-core of g as a view.
+
+        The view shares g's storage, so it can be handed to the other
+        measures to restrict them to the well connected part of g.
+
+        Args:
+        - g: the graph/network to be cut down.
+        - k: the least degree of the vertices kept.
+
+        Returns:
+        the subgraph of g on the vertices whose core number is at least k.
+        """
+        return g.subgraph(v for v, core in
+                          NetworkOperations.core_numbers(g).items() if core >= k)
+
+    def top_k(g: Graph, metric: str, k: int, vtx: int = None,
+              min_core: int = None) -> [(int, float)]:
+        """Returns the k vertices of g with the highest value of metric.
+
+        The metric is one of METRICS, computed as by the method of the same name;
+        'similarity' ranks vertices by their similarity to vtx. The vertices are
+        visited in decreasing order of a cheap upper bound on the metric while a
+        bounded heap keeps the best k so far; once no bound can beat the heap's
+        worst, the rest are skipped without computing the metric.
+
+        Args:
+        - g: the graph/network to be checked.
+        - metric: the name of the metric to rank by.
+        - k: the number of vertices sought.
+        - vtx: for 'similarity', the vertex to compare the others with.
+        - min_core: if given, only vertices whose core number is at least this
+          are ranked; their metric is still computed within all of g.
+
+        Returns:
+        up to k (vertex, value) pairs, highest value first; ties go to the lower
+        vertex. Empty if k is not positive.
+        """
+        if k <= 0:
+            return []
+        compact, bound, exact = _metric_kernels(g, metric, vtx)
+        skip = compact.index.id(vtx) if metric == 'similarity' else None
+        candidates = sorted(((bound(i), -i) for i in _core_filter(compact, min_core)
+                             if i != skip), reverse=True)
+        best = []  # min-heap of (value, -id), worst of the best at the top
+        for b, negated in candidates:
+            if len(best) == k and (b, negated) < best[0]:
+                break
+            entry = (exact(-negated), negated)
+            if len(best) < k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+        return [(compact.labels[-negated], value)
+                for value, negated in sorted(best, reverse=True)]
+
+    def above(g: Graph, metric: str, value: float,
+              vtx: int = None, min_core: int = None) -> [(int, float)]:
+        """Returns the vertices of g whose metric is above value.
+
+        The metric is as for `top_k`. Vertices whose cheap upper bound on the
+        metric is not above value are skipped without computing it.
+
+        Args:
+        - g: the graph/network to be checked.
+        - metric: the name of the metric to check.
+        - value: the threshold to exceed.
+        - vtx: for 'similarity', the vertex to compare the others with.
+        - min_core: as for `top_k`.
+
+        Returns:
+        the (vertex, value) pairs above the threshold, highest value first.
+        """
+        compact, bound, exact = _metric_kernels(g, metric, vtx)
+        skip = compact.index.id(vtx) if metric == 'similarity' else None
+        found = []
+        for i in _core_filter(compact, min_core):
+            if i != skip and bound(i) > value:
+                v = exact(i)
+                if v > value:
+                    found.append((compact.labels[i], v))
+        return sorted(found, key=lambda pair: (-pair[1], pair[0]))
+
+    def approximate_clustering(g: Graph, samples: int = None,
+                               error: float = 0.01, confidence: float = 0.95,
+                               kind: str = 'average',
+                               seed: int = None) -> (float, (float, float)):
+        """Estimates the clustering coefficient of g by sampling wedges.
+
+        A wedge is a pair of neighbors of a vertex; it is closed if the pair is
+        itself joined by an edge.
+
+        kind = 'average' : the average clustering coefficient, as returned by
+                           `clustering_coefficient(g)`; wedges are drawn at
+                           uniformly chosen vertices
+        kind = 'global'  : the fraction of all wedges in g that are closed;
+                           vertices are chosen in proportion to their wedges
+
+        Each sample checks a single wedge, so the time taken depends on the
+        number of samples rather than on the size of g, apart from one pass
+        over the vertices (and, for 'global', the cached degree summary).
+
+        Args:
+        - g: the graph/network to be checked.
+        - samples: the number of wedges to check; if None, enough to be within
+          error of the true value with the given confidence.
+        - error: the sought half-width of the confidence interval.
+        - confidence: the probability that the interval holds the true value.
+        - kind: which clustering coefficient to estimate.
+        - seed: seeds the sampling so that estimates can be reproduced.
+
+        Returns:
+        the estimate and the (low, high) confidence interval around it.
+        """
+        assert kind in ('average', 'global'), f'unknown clustering {kind}'
+        rng = random.Random(seed)
+        if samples is None:
+            samples = _sample_size(error, confidence)
+        assert samples >= 1, f'need at least 1 sample, not {samples}'
+        vertices = list(g.vertices())
+        if kind == 'average':
+            centers = [rng.choice(vertices) for _ in range(samples)]
         else:
-            return (int(final_weight))
+            degree = g.summary().degree
+            wedges = [degree(v) * (degree(v) - 1) // 2 for v in vertices]
+            if not any(wedges):
+                return 0.0, (0.0, 0.0)
+            centers = rng.choices(vertices, weights=wedges, k=samples)
+        closed = 0
+        for center in centers:
+            neighbors = list(g.neighbors(center))
+            if len(neighbors) < 2:
+                continue  # no wedge here, counts as open
+            v0, v1 = rng.sample(neighbors, 2)
+            if g.has_edge(v0, v1):
+                closed += 1
+        estimate = closed / samples
+        return estimate, _hoeffding_interval(estimate, samples, confidence)
+
+    def landmark_distances(g: Graph, landmarks: int = 16,
+                           seed: int = None) -> {int: {int: float}}:
+        """Returns the distances from a few landmark vertices to all others.
 
-    def visualize(g: Graph) -> None:
+        Half of the landmarks are the vertices of highest degree, which most
+        shortest paths in small-world networks pass near; the rest are picked
+        at random. The result is meant to be computed once and passed to
+        `approximate_popular_distance`.
+
+        Args:
+        - g: the graph/network to be checked.
+        - landmarks: the number of landmarks.
+        - seed: seeds the choice of the random landmarks.
+
+        Returns:
+        a dict from each landmark to the dict of distances from it.
+        """
+        rng = random.Random(seed)
+        vertices = list(g.vertices())
+        landmarks = min(landmarks, len(vertices))
+        chosen = sorted(vertices, key=g.summary().degree,
+                        reverse=True)[:landmarks // 2]
+        rest = list(set(vertices) - set(chosen))
+        chosen += rng.sample(rest, landmarks - len(chosen))
+        matrix = ShortestPaths(g, cache_size=0).matrix(chosen)
+        return {landmark: matrix.row(landmark) for landmark in chosen}
+
+    def approximate_popular_distance(g: Graph, vtx: int,
+                                     landmarks: {int: {int: float}} = None,
+                                     seed: int = None) -> (int, (int, int)):
+        """Estimates the popular distance of vtx in g from landmark distances.
+
+        By the triangle inequality the distance between vtx and a popular
+        vertex p is at most d(vtx, L) + d(L, p) and at least |d(vtx, L) - d(L, p)|
+        for every landmark L. Once the landmark distances are known each query
+        takes time proportional to the number of landmarks and popular vertices.
+
+        Args:
+        - g: the graph/network to be checked.
+        - vtx: the vertex in g whose popular distance is sought.
+        - landmarks: as returned by `landmark_distances`; computed with its
+          defaults and seed if None.
+        - seed: seeds the choice of landmarks if they are computed here.
+
+        Returns:
+        the estimate, which is the upper bound, and the (low, high) bounds on the
+        popular distance of vtx; all -1 if no popular vertex can be reached.
+        """
+        if landmarks is None:
+            landmarks = NetworkOperations.landmark_distances(g, seed=seed)
+        popular = [v for v in g.summary().hubs if g.connected(vtx, v)]
+        if not popular:
+            return -1, (-1, -1)
+        low, high = math.inf, math.inf
+        for p in popular:
+            if p == vtx:
+                return 0, (0, 0)
+            p_low, p_high = 0, math.inf
+            for dist in landmarks.values():
+                if vtx in dist and p in dist:
+                    p_low = max(p_low, abs(dist[vtx] - dist[p]))
+                    p_high = min(p_high, dist[vtx] + dist[p])
+            low, high = min(low, p_low), min(high, p_high)
+        if high == math.inf:
+            # no landmark shares vtx's component; search it directly
+            dist = ShortestPaths(g, cache_size=0).distances(vtx)
+            high = low = min(dist[p] for p in popular)
+        return int(high), (int(low), int(high))
+
+    def write_dot(g: Graph, path: str, vertices=None) -> int:
+        """Writes g, or the subgraph induced by vertices, to path in DOT format.
+
+        Lines are streamed to the file as the vertices and edges are visited so
+        no in-memory graphviz object is built, whatever the size of g.
+
+        Args:
+        - g: the graph/network to be written.
+        - path: the file to write to.
+        - vertices: if given, only these vertices and the edges between them
+          are written.
+
+        Returns:
+        the number of vertices written.
+        """
+        if vertices is not None:
+            vertices = set(vertices)
+        written = 0
+        with open(path, 'w') as out:
+            out.write('graph {\n')
+            for v in (g.vertices() if vertices is None else vertices):
+                out.write(f'\t"{v}"\n')
+                written += 1
+            for e in g.edges():
+                if vertices is None or (e.v0 in vertices and e.v1 in vertices):
+                    out.write(f'\t"{e.v0}" -- "{e.v1}"\n')
+            out.write('}\n')
+        return written
+
+    def visualize(g: Graph, path: str = 'graph.gv', render: bool = True,
+                  fmt: str = 'pdf', max_vertices: int = 2000,
+                  sample: str = 'degree') -> str:
         """Visualizes g.
 
+        g is streamed to a DOT file at path and, if render is set, laid out
+        headlessly with graphviz; nothing is opened in a viewer. Graphs with
+        more than max_vertices vertices are first cut down so that the layout
+        finishes in reasonable time:
+
+        sample = 'degree' : keep the max_vertices vertices of highest degree
+        sample = 'core'   : keep the densest k-core with at most max_vertices
+                            vertices, sampling the innermost core by degree
+                            if even that is too large
+
         Args:
         - g: the graph/network to be visualized.
+        - path: the DOT file to write.
+        - render: whether to run the graphviz layout on the DOT file.
+        - fmt: the output format of the rendering.
+        - max_vertices: the most vertices to lay out; None for no limit.
+        - sample: how to pick the vertices of a large graph.
 
         Returns:
-        Nothing.
+        the path of the rendered file if render is set, otherwise of the DOT
+        file.
         """
+        assert sample in ('degree', 'core'), f'unknown sampling {sample}'
+
+        def by_degree(candidates):
+            return sorted(candidates, key=g.summary().degree,
+                          reverse=True)[:max_vertices]
+
+        def by_core():
+            # the innermost k-core that fits, or a sample of the innermost core
+            cores = NetworkOperations.core_numbers(g)
+            sizes = collections.Counter(cores.values())
+            kept, k = 0, max(sizes)
+            while k > 0 and kept + sizes[k] <= max_vertices:
+                kept += sizes[k]
+                k -= 1
+            if kept == 0:
+                return by_degree(v for v, core in cores.items()
+                                 if core == max(sizes))
+            return {v for v, core in cores.items() if core > k}
+
+        vertices = None
+        if max_vertices is not None and g.vertex_count() > max_vertices:
+            if sample == 'core':
+                vertices = by_core()
+            else:
+                vertices = by_degree(g.vertices())
+        count = NetworkOperations.write_dot(g, path, vertices)
+        if not render:
+            return path
         # Feel free to play around with the visualization.
         # Graphviz documentation: https://www.graphviz.org
-        layout_engine = 'fdp' if g.vertex_count() < 2000 else 'sfdp'
-        # graph to be visualized
-        vizgraph = graphviz.Graph(engine=layout_engine)
-        _ = [vizgraph.node(str(v)) for v in g.vertices()]
-        vizgraph.edges(map(lambda e: (str(e.v0), str(e.v1)), g.edges()))
-        vizgraph.render(view=True)
+        layout_engine = 'fdp' if count < 2000 else 'sfdp'
+        return graphviz.render(layout_engine, fmt, path)
+
+
+# ----------------------------------------------------Command line----------------------------------------------------------------- #
+
+# the measures the command line can run, by the names used in cases.csv
+OPERATIONS = {'C_D': NetworkOperations.degree_centrality,
+              'C_i': NetworkOperations.clustering_coefficient,
+              'K_i': NetworkOperations.average_neighbor_degree,
+              'J_ij': NetworkOperations.similarity,
+              'D_i': NetworkOperations.popular_distance}
+_ALIASES = {'degree': 'C_D', 'clustering': 'C_i', 'neighbor_degree': 'K_i',
+            'similarity': 'J_ij', 'popular_distance': 'D_i'}
+
+
+class StackSampler:
+    """ Samples the call stack of a thread at a fixed interval. """
+
+    def __init__(self, interval: float = 0.001, thread_id: int = None):
+        """Creates sampler of the thread with thread_id, the calling one by default.
+
+        Args:
+        - self: the instance to create.
+        - interval: the seconds between samples.
+        - thread_id: the identifier of the thread to sample.
+
+        Returns:
+        nothing.
+        """
+        self.interval = interval
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self) -> None:
+        """Records one stack per interval until stopped."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f'{os.path.basename(code.co_filename)}:'
+                             f'{code.co_name}:{code.co_firstlineno}')
+                frame = frame.f_back
+            if stack:
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self) -> None:
+        """Starts sampling in a background thread."""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops sampling."""
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> [str]:
+        """Returns the samples in the collapsed stack format of flamegraph.pl.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        one line per distinct stack, root first: 'f0;f1;...;fn count'.
+        """
+        return [f'{stack} {count}' for stack, count in
+                sorted(self.counts.items(), key=lambda item: -item[1])]
+
+
+def _select_vertices(g: Graph, spec: str, sample: int, seed: int) -> [int]:
+    """Returns the vertices named in spec, e.g. '0,5,33', or a sample of g."""
+    if spec == 'all':
+        return sorted(g.vertices())
+    if spec:
+        return [int(v) for v in spec.split(',')]
+    vertices = sorted(g.vertices())
+    return random.Random(seed).sample(vertices, min(sample, len(vertices)))
+
+
+def main(argv: [str] = None) -> int:
+    """Runs measures over a dataset and reports where the time goes.
+
+    Results are written to stdout in the format of cases.csv,
+    file,op,vtx,result; the timings of parsing, building and each measure,
+    and any profile, go to stderr.
+
+    Args:
+    - argv: the command line arguments; sys.argv[1:] by default.
+
+    Returns:
+    the exit status.
+    """
+    parser = argparse.ArgumentParser(
+        prog='python -m networks',
+        description='Run network measures on an edge list file.')
+    parser.add_argument('path', help='the edge list file')
+    parser.add_argument('ops', nargs='+',
+                        choices=sorted(OPERATIONS) + sorted(_ALIASES),
+                        help='the measures to run')
+    parser.add_argument('--imp', default='list', choices=sorted(IMPLEMENTATIONS),
+                        help='the graph implementation (default: list)')
+    parser.add_argument('--vertices', default='',
+                        help="comma separated vertices, or 'all'; J_ij pairs "
+                             'each vertex with the next one')
+    parser.add_argument('--sample', type=int, default=10,
+                        help='the number of random vertices when --vertices '
+                             'is not given (default: 10)')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='seeds the vertex sample')
+    parser.add_argument('--profile', choices=('cprofile', 'sample'),
+                        help='profile the run with cProfile or a stack sampler')
+    parser.add_argument('--interval', type=float, default=0.001,
+                        help='the seconds between stack samples')
+    parser.add_argument('--output',
+                        help='where to write the profile: pstats data for '
+                             'cprofile, collapsed stacks for sample')
+    args = parser.parse_args(argv)
+    ops = [_ALIASES.get(op, op) for op in args.ops]
+
+    profiler = sampler = None
+    if args.profile == 'cprofile':
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    elif args.profile == 'sample':
+        sampler = StackSampler(args.interval)
+        sampler.start()
+
+    timings = []
+    start = time.perf_counter()
+    with open(args.path, 'rb') as f:
+        parsed = _parse_lines(f.read().split(b'\n'))
+    timings.append(('parse', time.perf_counter() - start))
+    start = time.perf_counter()
+    g = Graph.from_arrays(*parsed, imp=args.imp)
+    timings.append(('build', time.perf_counter() - start))
+
+    vertices = _select_vertices(g, args.vertices, args.sample, args.seed)
+    name = os.path.splitext(os.path.basename(args.path))[0]
+    for op in ops:
+        start = time.perf_counter()
+        if op == 'J_ij':
+            rows = [(f'{v0}:{v1}', OPERATIONS[op](g, v0, v1))
+                    for v0, v1 in zip(vertices, vertices[1:])]
+        else:
+            rows = [(v, OPERATIONS[op](g, v)) for v in vertices]
+        timings.append((op, time.perf_counter() - start))
+        for vtx, result in rows:
+            print(f'{name},{op},{vtx},{result}')
+
+    if profiler is not None:
+        profiler.disable()
+        if args.output:
+            profiler.dump_stats(args.output)
+        import pstats
+        pstats.Stats(profiler, stream=sys.stderr).sort_stats(
+            'cumulative').print_stats(25)
+    elif sampler is not None:
+        sampler.stop()
+        lines = sampler.collapsed()
+        if args.output:
+            with open(args.output, 'w') as f:
+                f.writelines(line + '\n' for line in lines)
+        else:
+            print('\n'.join(lines), file=sys.stderr)
+
+    total = sum(seconds for _, seconds in timings)
+    for phase, seconds in timings:
+        print(f'{phase:>6} {1000 * seconds:10.1f} ms {100 * seconds / total:5.1f}%',
+              file=sys.stderr)
+    print(f'{g.vertex_count()} vertices, {g.edge_count()} edges, '
+          f'{len(vertices)} selected, imp={args.imp}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
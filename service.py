@@ -0,0 +1,220 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from networks import *
+
+# queries answered on the event loop; everything else goes to the worker pool
+CHEAP_OPS = {'degree', 'has_vertex', 'has_edge', 'vertex_count', 'edge_count',
+             'degree_centrality'}
+HEAVY_OPS = {'clustering_coefficient', 'average_neighbor_degree', 'similarity',
+             'popular_distance', 'strength', 'weighted_clustering',
+             'weighted_average_neighbor_degree'}
+
+# graphs held by each worker process, installed once when the pool starts
+_worker_graphs = {}
+
+
+def _install_graphs(graphs: {str: Graph}) -> None:
+    """Makes graphs available to the queries run in this worker process.
+
+    Args:
+    - graphs: the graphs by name.
+
+    Returns:
+    nothing.
+    """
+    _worker_graphs.update(graphs)
+
+
+def _run_query(graphs: {str: Graph}, name: str, op: str, args: tuple):
+    """Runs the operation, op, with args on the graph called name in graphs.
+
+    Graph primitives, e.g. degree, are called on the graph; anything else is a
+    `NetworkOperations` measure that is passed the graph first.
+
+    Args:
+    - graphs: the graphs by name.
+    - name: the graph to query.
+    - op: the operation to run.
+    - args: the arguments after the graph, e.g. the vertex.
+
+    Returns:
+    the result of the operation.
+    """
+    g = graphs[name]
+    if hasattr(Graph, op):
+        return getattr(g, op)(*args)
+    return getattr(NetworkOperations, op)(g, *args)
+
+
+def _run_in_worker(name: str, op: str, args: tuple):
+    """Runs a query against the graphs installed in this worker process."""
+    return _run_query(_worker_graphs, name, op, args)
+
+
+class MetricsService:
+    """ Answers network measure queries concurrently over graphs held in memory. """
+
+    def __init__(self, graphs: {str: Graph}, workers: int = None):
+        """Creates service over the given graphs.
+
+        The worker processes are started on the first heavy query; each gets
+        its own copy of the graphs.
+
+        Args:
+        - self: the instance to create.
+        - graphs: the graphs to serve by name.
+        - workers: the number of worker processes; defaults to the CPU count.
+
+        Returns:
+        nothing.
+        """
+        self.graphs = dict(graphs)
+        self.workers = workers
+        self._pool = None
+        self._in_flight = {}
+        self._latencies = {}
+
+    async def query(self, graph: str, op: str, *args):
+        """Returns the result of op on graph with args, e.g. a vertex.
+
+        Cheap queries are answered inline. Heavy ones run in the worker pool, and
+        a query identical to one still in flight waits for that one's result
+        instead of being run again.
+
+        Args:
+        - self: the instance to operate on.
+        - graph: the name of the graph to query.
+        - op: one of CHEAP_OPS or HEAVY_OPS.
+        - args: the arguments of op after the graph.
+
+        Returns:
+        the result of the query.
+        """
+        assert graph in self.graphs, f'unknown graph {graph}'
+        assert op in CHEAP_OPS or op in HEAVY_OPS, f'unsupported operation {op}'
+        start = time.perf_counter()
+        if op in CHEAP_OPS:
+            result = _run_query(self.graphs, graph, op, args)
+        else:
+            key = (graph, op, args)
+            task = self._in_flight.get(key)
+            if task is None:
+                task = asyncio.ensure_future(self._offload(graph, op, args))
+                self._in_flight[key] = task
+                task.add_done_callback(lambda _: self._in_flight.pop(key, None))
+            result = await asyncio.shield(task)
+        self._record(op, time.perf_counter() - start)
+        return result
+
+    async def _offload(self, graph: str, op: str, args: tuple):
+        """Runs a heavy query in the worker pool."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                             initializer=_install_graphs,
+                                             initargs=(self.graphs,))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, _run_in_worker,
+                                          graph, op, args)
+
+    def _record(self, op: str, seconds: float) -> None:
+        """Adds the latency of one query of op to the statistics."""
+        count, total, worst = self._latencies.get(op, (0, 0.0, 0.0))
+        self._latencies[op] = (count + 1, total + seconds, max(worst, seconds))
+
+    def latency(self) -> {str: dict}:
+        """Returns the latency statistics of the queries answered so far.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        a dict from operation to a dict with the number of queries, and their
+        mean and maximum latency in milliseconds.
+        """
+        return {op: {'count': count, 'mean_ms': 1000 * total / count,
+                     'max_ms': 1000 * worst}
+                for op, (count, total, worst) in self._latencies.items()}
+
+    def close(self) -> None:
+        """Shuts the worker pool down.
+
+        Args:
+        - self: the instance to operate on.
+
+        Returns:
+        nothing.
+        """
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    async def handle(self, reader, writer) -> None:
+        """Serves one client connection speaking JSON lines.
+
+        Each request line is an object such as
+        {"graph": "karate", "op": "popular_distance", "args": [12]} and is
+        answered with {"result": ..., "latency_ms": ...} or {"error": ...}.
+        Requests on a connection are answered concurrently, in completion order,
+        so each response also echoes the request's "id" if it had one.
+
+        Args:
+        - self: the instance to operate on.
+        - reader, writer: the streams of the connection.
+
+        Returns:
+        nothing.
+        """
+        async def answer(line):
+            start = time.perf_counter()
+            request = {}
+            try:
+                request = json.loads(line)
+                result = await self.query(request['graph'], request['op'],
+                                          *request.get('args', ()))
+                response = {'result': result}
+            except Exception as error:
+                response = {'error': f'{type(error).__name__}: {error}'}
+            response['latency_ms'] = 1000 * (time.perf_counter() - start)
+            if isinstance(request, dict) and 'id' in request:
+                response['id'] = request['id']
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        pending = set()
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if line.strip():
+                task = asyncio.ensure_future(answer(line))
+                pending.add(task)
+                # drop answered requests, so long-lived connections do not grow
+                task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.wait(pending)
+        writer.close()
+
+
+async def serve(service: MetricsService, path: str = None,
+                host: str = '127.0.0.1', port: int = 8201) -> None:
+    """Serves queries to service on a Unix socket at path, or on host:port.
+
+    Runs until cancelled.
+
+    Args:
+    - service: the service answering the queries.
+    - path: the Unix socket to listen on; TCP is used if None.
+    - host, port: the TCP address to listen on.
+
+    Returns:
+    nothing.
+    """
+    if path is not None:
+        server = await asyncio.start_unix_server(service.handle, path)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,324 @@
+import heapq
+import math
+import random
+import time
+
+import pytest
+
+from graphs import _parse_lines
+from networks import *
+
+BACKENDS = sorted(IMPLEMENTATIONS)
+MUTABLE = [imp for imp in BACKENDS if imp != 'frozen']
+
+
+def random_edge_list(seed, weighted):
+    """Returns a random edge list and the reference graph it describes.
+
+    Labels mix small, negative and 64-bit values; weights, when present, mix
+    zeros, ints and floats, and some weighted lines leave the weight out. Some
+    pairs are listed again, in either order and with another weight, and some
+    lines are self-loops. The reference is a dict from vertex to a dict from
+    neighbor to edge weight: loops are ignored and a repeated pair keeps the
+    weight of its last line.
+    """
+    rng = random.Random(seed)
+    n = rng.randint(2, 40)
+    labels = rng.sample(range(-100, 1000), n)
+    for i in rng.sample(range(n), rng.randint(0, 2)):
+        labels[i] = rng.randrange(2 ** 33, 2 ** 40)
+    pairs = [(a, b) for a in range(n) for b in range(a + 1, n)]
+    pairs = rng.sample(pairs, rng.randint(1, min(len(pairs), 3 * n)))
+    pairs += [rng.choice(pairs) for _ in range(rng.randint(0, len(pairs) // 3))]
+    pairs += [(a, a) for a in rng.sample(range(n), rng.randint(0, 3))]
+    rng.shuffle(pairs)
+    lines, reference = [], {}
+    for a, b in pairs:
+        u, v = labels[a], labels[b]
+        if rng.random() < 0.5:
+            u, v = v, u
+        if weighted and rng.random() < 0.9:
+            w = rng.choice([0, 1, 2, 7, 0.5, 0.25, 3.75])
+            lines.append(f'{u} {v} {w}')
+        else:
+            w = 1
+            lines.append(f'{u} {v}')
+        if u != v:
+            reference.setdefault(u, {})[v] = w
+            reference.setdefault(v, {})[u] = w
+    if weighted and not any(len(line.split()) == 3 for line in lines
+                            if line.split()[0] != line.split()[1]):
+        # keep the graph weighted; the last line wins either way
+        u, v = lines[-1].split()[:2]
+        if u == v:
+            a, b = rng.choice([p for p in pairs if p[0] != p[1]])
+            u, v = labels[a], labels[b]
+        lines.append(f'{u} {v} 2')
+        reference[int(u)][int(v)] = reference[int(v)][int(u)] = 2
+    return '\n'.join(lines), reference
+
+
+def reference_distances(reference, source):
+    """Returns the shortest distances from source with a heap Dijkstra."""
+    dist = {source: 0}
+    heap = [(0, source)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for v, w in reference[u].items():
+            if d + w < dist.get(v, math.inf):
+                dist[v] = d + w
+                heapq.heappush(heap, (d + w, v))
+    return dist
+
+
+def reference_clustering(reference, v):
+    nbrs = list(reference[v])
+    if len(nbrs) < 2:
+        return 0.0
+    links = sum(1 for i, a in enumerate(nbrs) for b in nbrs[i + 1:]
+                if b in reference[a])
+    return links / (len(nbrs) * (len(nbrs) - 1) / 2)
+
+
+def reference_popular_distance(reference, v):
+    top = max(len(nbrs) for nbrs in reference.values())
+    dist = reference_distances(reference, v)
+    reachable = [dist[h] for h in reference
+                 if len(reference[h]) == top and h in dist]
+    return int(min(reachable)) if reachable else -1
+
+
+def edge_set(edges):
+    return {frozenset((e.v0, e.v1)) for e in edges}
+
+
+def check_primitives(g, reference, weighted):
+    assert set(g.vertices()) == set(reference)
+    assert g.vertex_count() == len(reference)
+    assert edge_set(g.edges()) == {frozenset((u, v)) for u in reference
+                                   for v in reference[u]}
+    assert g.edge_count() == sum(map(len, reference.values())) // 2
+    assert g.has_weights() == weighted
+    weights = {frozenset((e.v0, e.v1)): w for e, w in g.weighted_edges()}
+    for u in reference:
+        assert g.has_vertex(u)
+        assert sorted(g.neighbors(u)) == sorted(reference[u]), u
+        assert g.sorted_neighbors(u) == sorted(reference[u]), u
+        assert g.degree(u) == len(reference[u]), u
+        for v in reference:
+            assert g.has_edge(u, v) == (v in reference[u]), (u, v)
+        for v, w in reference[u].items():
+            assert g.weight(u, v) == w, (u, v)
+            assert weights[frozenset((u, v))] == w, (u, v)
+    assert not g.has_vertex(-101)
+
+
+def measures(g, reference):
+    """Returns every measure of g worth comparing across implementations."""
+    vertices = sorted(reference)
+    ops = NetworkOperations
+    return {
+        'C_D': [ops.degree_centrality(g, v) for v in vertices],
+        'C_i': [ops.clustering_coefficient(g, v) for v in vertices],
+        'C': ops.clustering_coefficient(g),
+        'K_i': [ops.average_neighbor_degree(g, v) for v in vertices],
+        'J_ij': [ops.similarity(g, u, v) for u in vertices[:6] for v in vertices],
+        'D_i': [ops.popular_distance(g, v) for v in vertices],
+        'distance': [ops.distance(g, vertices[0], v) for v in vertices],
+        'path': [ops.path(g, vertices[-1], v) for v in vertices],
+        'strength': [ops.strength(g, v) for v in vertices],
+        'barrat': [ops.weighted_clustering(g, v) for v in vertices],
+        'onnela': [ops.weighted_clustering(g, v, 'onnela') for v in vertices],
+        'K_w': [ops.weighted_average_neighbor_degree(g, v) for v in vertices],
+        'betweenness': sorted(ops.betweenness_centrality(g).items()),
+        'closeness': sorted(ops.closeness_centrality(g).items()),
+        'pagerank': sorted(ops.pagerank(g).items()),
+        'top_k': [v for v, _ in ops.top_k(g, 'clustering_coefficient', 5)],
+        'components': sorted(g.component_sizes().items()),
+        'summary': (g.summary().hubs, g.summary().histogram),
+    }
+
+
+def assert_same(expected, actual, where):
+    assert expected.keys() == actual.keys()
+    for name in expected:
+        a, b = expected[name], actual[name]
+        assert type(a) == type(b) and repr(a) == repr(b) or \
+            _close(a, b), f'{where} disagrees on {name}: {a} != {b}'
+
+
+def _close(a, b):
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_close(x, y) for x, y in zip(a, b))
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+    return a == b
+
+
+@pytest.mark.parametrize('weighted', [False, True])
+@pytest.mark.parametrize('seed', range(25))
+def test_backends_agree(seed, weighted):
+    edges, reference = random_edge_list(seed, weighted)
+    results = {}
+    for imp in BACKENDS:
+        g = Graph(edges, imp=imp)
+        check_primitives(g, reference, weighted)
+        results[imp] = measures(g, reference)
+    expected = results[BACKENDS[0]]
+    for imp in BACKENDS[1:]:
+        assert_same(expected, results[imp], imp)
+
+    vertices = sorted(reference)
+    assert expected['C_i'] == pytest.approx(
+        [reference_clustering(reference, v) for v in vertices])
+    assert expected['D_i'] == [reference_popular_distance(reference, v)
+                               for v in vertices]
+    dist = reference_distances(reference, vertices[0])
+    assert expected['distance'] == pytest.approx(
+        [dist.get(v, math.inf) for v in vertices])
+    dist = reference_distances(reference, vertices[-1])
+    for v, path in zip(vertices, expected['path']):
+        if v not in dist:
+            assert path == []
+            continue
+        assert path[0] == vertices[-1] and path[-1] == v
+        assert sum(reference[a][b] for a, b in zip(path, path[1:])) == \
+            pytest.approx(dist[v])
+    assert expected['strength'] == pytest.approx(
+        [sum(reference[v].values()) for v in vertices])
+
+
+@pytest.mark.parametrize('imp', BACKENDS)
+def test_repeated_edges_and_loops(imp):
+    # a pair listed twice is one edge with the weight of its last line, and
+    # a self-loop is no edge at all, whichever way the graph is built
+    g = Graph('1 2\n2 1', imp)
+    assert (g.degree(1), g.degree(2), g.edge_count()) == (1, 1, 1)
+    g = Graph('1 2 3\n2 1 5\n2 2 4\n3 3', imp)
+    assert sorted(g.vertices()) == [1, 2] and g.edge_count() == 1
+    assert g.weight(1, 2) == g.weight(2, 1) == 5
+    g = Graph.from_arrays([1, 2, 3], [0, 1, 0, 2], [1, 0, 0, 2],
+                          [3, 5, 4, 9], imp)
+    assert sorted(g.vertices()) == [1, 2, 3] and g.edge_count() == 1
+    assert g.degree(3) == 0 and g.weight(1, 2) == 5
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_fast_paths_agree(seed):
+    edges, reference = random_edge_list(seed, weighted=seed % 2 == 1)
+    g = Graph(edges, imp='list')
+    expected = measures(g, reference)
+
+    compact = g.compact()
+    for i in range(compact.n):
+        v = compact.labels[i]
+        assert [compact.labels[j] for j in compact.neighbors(i)] == \
+            sorted(reference[v])
+        assert list(compact.edge_weights(i)) == \
+            [reference[v][u] for u in sorted(reference[v])]
+        assert g.summary().degree(v) == len(reference[v])
+
+    for imp in BACKENDS:
+        whole = Graph(edges, imp=imp).subgraph(reference)
+        check_primitives(whole, reference, g.has_weights())
+        assert_same(expected, measures(whole, reference), f'{imp} subgraph')
+
+        rebuilt = Graph.from_arrays(
+            *(_parse_lines(edges.splitlines())), imp=imp)
+        check_primitives(rebuilt, reference, g.has_weights())
+        assert_same(expected, measures(rebuilt, reference), f'{imp} from_arrays')
+
+
+def test_parallel_load_agrees(tmp_path):
+    for seed in range(4):
+        edges, reference = random_edge_list(seed, weighted=seed % 2 == 1)
+        path = tmp_path / f'{seed}.txt'
+        path.write_text(edges)
+        for imp in BACKENDS:
+            g = load_edge_list(str(path), imp=imp, workers=2)
+            check_primitives(g, reference, seed % 2 == 1)
+
+
+def test_backend_timings(record_property):
+    """Times each backend on the same graph against the reference paths.
+
+    The timings are recorded as test properties, e.g. in the junit report, and
+    printed with -s; only the results are asserted on.
+    """
+    rng = random.Random(1)
+    n = 600
+    edges = {(a, b) for a, b in (rng.sample(range(n), 2) for _ in range(4 * n))}
+    text = '\n'.join(f'{a} {b} {rng.randint(1, 5)}' for a, b in edges)
+    sample = sorted(rng.sample(range(n), 20))
+
+    def timed(f):
+        start = time.perf_counter()
+        result = f()
+        return result, time.perf_counter() - start
+
+    reference = {}
+    for line in text.splitlines():
+        a, b, w = map(int, line.split())
+        reference.setdefault(a, {})[b] = w
+        reference.setdefault(b, {})[a] = w
+    sample = [v for v in sample if v in reference]
+    timings = {'reference': {}}
+    expected, timings['reference']['C_i'] = timed(
+        lambda: [reference_clustering(reference, v) for v in sample])
+    expected_d, timings['reference']['D_i'] = timed(
+        lambda: [reference_popular_distance(reference, v) for v in sample])
+    for imp in BACKENDS:
+        timings[imp] = {}
+        g, timings[imp]['build'] = timed(lambda: Graph(text, imp=imp))
+        clustering, timings[imp]['C_i'] = timed(
+            lambda: [NetworkOperations.clustering_coefficient(g, v)
+                     for v in sample])
+        distances, timings[imp]['D_i'] = timed(
+            lambda: [NetworkOperations.popular_distance(g, v) for v in sample])
+        assert clustering == pytest.approx(expected), imp
+        assert distances == expected_d, imp
+    for imp, ops in timings.items():
+        for op, seconds in ops.items():
+            record_property(f'{imp}.{op}', seconds)
+        print(imp, ' '.join(f'{op}={1000 * s:.1f}ms' for op, s in ops.items()))
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_apply_matches_rebuild(seed):
+    rng = random.Random(seed)
+    weighted = seed % 2 == 1
+    old, _ = random_edge_list(seed, weighted)
+    lines = old.splitlines()
+    rng.shuffle(lines)
+    lines = lines[len(lines) // 4:]
+    if weighted:
+        lines = [line if rng.random() < 0.8 else line.rsplit(' ', 1)[0] + ' 9'
+                 for line in lines]
+    new_edges, reference = random_edge_list(seed + 100, weighted)
+    new = '\n'.join(lines + new_edges.splitlines()[:5])
+    pairs = {}
+    for line in new.splitlines():
+        v0, v1, *w = line.split()
+        if v0 != v1:
+            pairs[frozenset((int(v0), int(v1)))] = line
+    new = '\n'.join(pairs.values())
+    reference = {}
+    for line in new.splitlines():
+        v0, v1, *w = line.split()
+        w = float(w[0]) if w else 1
+        reference.setdefault(int(v0), {})[int(v1)] = w
+        reference.setdefault(int(v1), {})[int(v0)] = w
+    for imp in MUTABLE:
+        g = Graph(old, imp=imp)
+        metrics = IncrementalMetrics(g)
+        metrics.apply(diff_edge_lists(old, new))
+        check_primitives(g, reference, weighted)
+        fresh = Graph(new, imp=imp)
+        assert_same(measures(fresh, reference), measures(g, reference), imp)
+        assert metrics.popular_distance == {
+            v: NetworkOperations.popular_distance(fresh, v) for v in reference}
+        assert metrics.clustering == pytest.approx({
+            v: NetworkOperations.clustering_coefficient(fresh, v)
+            for v in reference})
@@ -0,0 +1,69 @@
+import math
+
+import pytest
+
+from generators import *
+
+
+def edge_set(g):
+    return {frozenset((e.v0, e.v1)) for e in g.edges()}
+
+
+def assert_simple(g, n):
+    assert sorted(g.vertices()) == list(range(n))
+    edges = edge_set(g)
+    assert len(edges) == g.edge_count()
+    assert all(len(e) == 2 for e in edges), 'self-loop'
+
+
+@pytest.mark.parametrize('generate', [
+    lambda imp, seed: gnp_graph(300, 0.02, imp, seed),
+    lambda imp, seed: gnm_graph(300, 900, imp, seed),
+    lambda imp, seed: barabasi_albert_graph(300, 3, imp, seed),
+    lambda imp, seed: configuration_model_graph([2, 3, 4, 5] * 75, imp, seed),
+], ids=['gnp', 'gnm', 'barabasi_albert', 'configuration_model'])
+def test_seeded_and_backend_independent(generate):
+    g = generate('list', 7)
+    assert_simple(g, 300)
+    assert edge_set(generate('list', 7)) == edge_set(g)
+    assert edge_set(generate('list', 8)) != edge_set(g)
+    for imp in sorted(IMPLEMENTATIONS):
+        assert edge_set(generate(imp, 7)) == edge_set(g), imp
+
+
+def test_gnp_graph():
+    n, p = 2000, 0.004
+    g = gnp_graph(n, p, seed=1)
+    assert_simple(g, n)
+    expected = p * n * (n - 1) / 2
+    assert abs(g.edge_count() - expected) < 5 * math.sqrt(expected)
+    assert gnp_graph(50, 0.0).edge_count() == 0
+    assert gnp_graph(50, 1.0).edge_count() == 50 * 49 // 2
+
+
+def test_gnm_graph():
+    g = gnm_graph(1000, 5000, seed=1)
+    assert_simple(g, 1000)
+    assert g.edge_count() == 5000
+    assert gnm_graph(20, 190, seed=1).edge_count() == 190
+    assert gnm_graph(20, 0).edge_count() == 0
+
+
+def test_barabasi_albert_graph():
+    n, m = 3000, 4
+    g = barabasi_albert_graph(n, m, seed=1)
+    assert_simple(g, n)
+    assert g.edge_count() == m * (n - m)
+    assert all(g.degree(v) >= m for v in range(m + 1, n))
+    # preferential attachment grows hubs far above the mean degree
+    assert g.summary().max_degree > 10 * g.summary().mean_degree
+
+
+def test_configuration_model_graph():
+    degrees = [1] * 500 + [3] * 300 + [40] * 5
+    g = configuration_model_graph(degrees, seed=1)
+    assert_simple(g, len(degrees))
+    assert all(g.degree(v) <= d for v, d in enumerate(degrees))
+    assert sum(g.degree(v) for v in g.vertices()) >= 0.95 * sum(degrees)
+    with pytest.raises(AssertionError):
+        configuration_model_graph([1, 1, 1])
@@ -1,16 +1,26 @@
 import collections
+import heapq
+import math
+import os
+import pickle
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
 from networks import *
-from urllib.request import urlopen
 
-path = 'https://waqarsaleem.github.io/cs201/hw3/'
+DATASETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets')
 
 
 def fetch_testcases(path):
     TestCase = collections.namedtuple(
         'TestCase', ['file', 'op', 'vtx', 'result'])
     testcases = []
-    csv_lines = [line.decode('utf-8').strip()
-                 for line in urlopen(path).readlines()[1:]]
+    with open(path) as f:
+        # skip the comment lines, then the header
+        csv_lines = [line.strip() for line in f
+                     if not line.startswith('#')][1:]
     for row in csv_lines:
         if not row:
             continue
@@ -20,230 +30,703 @@ def fetch_testcases(path):
     return testcases
 
 
-cases = fetch_testcases(path+'cases.csv')
-# print(cases)
+# self-generated regression results; see the comment at the top of the file
+cases = fetch_testcases(os.path.join(DATASETS, 'cases.csv'))
 
 
 def fetch_content(fname):
     fname += '.txt'
-    try:
-        return open(fname).read()
-    except FileNotFoundError:
-        global path
-        fstr = urlopen(path+'datasets/'+fname).read().decode('utf-8').strip()
-        fstr.replace('\r', '')
-        open(fname, 'w').write(fstr)
-        return fstr
+    with open(os.path.join(os.path.dirname(DATASETS), fname)) as f:
+        return f.read()
+
+
+@pytest.fixture(scope='session')
+def graphs():
+    """Returns a function building the graph of (file, imp) once per session.
+
+    The graphs are shared by the tests, which must not modify them.
+    """
+    built = {}
+
+    def build(fname, imp='list'):
+        if (fname, imp) not in built:
+            built[fname, imp] = Graph(
+                fetch_content(os.path.join('datasets', fname)), imp=imp)
+        return built[fname, imp]
+    return build
+
+
+def cases_of(op):
+    return pytest.mark.parametrize(
+        'case', [case for case in cases if case.op == op],
+        ids=lambda case: f'{case.file}-{case.vtx}')
+
+
+backends = pytest.mark.parametrize('imp', sorted(IMPLEMENTATIONS))
+
+
+@backends
+@cases_of('C_D')
+def test_degree_centrality(graphs, imp, case):
+    g = graphs(case.file, imp)
+    v = int(case.vtx)
+    myresult = round(100 * NetworkOperations.degree_centrality(g, v))
+    assert int(case.result) == myresult, \
+        f'{imp} failed degree centrality. myresult: {myresult}, testcase: {case}'
+
+
+@backends
+@cases_of('C_i')
+def test_clustering_coefficient(graphs, imp, case):
+    g = graphs(case.file, imp)
+    v = int(case.vtx)
+    myresult = round(100 * NetworkOperations.clustering_coefficient(g, v))
+    assert int(case.result) == myresult, \
+        f'{imp} failed clustering coefficient. '\
+        f'myresult: {myresult}, testcase: {case}'
+
+
+@backends
+@cases_of('K_i')
+def test_average_neighbor_degree(graphs, imp, case):
+    g = graphs(case.file, imp)
+    v = int(case.vtx)
+    myresult = round(NetworkOperations.average_neighbor_degree(g, v))
+    assert int(case.result) == myresult, \
+        f'{imp} failed average neighbor degree. '\
+        f'myresult: {myresult}, testcase: {case}'
+
+
+@backends
+@cases_of('J_ij')
+def test_similarity(graphs, imp, case):
+    g = graphs(case.file, imp)
+    v0, v1 = map(int, case.vtx.split(':'))
+    myresult = round(100 * NetworkOperations.similarity(g, v0, v1))
+    assert int(case.result) == myresult, \
+        f'{imp} failed similarity. myresult: {myresult}, testcase: {case}'
+
+
+@backends
+@cases_of('D_i')
+def test_popular_distance(graphs, imp, case):
+    g = graphs(case.file, imp)
+    v = int(case.vtx)
+    myresult = round(NetworkOperations.popular_distance(g, v))
+    assert int(case.result) == myresult, \
+        f'{imp} failed popular distance. myresult: {myresult}, testcase: {case}'
+
+
+def reference_graph(fname):
+    """Returns the graph in the dataset fname as a dict from vertex to a dict
+    from neighbor to edge weight, parsed without the graphs module."""
+    adjacency = {}
+    for line in fetch_content(os.path.join('datasets', fname)).splitlines():
+        fields = line.split()
+        if len(fields) < 2 or fields[0] == fields[1]:
+            continue
+        v0, v1 = int(fields[0]), int(fields[1])
+        weight = float(fields[2]) if len(fields) == 3 else 1
+        adjacency.setdefault(v0, {})[v1] = weight
+        adjacency.setdefault(v1, {})[v0] = weight
+    return adjacency
+
+
+def reference_result(adjacency, op, vtx):
+    """Returns the rounded result of the measure op, straight from its
+    definition in hw3.tex, for comparison with the result column of a case."""
+    if op == 'J_ij':
+        v0, v1 = map(int, vtx.split(':'))
+        a, b = set(adjacency[v0]), set(adjacency[v1])
+        return round(100 * len(a & b) / len(a | b))
+    v = int(vtx)
+    nbrs = adjacency[v]
+    if op == 'C_D':
+        return round(100 * len(nbrs) / (len(adjacency) - 1))
+    if op == 'C_i':
+        links = sum(1 for a in nbrs for b in nbrs if a < b and b in adjacency[a])
+        k = len(nbrs)
+        return round(100 * links / (k * (k - 1) / 2)) if k > 1 else 0
+    if op == 'K_i':
+        return round(sum(len(adjacency[u]) for u in nbrs) / len(nbrs))
+    assert op == 'D_i', op
+    # heap Dijkstra over the whole component, then the nearest hub
+    top = max(map(len, adjacency.values()))
+    dist, heap = {v: 0}, [(0, v)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for x, w in adjacency[u].items():
+            if d + w < dist.get(x, math.inf):
+                dist[x] = d + w
+                heapq.heappush(heap, (d + w, x))
+    reached = [dist[h] for h in adjacency if len(adjacency[h]) == top and h in dist]
+    return int(min(reached)) if reached else -1
 
 
-def test_degree_centrality_set():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_D':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='sets')
-            v = int(case.vtx.strip())
-            myresult = round(100 * NetworkOperations.degree_centrality(g, v))
-            assert int(case.result) == myresult, \
-                'SetGraph failed degree centrality. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_degree_centrality_matrix():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_D':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='matrix')
-            v = int(case.vtx.strip())
-            myresult = round(100 * NetworkOperations.degree_centrality(g, v))
-            assert int(case.result) == myresult, \
-                'AdjacencyMatrix failed degree centrality. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_degree_centrality_list():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_D':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='list')
-            v = int(case.vtx.strip())
-            myresult = round(100 * NetworkOperations.degree_centrality(g, v))
-            assert int(case.result) == myresult, \
-                'AdjacencyList failed degree centrality. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_clustering_coefficient_set():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='sets')
-            v = int(case.vtx.strip())
-            myresult = round(
-                100 * NetworkOperations.clustering_coefficient(g, v))
-            assert int(case.result) == myresult, \
-                'SetGraph failed clustering coefficient. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_clustering_coefficient_matrix():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='matrix')
-            v = int(case.vtx.strip())
-            myresult = round(
-                100 * NetworkOperations.clustering_coefficient(g, v))
-            assert int(case.result) == myresult, \
-                'AdjacencyMatrix failed clustering coefficient. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_clustering_coefficient_list():
-    fname = ''
-    for case in cases:
-        if case.op == 'C_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='list')
-            v = int(case.vtx.strip())
-            myresult = round(
-                100 * NetworkOperations.clustering_coefficient(g, v))
-            assert int(case.result) == myresult,\
-                'AdjacencyList failed clustering coefficient. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_average_neighbor_degree_set():
-    fname = ''
-    for case in cases:
-        if case.op == 'K_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='sets')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.average_neighbor_degree(g, v))
-            assert int(case.result) == myresult, \
-                'SetGraph failed average neighbor degree. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_average_neighbor_degree_matrix():
-    fname = ''
+def test_cases_match_reference():
+    adjacency = {}
     for case in cases:
-        if case.op == 'K_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='matrix')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.average_neighbor_degree(g, v))
-            assert int(case.result) == myresult, \
-                'AdjacencyMatrix failed average neighbor degree. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_average_neighbor_degree_list():
-    fname = ''
-    for case in cases:
-        if case.op == 'K_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='list')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.average_neighbor_degree(g, v))
-            assert int(case.result) == myresult, \
-                'AdjacencyList failed average neighbor degree. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_similarity_set():
-    fname = ''
-    for case in cases:
-        if case.op == 'J_ij':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='sets')
-            v0, v1 = map(lambda v: int(v.strip()), case.vtx.split(':'))
-            myresult = round(100 * NetworkOperations.similarity(g, v0, v1))
-            assert int(case.result) == myresult,\
-                'SetGraph failed similarity. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_similarity_matrix():
-    fname = ''
-    for case in cases:
-        if case.op == 'J_ij':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='matrix')
-            v0, v1 = map(lambda v: int(v.strip()), case.vtx.split(':'))
-            myresult = round(100 * NetworkOperations.similarity(g, v0, v1))
-            assert int(case.result) == myresult,\
-                'AdjacencyMatrix failed similarity. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_similarity_list():
-    fname = ''
-    for case in cases:
-        if case.op == 'J_ij':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='list')
-            v0, v1 = map(lambda v: int(v.strip()), case.vtx.split(':'))
-            myresult = round(100 * NetworkOperations.similarity(g, v0, v1))
-            assert int(case.result) == myresult,\
-                'AdjacencyList failed similarity. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_popular_distance_set():
-    fname = ''
-    for case in cases:
-        if case.op == 'D_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='sets')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.popular_distance(g, v))
-            assert int(case.result) == myresult,\
-                'SetGraph failed popular distance. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_popular_distance_matrix():
-    fname = ''
-    for case in cases:
-        if case.op == 'D_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='matrix')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.popular_distance(g, v))
-            assert int(case.result) == myresult,\
-                'AdjacencyMatrix failed popular distance. '\
-                f'myresult: {myresult}, testcase: {case}'
-
-
-def test_popular_distance_list():
-    fname = ''
-    for case in cases:
-        if case.op == 'D_i':
-            if case.file != fname:
-                fname = case.file
-                g = Graph(fetch_content(fname), imp='list')
-            v = int(case.vtx.strip())
-            myresult = round(NetworkOperations.popular_distance(g, v))
-            assert int(case.result) == myresult,\
-                'AdjacencyList failed popular distance. '\
-                f'myresult: {myresult}, testcase: {case}'
+        if case.file not in adjacency:
+            adjacency[case.file] = reference_graph(case.file)
+        expected = reference_result(adjacency[case.file], case.op, case.vtx)
+        assert int(case.result) == expected, case
+
+
+@backends
+def test_popular_distance_settles_hubs(graphs, imp):
+    # The hub 0 (degree 4) is adjacent to 9 by an edge of weight 5, and two
+    # steps of 0.75 away through 5. The shortest path has length 1.5, which
+    # is truncated to 1. The original implementation returned as soon as the
+    # hub had any tentative distance, here the 5 of the direct edge; user-028
+    # replaced it with a search that stops only once a hub is settled.
+    g = Graph('0 1 1\n0 2 1\n0 3 1\n9 0 5\n9 5 0.75\n5 0 0.75', imp)
+    assert NetworkOperations.popular_distance(g, 9) == 1
+    assert NetworkOperations.popular_distance(g, 5) == 0
+    assert NetworkOperations.popular_distance(g, 1) == 1
+    assert NetworkOperations.popular_distance(g, 0) == 0
+    # the same on hep: 88 is 0.5 from the hub 87, for which the original
+    # implementation gave 4
+    assert NetworkOperations.popular_distance(graphs('hep', imp), 88) == 0
+
+
+def test_visualize_sampling(graphs, tmp_path):
+    g = graphs('karate')
+    for sample in ('degree', 'core'):
+        dot = tmp_path / f'{sample}.gv'
+        NetworkOperations.visualize(g, str(dot), render=False,
+                                    max_vertices=10, sample=sample)
+        lines = dot.read_text().splitlines()
+        vertices = [l for l in lines if l.startswith('\t') and '--' not in l]
+        assert lines[0] == 'graph {' and lines[-1] == '}'
+        assert 0 < len(vertices) <= 10, \
+            f'visualize kept {len(vertices)} vertices with {sample} sampling'
+
+
+def test_load_edge_list_parallel(graphs):
+    for fname in ('karate', 'hep'):
+        expected = graphs(fname)
+        g = load_edge_list(os.path.join(DATASETS, fname + '.txt'), imp='list',
+                           workers=2)
+        assert set(g.vertices()) == set(expected.vertices())
+        assert set(g.edges()) == set(expected.edges())
+        assert g.has_weights() == expected.has_weights()
+        for e in g.edges():
+            assert g.weight(e.v0, e.v1) == expected.weight(e.v0, e.v1), \
+                f'parallel load changed the weight of {e} in {fname}'
+
+
+def test_components(graphs):
+    g = graphs('netsci')
+    sizes = g.component_sizes()
+    assert sum(size * count for size, count in sizes.items()) == \
+        g.vertex_count()
+    assert max(sizes) == 379
+    # 0 and 1084 share an edge; 2 is in a small component away from the hub
+    assert g.connected(0, 1084) and not g.connected(0, 2)
+    assert g.component(2) == g.component(3)
+    assert NetworkOperations.popular_distance(g, 2) == -1
+
+
+def test_approximate_clustering(graphs):
+    g = graphs('karate')
+    exact = NetworkOperations.clustering_coefficient(g)
+    estimate, (low, high) = NetworkOperations.approximate_clustering(
+        g, error=0.02, seed=7)
+    assert low <= exact <= high and high - low <= 0.04 + 1e-9
+    assert (estimate, (low, high)) == NetworkOperations.approximate_clustering(
+        g, error=0.02, seed=7), 'seeded estimates differ'
+    estimate, (low, high) = NetworkOperations.approximate_clustering(
+        g, samples=5000, kind='global', seed=7)
+    assert low <= 0.2557 <= high
+    for kind in ('average', 'global'):
+        with pytest.raises(AssertionError, match='at least 1 sample'):
+            NetworkOperations.approximate_clustering(g, samples=0, kind=kind)
+
+
+def test_approximate_popular_distance(graphs):
+    g = graphs('netsci')
+    landmarks = NetworkOperations.landmark_distances(g, 8, seed=3)
+    for v in (79, 384, 1084, 303):
+        exact = NetworkOperations.popular_distance(g, v)
+        estimate, (low, high) = NetworkOperations.approximate_popular_distance(
+            g, v, landmarks)
+        if exact == -1:
+            assert estimate == -1
+        else:
+            assert low <= exact <= high == estimate
+
+
+def test_centrality_suite(graphs):
+    for imp in ('sets', 'matrix', 'list'):
+        g = graphs('karate', imp)
+        between = NetworkOperations.betweenness_centrality(g)
+        assert round(between[0], 4) == 0.4376 and round(between[33], 4) == 0.3041
+        assert round(NetworkOperations.closeness_centrality(g, 0), 4) == 0.569
+        rank = NetworkOperations.pagerank(g)
+        assert round(rank[33], 3) == 0.101 and round(sum(rank.values()), 6) == 1
+    parallel = NetworkOperations.betweenness_centrality(g, workers=2)
+    assert all(math.isclose(between[v], parallel[v]) for v in between)
+    sampled = NetworkOperations.betweenness_centrality(g, k=34, seed=1)
+    assert all(math.isclose(between[v], sampled[v]) for v in between)
+
+
+def test_sparse_large_vertex_labels():
+    edges = '\n'.join(['5000000000 7', '7 -3', '-3 5000000000', '7 12'])
+    for imp in ('sets', 'matrix', 'list'):
+        g = Graph(edges, imp=imp)
+        assert list(g.index.labels) == [-3, 7, 12, 5000000000]
+        assert g.index.id(5000000000) == 3 and 8 not in g.index
+        assert sorted(g.neighbors(7)) == [-3, 12, 5000000000]
+        assert g.has_edge(5000000000, -3) and not g.has_edge(12, -3)
+        assert round(100 * NetworkOperations.clustering_coefficient(g, 7)) == 33
+
+
+def test_memory_usage_matches_tracemalloc():
+    import gc
+    import tracemalloc
+    for fname, imp in [('datasets/netsci', 'sets'), ('datasets/netsci', 'matrix'),
+                       ('datasets/netsci', 'list'), ('datasets/hep', 'sets'),
+                       ('datasets/hep', 'list')]:
+        edges = fetch_content(fname)
+        gc.collect()
+        tracemalloc.start()
+        g = Graph(edges, imp=imp)
+        gc.collect()
+        measured = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        reported = sum(g.memory_usage().values())
+        projected = sum(estimate_memory(
+            os.path.join(os.path.dirname(DATASETS), fname + '.txt'), imp).values())
+        for name, size in [('memory_usage', reported), ('estimate', projected)]:
+            assert abs(size - measured) <= 0.15 * measured, \
+                f'{name} of {fname} as {imp}: {size} bytes, measured {measured}'
+
+
+def test_memory_budget():
+    path = os.path.join(DATASETS, 'hep.txt')
+    try:
+        load_edge_list(path, imp='matrix', workers=1, budget=50 * 2 ** 20)
+        assert False, 'matrix over budget was loaded'
+    except MemoryError:
+        pass
+    g = load_edge_list(path, imp='matrix', workers=1, budget=50 * 2 ** 20,
+                       downgrade=True)
+    assert isinstance(g.graph, AdjacencyList)
+    assert sum(g.memory_usage().values()) < 50 * 2 ** 20
+
+
+def test_subgraph_views(graphs):
+    for imp in ('sets', 'matrix', 'list'):
+        g = graphs('karate', imp)
+        ego = g.ego_network(0)
+        assert ego.graph is g.graph, 'view copied the backend'
+        assert ego.vertex_count() == 17 and ego.edge_count() == 34
+        assert NetworkOperations.clustering_coefficient(ego, 0) == \
+            NetworkOperations.clustering_coefficient(g, 0)
+        assert NetworkOperations.average_neighbor_degree(ego, 0) < \
+            NetworkOperations.average_neighbor_degree(g, 0)
+        sub = g.subgraph([0, 1, 2, 33])
+        assert set(sub.edges()) == {Edge(0, 1), Edge(0, 2), Edge(1, 2)}
+        assert not sub.has_vertex(3) and sub.component_sizes() == {3: 1, 1: 1}
+        assert NetworkOperations.popular_distance(sub, 33) == -1
+        assert sorted(g.k_hop(16, 2).vertices()) == [0, 4, 5, 6, 10, 16]
+        assert 0 not in g.ego_network(0, center=False).vertices()
+
+
+def test_graph_summary(graphs):
+    for imp in ('sets', 'matrix', 'list'):
+        g = graphs('karate', imp)
+        summary = g.summary()
+        assert summary is g.summary(), 'summary is not cached'
+        assert summary.hubs == [33] and summary.max_degree == 17
+        assert summary.histogram[2] == 11 and summary.degree(0) == 16
+        assert sum(summary.histogram.values()) == 34
+        assert round(summary.mean_degree, 4) == round(156 / 34, 4)
+        assert round(summary.density, 4) == 0.139
+        assert round(summary.assortativity, 4) == -0.4756
+    ego = g.ego_network(0).summary()
+    assert ego.hubs == [0] and ego.edge_count == 34
+
+
+def test_top_k_and_above(graphs):
+    g = graphs('karate')
+    for metric in ('degree_centrality', 'clustering_coefficient',
+                   'average_neighbor_degree'):
+        expected = sorted(
+            ((v, getattr(NetworkOperations, metric)(g, v)) for v in g.vertices()),
+            key=lambda pair: (-pair[1], pair[0]))
+        top = NetworkOperations.top_k(g, metric, 8)
+        assert [v for v, _ in top] == [v for v, _ in expected[:8]], metric
+        assert all(math.isclose(a, b) for (_, a), (_, b) in zip(top, expected))
+        cut = expected[5][1]
+        assert [v for v, _ in NetworkOperations.above(g, metric, cut)] == \
+            [v for v, value in expected if value > cut and not
+             math.isclose(value, cut)], metric
+    similar = NetworkOperations.top_k(g, 'similarity', 3, 33)
+    assert similar[0][0] == 32 and 33 not in [v for v, _ in similar]
+    assert math.isclose(similar[0][1], NetworkOperations.similarity(g, 33, 32))
+    assert NetworkOperations.top_k(g, 'degree_centrality', 0) == []
+    assert NetworkOperations.top_k(g, 'similarity', -1, 33) == []
+
+
+def test_weighted_metrics(graphs):
+    g = graphs('karate')
+    for v in g.vertices():
+        c = NetworkOperations.clustering_coefficient(g, v)
+        assert math.isclose(NetworkOperations.weighted_clustering(g, v), c)
+        assert math.isclose(
+            NetworkOperations.weighted_clustering(g, v, 'onnela'), c)
+        assert math.isclose(
+            NetworkOperations.weighted_average_neighbor_degree(g, v),
+            NetworkOperations.average_neighbor_degree(g, v))
+        assert NetworkOperations.strength(g, v) == g.degree(v)
+
+    g = graphs('hep')
+    top = max(w for _, w in g.weighted_edges())
+    for v in random.Random(7).sample(sorted(g.vertices()), 30) + [87]:
+        nbrs = list(g.neighbors(v))
+        s = sum(g.weight(v, u) for u in nbrs)
+        assert math.isclose(NetworkOperations.strength(g, v), s)
+        assert math.isclose(
+            NetworkOperations.weighted_average_neighbor_degree(g, v),
+            sum(g.weight(v, u) * g.degree(u) for u in nbrs) / s)
+        barrat = onnela = 0.0
+        for a, j in enumerate(nbrs):
+            for h in nbrs[a + 1:]:
+                if g.has_edge(j, h):
+                    barrat += g.weight(v, j) + g.weight(v, h)
+                    onnela += (g.weight(v, j) * g.weight(v, h) *
+                               g.weight(j, h)) ** (1 / 3) / top
+        d = len(nbrs)
+        assert math.isclose(NetworkOperations.weighted_clustering(g, v),
+                            barrat / (s * (d - 1)) if d > 1 else 0.0)
+        assert math.isclose(
+            NetworkOperations.weighted_clustering(g, v, 'onnela'),
+            2 * onnela / (d * (d - 1)) if d > 1 else 0.0)
+    strengths = NetworkOperations.strength(g)
+    assert NetworkOperations.top_k(g, 'strength', 1)[0][1] == max(strengths.values())
+
+
+def test_command_line(graphs, tmp_path, capsys):
+    import re
+    import networks
+    stacks = tmp_path / 'stacks.folded'
+    assert networks.main([os.path.join(DATASETS, 'karate.txt'), 'C_D',
+                          'similarity', 'D_i', '--vertices', '0,12,33',
+                          '--profile', 'sample', '--output', str(stacks)]) == 0
+    out, err = capsys.readouterr()
+    g = graphs('karate')
+    assert out.splitlines() == [
+        f'karate,C_D,0,{NetworkOperations.degree_centrality(g, 0)}',
+        f'karate,C_D,12,{NetworkOperations.degree_centrality(g, 12)}',
+        f'karate,C_D,33,{NetworkOperations.degree_centrality(g, 33)}',
+        f'karate,J_ij,0:12,{NetworkOperations.similarity(g, 0, 12)}',
+        f'karate,J_ij,12:33,{NetworkOperations.similarity(g, 12, 33)}',
+        'karate,D_i,0,2', 'karate,D_i,12,3', 'karate,D_i,33,0']
+    phases = [line.split()[0] for line in err.splitlines()[:5]]
+    assert phases == ['parse', 'build', 'C_D', 'J_ij', 'D_i']
+    assert all(re.fullmatch(r'[^;]+(;[^;]+)* \d+', line)
+               for line in stacks.read_text().splitlines())
+
+
+def test_communities(graphs):
+    # two 5-cliques joined by the edge 4-5
+    cliques = [(a, b) for a in range(5) for b in range(a + 1, 5)]
+    edges = cliques + [(a + 5, b + 5) for a, b in cliques] + [(4, 5)]
+    g = Graph('\n'.join(f'{a} {b}' for a, b in edges), imp='matrix')
+    halves = {v: v // 5 for v in range(10)}
+    assert NetworkOperations.louvain(g, seed=1) == halves
+    assert NetworkOperations.label_propagation(g, seed=1) == halves
+    assert math.isclose(NetworkOperations.modularity(g, halves),
+                        2 * (10 / 21 - (21 / 42) ** 2))
+    assert NetworkOperations.modularity(g, dict.fromkeys(range(10), 0)) == 0
+
+    g = graphs('karate')
+    communities = NetworkOperations.louvain(g, seed=0)
+    assert communities == NetworkOperations.louvain(g, seed=0)
+    assert NetworkOperations.modularity(g, communities) > 0.41
+
+    g = graphs('hep')
+    communities = NetworkOperations.louvain(g, seed=0)
+    assert NetworkOperations.modularity(g, communities) > 0.85
+    labels = NetworkOperations.label_propagation(g, seed=0)
+    assert NetworkOperations.modularity(g, labels) > 0.6
+    assert labels == NetworkOperations.label_propagation(g, seed=0, workers=2)
+
+
+def test_core_numbers(graphs):
+    for imp in ('sets', 'matrix', 'list'):
+        g = graphs('karate', imp)
+        cores = NetworkOperations.core_numbers(g)
+        assert collections.Counter(cores.values()) == {1: 1, 2: 11, 3: 12, 4: 10}
+        assert sorted(v for v, core in cores.items() if core == 4) == \
+            [0, 1, 2, 3, 7, 8, 13, 30, 32, 33]
+    inner = NetworkOperations.k_core(g, 4)
+    assert inner.vertex_count() == 10
+    assert min(inner.degree(v) for v in inner.vertices()) >= 4
+    top = NetworkOperations.top_k(g, 'clustering_coefficient', 3, min_core=4)
+    assert top == [(7, 1.0), (3, NetworkOperations.clustering_coefficient(g, 3)),
+                   (13, NetworkOperations.clustering_coefficient(g, 13))]
+    assert {v for v, _ in NetworkOperations.above(
+        g, 'degree_centrality', 0.1, min_core=4)} <= set(inner.vertices())
+
+    g = graphs('hep')
+    cores = NetworkOperations.core_numbers(g)
+    inner = NetworkOperations.k_core(g, max(cores.values()))
+    assert all(inner.degree(v) >= max(cores.values()) for v in inner.vertices())
+
+
+def test_shortest_paths(graphs):
+    for name in ('netsci', 'hep'):
+        g = graphs(name)
+        hubs = g.summary().hubs
+        sample = sorted(g.vertices())[::500]
+        matrix = NetworkOperations.distance_matrix(g, sample, hubs, workers=2)
+        for v in sample:
+            nearest = min(matrix.distance(v, h) for h in hubs)
+            expected = NetworkOperations.popular_distance(g, v)
+            assert (int(nearest) if nearest != math.inf else -1) == expected, v
+        assert matrix.data == NetworkOperations.distance_matrix(
+            g, sample, hubs).data
+
+    g = graphs('karate')
+    engine = ShortestPaths(g, cache_size=2)
+    assert engine.distances(0)[33] == 2 and engine.distances(16)[33] == 4
+    engine.matrix([0, 16, 0])
+    assert (engine.hits, engine.misses) == (3, 2)
+    engine.matrix([33])
+    engine.matrix([0])  # 16 was used less recently and was evicted
+    engine.matrix([16])
+    assert (engine.hits, engine.misses) == (4, 4)
+    row = engine.matrix([33], [0, 16, 33]).row(33)
+    assert row == {0: 2, 16: 4, 33: 0}
+
+
+def test_point_to_point(graphs):
+    from networks import _bidirectional
+    for name in ('netsci', 'hep'):
+        g = graphs(name)
+        compact = g.compact()
+        engine = ShortestPaths(g)
+        rng = random.Random(5)
+        vertices = sorted(g.vertices())
+        reached = []
+        for u, v in (rng.sample(vertices, 2) for _ in range(50)):
+            expected = engine.distances(u).get(v, math.inf)
+            assert NetworkOperations.distance(g, u, v) == pytest.approx(expected)
+            path = NetworkOperations.path(g, u, v)
+            if expected == math.inf:
+                assert path == []
+                continue
+            assert path[0] == u and path[-1] == v
+            assert sum(g.weight(a, b) for a, b in zip(path, path[1:])) == \
+                pytest.approx(expected)
+            reached.append(_bidirectional(
+                compact, compact.index.id(u), compact.index.id(v))[3])
+        # both searches together reach a small part of the graph
+        assert sum(reached) / len(reached) < 0.25 * g.vertex_count(), name
+    g = graphs('karate')
+    assert NetworkOperations.path(g, 5, 5) == [5]
+    assert NetworkOperations.distance(g, 16, 33) == 4
+
+
+def test_snapshot_delta():
+    old = fetch_content('datasets/karate')
+    lines = old.splitlines()
+    # drop two edges, add one between existing vertices and one to a new vertex
+    new = '\n'.join(lines[2:] + ['14 15', '33 100'])
+    delta = diff_edge_lists(old, new)
+    assert set(delta.added) == {(14, 15), (33, 100)} and len(delta.removed) == 2
+    assert len(diff_edge_lists(old, old)) == 0
+    for imp in ('sets', 'matrix', 'list'):
+        g = Graph(old, imp=imp)
+        metrics = IncrementalMetrics(g)
+        redone = metrics.apply(delta)
+        fresh = Graph(new, imp=imp)
+        assert set(g.edges()) == set(fresh.edges())
+        assert set(g.vertices()) == set(fresh.vertices())
+        for v in fresh.vertices():
+            assert metrics.degree_centrality(v) == \
+                NetworkOperations.degree_centrality(fresh, v)
+            assert metrics.clustering[v] == \
+                NetworkOperations.clustering_coefficient(fresh, v)
+            assert metrics.neighbor_degree[v] == \
+                NetworkOperations.average_neighbor_degree(fresh, v)
+            assert metrics.popular_distance[v] == \
+                NetworkOperations.popular_distance(fresh, v)
+        assert redone['clustering'] < fresh.vertex_count() / 2
+
+        # an edge between two neighbors of the hub leaves every path as it was
+        redone = metrics.apply(diff_edge_lists(new, new + '\n18 20'))
+        assert redone['degree'] == 2 and redone['popular_distance'] == 0
+        assert metrics.popular_distance[18] == 1
+
+
+def test_apply_rebuilds_when_needed():
+    g = Graph('1 2\n2 3\n3 1\n3 4', imp='matrix')
+    g.apply(diff_edge_lists('1 2\n2 3\n3 1\n3 4', '1 2 2.5\n2 3\n3 1'))
+    assert g.has_weights() and sorted(g.vertices()) == [1, 2, 3]
+    assert g.weight(1, 2) == 2.5 and g.weight(1, 3) == 1
+    g = Graph('1 2\n2 3', imp='sets')
+    g.apply(diff_edge_lists('1 2\n2 3', '2 3'))
+    assert list(g.vertices()) == [2, 3] and g.edge_count() == 1
+
+
+def test_frozen_graph(graphs):
+    g = graphs('hep')
+    frozen = g.freeze()
+    assert frozen.frozen and not g.frozen and frozen.freeze() is frozen
+    assert frozen._compact is not None and frozen._components is not None
+    assert frozen.graph.targets.readonly
+    compact = frozen.compact()
+    assert compact.targets is frozen.graph.targets and compact.shared
+    assert compact.weights is frozen.graph.weights
+    assert 'compact' not in frozen.memory_usage(), 'adjacency held twice'
+    assert list(pickle.loads(pickle.dumps(compact)).neighbors(3)) == \
+        list(compact.neighbors(3))
+    assert NetworkOperations.betweenness_centrality(frozen, k=20, seed=1, workers=2) \
+        == pytest.approx(NetworkOperations.betweenness_centrality(g, k=20, seed=1))
+    assert dict(frozen.weighted_edges()) == dict(g.weighted_edges())
+    ego = g.ego_network(87).freeze()
+    assert set(ego.edges()) == set(g.ego_network(87).edges())
+    copy = pickle.loads(pickle.dumps(frozen))
+    assert list(copy.neighbors(87)) == list(frozen.neighbors(87))
+    assert copy.weight(87, next(copy.neighbors(87))) == \
+        g.weight(87, next(copy.neighbors(87)))
+    with pytest.raises(AssertionError):
+        frozen.apply(diff_edge_lists('1 2', '1 3'))
+
+
+def test_frozen_concurrent_reads(graphs):
+    """Hammers every Graph primitive of one frozen graph from a thread pool."""
+    g = graphs('netsci')
+    frozen = g.freeze()
+    vertices = sorted(g.vertices())
+
+    def read(g, chunk):
+        return [(v, sorted(g.neighbors(v)), g.sorted_neighbors(v), g.degree(v),
+                 g.component(v),
+                 [(u, g.has_edge(v, u), g.connected(v, u))
+                  for u in vertices[::97]],
+                 [g.weight(v, u) for u in g.neighbors(v)],
+                 g.summary().degree(v), g.has_vertex(v) and not g.has_vertex(-v - 1),
+                 NetworkOperations.clustering_coefficient(g, v),
+                 NetworkOperations.popular_distance(g, v) if v % 50 == 0 else None)
+                for v in chunk]
+
+    def read_all(g):
+        return (sorted(g.vertices()), set(g.edges()), dict(g.weighted_edges()),
+                g.vertex_count(), g.edge_count(), g.has_weights(),
+                g.component_sizes(), g.compact().offsets[-1])
+
+    chunks = [vertices[i::16] for i in range(16)]
+    expected = [read(g, chunk) for chunk in chunks]
+    expected_all = read_all(g)
+    switch = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # switch threads as often as possible
+    try:
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            reads = [pool.submit(read, frozen, chunk) for chunk in chunks]
+            whole = [pool.submit(read_all, frozen) for _ in range(8)]
+            assert [f.result() for f in reads] == expected
+            assert all(f.result() == expected_all for f in whole)
+    finally:
+        sys.setswitchinterval(switch)
+
+
+def test_sorted_neighbors():
+    for imp in sorted(IMPLEMENTATIONS):
+        g = Graph('5 1\n5 9\n5 3\n9 1\n3 7', imp=imp)
+        assert g.sorted_neighbors(5) == [1, 3, 9] and g.sorted_neighbors(7) == [3]
+        if imp == 'frozen':
+            continue
+        cached = g.graph.sorted_neighbors(g.index.id(5))
+        assert g.graph.sorted_neighbors(g.index.id(5)) is cached
+        assert 'sorted_neighbors' in g.memory_usage()
+        g.apply(diff_edge_lists('5 1\n5 9\n5 3\n9 1\n3 7',
+                                '5 1\n5 9\n9 1\n3 7\n5 0\n5 8'))
+        assert g.sorted_neighbors(5) == [0, 1, 8, 9]
+        assert NetworkOperations.clustering_coefficient(g, 5) == 1 / 6
+        assert NetworkOperations.similarity(g, 5, 9) == 1 / 5
+        view = g.subgraph([1, 5, 9])
+        assert view.sorted_neighbors(5) == [1, 9]
+        assert NetworkOperations.clustering_coefficient(view, 5) == 1.0
+
+
+def test_weight_types(graphs):
+    assert graphs('hep').graph.weight_typecode == 'd'
+    assert graphs('karate').graph.weight_typecode is None
+    for imp in sorted(IMPLEMENTATIONS):
+        g = Graph('1 2 3\n2 3 4\n3 1 0', imp=imp)
+        assert g.graph.weight_typecode == 'i', imp
+        assert g.weight(1, 2) == 3 and type(g.weight(1, 2)) is int
+        assert g.has_edge(1, 3) and g.weight(1, 3) == 0
+        weights = g.compact().weights
+        assert (weights.format if g.frozen else weights.typecode) == 'i'
+        assert NetworkOperations.distance(g, 2, 3) == 3
+        g = Graph('1 2\n2 3 2.5\n3 4 -0.25', imp=imp)
+        assert g.graph.weight_typecode == 'f' and g.weight(1, 2) == 1
+        assert g.weight(3, 4) == -0.25
+        assert pickle.loads(pickle.dumps(g.freeze())).weight(2, 3) == 2.5
+        assert Graph('1 2 0.1\n2 3 4', imp=imp).graph.weight_typecode == 'd'
+        assert Graph(f'1 2 {2 ** 31}', imp=imp).graph.weight_typecode == 'f'
+        if imp == 'frozen':
+            continue
+        g = Graph('1 2 3\n2 3 4', imp=imp)
+        g.apply(diff_edge_lists('1 2 3\n2 3 4', '1 2 3\n2 3 4\n3 4 5.0'))
+        assert g.graph.weight_typecode == 'i' and type(g.weight(3, 4)) is int
+        if imp == 'matrix':
+            assert {row.typecode for row in g.graph.d} == {'i'}
+        g.apply(diff_edge_lists('1 2 3\n2 3 4\n3 4 5', '1 2 3\n2 3 4\n3 4 5\n4 1 2.5'))
+        assert g.graph.weight_typecode == 'f', 'not rebuilt for a fractional weight'
+        assert g.weight(1, 4) == 2.5 and g.weight(3, 4) == 5
+        if imp == 'matrix':
+            assert {row.typecode for row in g.graph.d} == {'f'}
+
+
+def test_random_walks(graphs, tmp_path):
+    g = graphs('karate')
+    engine = RandomWalks(g, length=12)
+    walks = list(engine.walks(per_vertex=3, seed=1))
+    assert len(walks) == 3 * 34 and all(len(w) == 12 for w in walks)
+    assert collections.Counter(w[0] for w in walks) == {v: 3 for v in g.vertices()}
+    assert all(g.has_edge(a, b) for w in walks for a, b in zip(w, w[1:]))
+    assert walks == list(engine.walks(per_vertex=3, seed=1))
+    assert walks != list(engine.walks(per_vertex=3, seed=2))
+
+    hep = RandomWalks(graphs('hep'), length=20, p=0.5, q=2)
+    starts = sorted(graphs('hep').vertices())[:600]
+    serial, pooled = tmp_path / 'serial.txt', tmp_path / 'pooled.txt'
+    assert hep.write(str(serial), starts=starts, per_vertex=2, seed=3) == 1200
+    hep.write(str(pooled), starts=starts, per_vertex=2, seed=3, workers=2)
+    lines = serial.read_text().splitlines()
+    assert pooled.read_text().splitlines() == lines
+    assert [list(map(int, line.split())) for line in lines] == \
+        list(hep.walks(starts=starts, per_vertex=2, seed=3))
+
+
+def test_random_walk_biases():
+    def next_steps(engine, start, walks=4000):
+        return collections.Counter(w[1] for w in engine.walks([start], walks, seed=1))
+
+    g = Graph('0 1 1\n0 2 9\n0 3 0\n4 5 2', imp='list')
+    steps = next_steps(RandomWalks(g, length=2), 0)
+    assert 3 not in steps and 0.87 < steps[2] / 4000 < 0.93
+    steps = next_steps(RandomWalks(g, length=2, weighted=False), 0)
+    assert all(0.3 < steps[v] / 4000 < 0.37 for v in (1, 2, 3))
+    assert list(RandomWalks(g.subgraph([0, 4]), length=5).walks([0], 1)) == [[0]]
+
+    # from 1 via 0, the next step returns to 1 with bias 1/p, goes to 2, a
+    # neighbor of 1, with bias 1 and to 3 with bias 1/q
+    g = Graph('0 1\n0 2\n1 2\n0 3', imp='list')
+    third = collections.Counter(
+        w[2] for w in RandomWalks(g, length=3, p=0.25, q=4).walks([1], 8000, seed=1)
+        if w[1] == 0)
+    total = sum(third.values())
+    assert abs(third[1] / total - 4 / 5.25) < 0.03
+    assert abs(third[2] / total - 1 / 5.25) < 0.03
+    assert abs(third[3] / total - 0.25 / 5.25) < 0.02
+    with pytest.raises(AssertionError):
+        RandomWalks(Graph('0 1 -1', imp='list'))
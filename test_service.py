@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+from service import *
+
+
+def load(fname, imp='list'):
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           fname + '.txt')) as f:
+        return Graph(f.read(), imp=imp)
+
+
+def test_query_matches_network_operations():
+    g = load('datasets/karate')
+    service = MetricsService({'karate': g}, workers=2)
+
+    async def run():
+        return await asyncio.gather(
+            service.query('karate', 'degree', 0),
+            service.query('karate', 'has_edge', 0, 1),
+            service.query('karate', 'clustering_coefficient', 0),
+            service.query('karate', 'popular_distance', 12),
+            service.query('karate', 'popular_distance', 12))
+
+    try:
+        degree, edge, cc, pd, pd_again = asyncio.run(run())
+    finally:
+        service.close()
+    assert degree == g.degree(0) and edge
+    assert cc == NetworkOperations.clustering_coefficient(g, 0)
+    assert pd == pd_again == NetworkOperations.popular_distance(g, 12)
+    assert service.latency()['popular_distance']['count'] == 2
+
+
+def test_duplicate_queries_coalesce():
+    service = MetricsService({'karate': load('datasets/karate')})
+    calls = []
+
+    async def offload(graph, op, args):
+        calls.append((graph, op, args))
+        await asyncio.sleep(0.01)
+        return 42
+
+    service._offload = offload
+
+    async def run():
+        return await asyncio.gather(
+            *[service.query('karate', 'similarity', 0, 1) for _ in range(5)])
+
+    assert asyncio.run(run()) == [42] * 5
+    assert calls == [('karate', 'similarity', (0, 1))]
+
+
+def test_json_lines_front_end(tmp_path):
+    service = MetricsService({'karate': load('datasets/karate')}, workers=1)
+    path = str(tmp_path / 'metrics.sock')
+
+    async def run():
+        server = asyncio.ensure_future(serve(service, path))
+        while not (tmp_path / 'metrics.sock').exists():
+            await asyncio.sleep(0.01)
+        reader, writer = await asyncio.open_unix_connection(path)
+        for i, request in enumerate([
+                {'graph': 'karate', 'op': 'degree', 'args': [0]},
+                {'graph': 'karate', 'op': 'nope'}]):
+            writer.write(json.dumps(dict(request, id=i)).encode() + b'\n')
+        writer.write_eof()
+        responses = [json.loads(line) async for line in reader]
+        server.cancel()
+        return sorted(responses, key=lambda r: r['id'])
+
+    try:
+        ok, error = asyncio.run(run())
+    finally:
+        service.close()
+    assert ok['result'] == 16 and ok['latency_ms'] >= 0
+    assert 'unsupported operation' in error['error']
+
+
+def test_connection_drops_answered_requests():
+    import gc
+    service = MetricsService({'karate': load('datasets/karate')}, workers=1)
+
+    class Writer:
+        lines = 0
+
+        def write(self, data):
+            self.lines += 1
+
+        async def drain(self):
+            pass
+
+        def close(self):
+            pass
+
+    async def run():
+        reader, writer = asyncio.StreamReader(), Writer()
+        handler = asyncio.ensure_future(service.handle(reader, writer))
+        for v in range(200):
+            reader.feed_data(json.dumps(
+                {'graph': 'karate', 'op': 'degree', 'args': [v % 34]}).encode() + b'\n')
+            await asyncio.sleep(0)
+        while writer.lines < 200:
+            await asyncio.sleep(0)
+        gc.collect()
+        alive = sum(isinstance(o, asyncio.Task) and o.done()
+                    for o in gc.get_objects())
+        reader.feed_eof()
+        await handler
+        return alive
+
+    try:
+        assert asyncio.run(run()) < 10, 'answered requests are still held'
+    finally:
+        service.close()